@@ -7,6 +7,18 @@ import webbrowser
 import urllib.parse
 
 from model import Model
+from lookups import LookupService
+from schemaoptimizer import SchemaOptimizer
+from devicelinks import DeviceLinks
+from lowstock import LowStockIndex
+from operationdate import OperationDateIndex
+from searchindex import SearchIndex
+from dataworker import DataWorker
+from exporter import ExportJob
+from importer import ImportJob, MovementImportJob
+from auditarchive import AuditArchive
+from analytics import StockAnalytics
+from profiling import Profiler
 from view import *
     
 
@@ -24,6 +36,14 @@ class Controller:
         self.root = root
         self.db_path = db_path
         self.model = Model(db_path)
+        self.lookups = LookupService(self.model)
+        self.migrated_devices = self.migrate_device_links()
+        self.low_stock_index = self.create_low_stock_index()
+        self.operation_date_index = self.create_operation_date_index()
+        self.schema_report = self.optimize_schema()
+        self.search_index = self.create_search_index()
+        self.data_worker = self.start_data_worker()
+        self.profiler = self.start_profiler()
         self.current_view_instance = None
         self.varianty_view_instance = None
         self.current_user = None
@@ -31,18 +51,373 @@ class Controller:
         self.current_role = None
 
 
+    def migrate_device_links(self):
+        """
+        Vytvoření vazební tabulky skladových položek a zařízení a doplnění vazeb podle původních
+        sloupců zařízení v tabulce sklad při startu aplikace. Sloupce se odstraní až převodem
+        zařízení z menu Nástroje (finish_device_migration).
+
+        :return: Seznam zařízení, která mají v tabulce sklad ještě sloupec, nebo None při chybě.
+        """
+        try:
+            return DeviceLinks(self.model).ensure()
+        except sqlite3.Error as e:
+            messagebox.showwarning("Varování", f"Nepodařilo se převést zařízení skladových položek: {e}")
+            return None
+
+
+    def finish_device_migration(self):
+        """
+        Jednorázové odstranění původních sloupců zařízení z tabulky sklad po potvrzení administrátorem.
+        Před odstraněním se databáze zálohuje do souboru vedle databáze.
+        """
+        if self.current_role != "admin":
+            messagebox.showwarning("Upozornění", "Převod zařízení může provést jen administrátor.")
+            return
+        device_links = DeviceLinks(self.model)
+        try:
+            legacy_columns = device_links.legacy_columns()
+        except sqlite3.Error as e:
+            messagebox.showwarning("Varování", f"Chyba při načítání dat z databáze: {e}!")
+            return
+        if not legacy_columns:
+            messagebox.showinfo("Převod zařízení", "Tabulka sklad už neobsahuje žádné sloupce zařízení.")
+            return
+        codes = ", ".join(code for code, _ in legacy_columns)
+        if not messagebox.askyesno("Převod zařízení", f"Odstranit z tabulky sklad sloupce zařízení {codes}?\n"
+                                                      f"Vazby zařízení zůstanou ve vazební tabulce. Pracovní stanice "
+                                                      f"se starší verzí aplikace po převodu přestanou fungovat, "
+                                                      f"před převodem je aktualizujte nebo ukončete.\n"
+                                                      f"Databáze se před převodem zálohuje."):
+            return
+        try:
+            migrated, backup_file = device_links.drop_legacy_columns()
+        except (sqlite3.Error, OSError) as e:
+            messagebox.showwarning("Varování", f"Chyba při převodu zařízení, sloupce nebyly odstraněny: {e}!")
+            return
+        self.migrated_devices = []
+        messagebox.showinfo("Převod zařízení", f"Odstraněny sloupce zařízení {', '.join(migrated)}.\n"
+                                               f"Záloha databáze: '{backup_file}'.")
+        self.show_data(self.current_table)
+
+
+    def create_low_stock_index(self):
+        """
+        Vytvoření částečného indexu skladových položek pod minimem při startu aplikace.
+
+        :return: True, pokud byl index vytvořen nebo odstraněn generovaný sloupec, nebo None při chybě.
+        """
+        try:
+            return LowStockIndex(self.model).ensure()
+        except sqlite3.Error as e:
+            messagebox.showwarning("Varování", f"Nepodařilo se vytvořit index položek pod minimem: {e}")
+            return None
+
+
+    def create_operation_date_index(self):
+        """
+        Vytvoření indexu audit_logu podle výrazu s datem operace při startu aplikace.
+
+        :return: True, pokud byl index vytvořen nebo odstraněn generovaný sloupec, nebo None při chybě.
+        """
+        try:
+            return OperationDateIndex(self.model).ensure()
+        except sqlite3.Error as e:
+            messagebox.showwarning("Varování", f"Nepodařilo se vytvořit index audit logu podle data operace: {e}")
+            return None
+
+
+    def optimize_schema(self):
+        """
+        Vytvoření a ověření indexů databáze a aktualizace statistik při startu aplikace.
+
+        :return: Slovník s vytvořenými indexy a dotazy se změněným plánem, nebo None při chybě.
+        """
+        try:
+            return SchemaOptimizer(self.model).optimize()
+        except sqlite3.Error as e:
+            messagebox.showwarning("Varování", f"Nepodařilo se provést údržbu indexů databáze: {e}")
+            return None
+
+
+    def create_search_index(self):
+        """
+        Vytvoření a ověření fulltextových indexů pro vyhledávání při startu aplikace.
+
+        :return: Instance SearchIndex, nebo None při chybě (vyhledává se pak bez indexu).
+        """
+        search_index = SearchIndex(self.model)
+        try:
+            search_index.ensure()
+        except sqlite3.Error as e:
+            messagebox.showwarning("Varování", f"Nepodařilo se vytvořit fulltextové indexy databáze: {e}")
+            return None
+        return search_index
+
+
+    def start_data_worker(self):
+        """
+        Spuštění pracovního vlákna pro načítání dat na pozadí.
+
+        :return: Instance DataWorker, nebo None při chybě (data se pak načítají přímo ve vlákně GUI).
+        """
+        try:
+            return DataWorker(self.root, self.db_path)
+        except sqlite3.Error as e:
+            messagebox.showwarning("Varování", f"Nepodařilo se spustit načítání dat na pozadí: {e}")
+            return None
+
+
+    def start_profiler(self):
+        """
+        Vytvoření měření doby trvání metod modelu, zobrazení dat a ukládání položek.
+        Měření se zapne, pokud je nastavená proměnná prostředí SKLAD_PROFILE, jinak ho lze
+        zapnout z menu Nástroje.
+
+        :return: Instance Profiler.
+        """
+        profiler = Profiler({
+            Model: None,
+            type(self): ("show_data", "show_data_for_editing", "show_data_for_movements", "insert_new_item",
+                         "update_row", "save_movement", "update_item_devices"),
+            View: ("load_data", "on_data_loaded", "build_query", "add_data", "reconcile_rows", "render_rows"),
+            ItemFrameBase: ("save_item",),
+            ItemFrameMovements: ("calculate_and_save",),
+            })
+        profiler.start_from_env()
+        return profiler
+
+
+    def toggle_profiling(self):
+        """
+        Zapnutí nebo vypnutí měření doby trvání metod z menu.
+        """
+        if self.profiler.enabled:
+            self.profiler.disable()
+            messagebox.showinfo("Měření výkonu", "Měření výkonu bylo vypnuto, naměřené hodnoty lze uložit.")
+        else:
+            self.profiler.enable()
+            messagebox.showinfo("Měření výkonu", "Měření výkonu bylo zapnuto.")
+
+
+    def save_profiling_report(self):
+        """
+        Uložení reportu měření doby trvání metod do zvoleného adresáře.
+        """
+        if not self.profiler.stats:
+            messagebox.showinfo("Měření výkonu", "Zatím nejsou žádné naměřené hodnoty, nejdříve zapněte měření.")
+            return
+        directory = filedialog.askdirectory()
+        if not directory:
+            return
+        try:
+            files = self.profiler.dump(directory)
+        except OSError as e:
+            messagebox.showerror("Chyba", f"Nepodařilo se uložit report měření: {e}")
+            return
+        messagebox.showinfo("Měření výkonu", "Report měření byl uložen do souborů:\n" + "\n".join(files))
+
+
+    def show_query_log(self):
+        """
+        Zobrazení okna se statistikami SQL příkazů a logem pomalých dotazů s plánem dotazu.
+        """
+        if self.current_role != "admin":
+            messagebox.showwarning("Upozornění", "Log dotazů může zobrazit jen administrátor.")
+            return
+        query_log = self.model.query_log
+        window = tk.Toplevel(self.root)
+        window.title(f"Log dotazů (pomalé nad {query_log.threshold_ms} ms)")
+        window.transient(self.root)
+
+        stats_columns = ("Příkaz", "Počet", "Celkem ms", "p50", "p95", "Max ms", "Řádků")
+        stats_tree = ttk.Treeview(window, columns=stats_columns, show="headings", height=10)
+        for col in stats_columns:
+            stats_tree.heading(col, text=col)
+            stats_tree.column(col, width=500 if col == "Příkaz" else 70, anchor="w" if col == "Příkaz" else "e")
+        stats_tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+
+        slow_columns = ("Čas", "ms", "Řádků", "Příkaz")
+        slow_tree = ttk.Treeview(window, columns=slow_columns, show="headings", height=8)
+        for col in slow_columns:
+            slow_tree.heading(col, text=col)
+            slow_tree.column(col, width=570 if col == "Příkaz" else 130 if col == "Čas" else 70,
+                             anchor="w" if col in ("Čas", "Příkaz") else "e")
+        slow_tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+
+        detail = tk.Text(window, height=8, wrap="word")
+        detail.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        slow_entries = []
+
+        def refresh():
+            stats_tree.delete(*stats_tree.get_children())
+            for row in query_log.report():
+                stats_tree.insert("", tk.END, values=(row["sql"], row["count"], row["total_ms"], row["p50_ms"],
+                                                      row["p95_ms"], row["max_ms"], row["rows"]))
+            slow_tree.delete(*slow_tree.get_children())
+            slow_entries[:] = query_log.slow_queries()
+            for idx, entry in enumerate(slow_entries):
+                slow_tree.insert("", tk.END, iid=str(idx), values=(entry["time"], entry["ms"], entry["rows"],
+                                                                   entry["sql"]))
+            detail.delete("1.0", tk.END)
+
+        def show_detail(event=None):
+            selected = slow_tree.selection()
+            if not selected:
+                return
+            entry = slow_entries[int(selected[0])]
+            detail.delete("1.0", tk.END)
+            detail.insert(tk.END, f"{entry['sql']}\n\nParametry: {entry['params']}\nVlákno: {entry['thread']}\n\n"
+                                  "Plán dotazu:\n" + "\n".join(entry["plan"]))
+
+        def clear():
+            query_log.reset()
+            refresh()
+
+        slow_tree.bind("<<TreeviewSelect>>", show_detail)
+        button_frame = tk.Frame(window)
+        button_frame.pack(pady=5)
+        tk.Button(button_frame, text="Obnovit", command=refresh).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Vymazat", command=clear).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Export", command=self.export_query_log).pack(side=tk.LEFT, padx=5)
+        refresh()
+
+
+    def show_schema_report(self):
+        """
+        Zobrazení výsledku údržby schématu při startu aplikace - vytvořené indexy a sledované
+        dotazy, jejichž plán se po vytvoření indexů a aktualizaci statistik změnil.
+        """
+        if self.current_role != "admin":
+            messagebox.showwarning("Upozornění", "Údržbu indexů může zobrazit jen administrátor.")
+            return
+        if self.schema_report is None:
+            messagebox.showinfo("Údržba indexů", "Údržba indexů při startu aplikace se neprovedla.")
+            return
+        lines = ["Vytvořené indexy: " + (", ".join(self.schema_report["created"]) or "žádné"), ""]
+        changed_plans = self.schema_report["changed_plans"]
+        if not changed_plans:
+            lines.append("Plány sledovaných dotazů se nezměnily.")
+        for name, (plan_before, plan_after) in changed_plans.items():
+            lines.append(f"Dotaz {name}:")
+            lines.append("  před: " + " | ".join(plan_before or ("(nezjištěno)",)))
+            lines.append("  po:   " + " | ".join(plan_after))
+            lines.append("")
+
+        window = tk.Toplevel(self.root)
+        window.title("Údržba indexů a změněné plány dotazů")
+        window.transient(self.root)
+        text = tk.Text(window, height=20, width=110, wrap="word")
+        text.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        text.insert(tk.END, "\n".join(lines))
+        text.config(state=tk.DISABLED)
+        tk.Button(window, text="Zavřít", command=window.destroy).pack(pady=5)
+
+
+    def export_query_log(self):
+        """
+        Export statistik SQL příkazů a logu pomalých dotazů do souboru JSON.
+        """
+        file_name = filedialog.asksaveasfilename(defaultextension=".json",
+                                                 filetypes=[("JSON files", "*.json"), ("All files", "*.*")])
+        if not file_name:
+            return
+        try:
+            self.model.query_log.export(file_name)
+        except OSError as e:
+            messagebox.showerror("Chyba při exportu", f"Nastala chyba při exportu logu dotazů: {e}")
+            return
+        messagebox.showinfo("Export dokončen", f"Log dotazů byl úspěšně exportován do souboru '{file_name}'.")
+
+
+    def run_async(self, channel, func, callback, error_callback=None):
+        """
+        Provedení čtecích dotazů v pracovním vlákně a předání výsledku do callbacku ve vlákně GUI.
+        Nový požadavek ve stejném kanálu zruší předchozí, dosud nedokončený požadavek.
+
+        :param channel: Název kanálu požadavku (např. 'view' nebo 'page').
+        :param func: Funkce s parametrem model, která provede dotazy a vrátí výsledek.
+        :param callback: Funkce pro zpracování výsledku.
+        :param error_callback: Funkce pro zpracování výjimky, pokud None, zobrazí se varování.
+        """
+        if error_callback is None:
+            error_callback = lambda e: messagebox.showwarning("Varování", f"Nepodařilo se načíst data z databáze: {e}")
+        if self.data_worker is None:
+            try:
+                result = func(self.model)
+            except Exception as e:
+                error_callback(e)
+                return
+            callback(result)
+            return
+        self.data_worker.submit(channel, func, callback, error_callback)
+
+
+    def cancel_async(self, channel):
+        """
+        Zrušení nedokončených požadavků kanálu v pracovním vlákně.
+
+        :param channel: Název kanálu požadavku.
+        """
+        if self.data_worker is not None:
+            self.data_worker.cancel(channel)
+
+
     def fetch_dict(self, table):
         """
-        Získání seznamu dodavatelů nebo zařízení'.
+        Získání seznamu dodavatelů, skladových položek nebo zařízení ze sdílené služby převodních slovníků.
 
         :param table: pro výběr tabulky, ze které se získávají data.
         :return slovník dodavatelů nebo zařízení s jejich id jako hodnotou.
         """
-        data = self.model.fetch_data(table)
-        if table == "sklad":
-            name=6
-        else: name=1
-        return {row[name]: row[0] for row in data}
+        return self.lookups.get_dict(table)
+
+
+    def fetch_sorted_names(self, table):
+        """
+        Získání abecedně seřazené n-tice názvů dodavatelů, skladových položek nebo zařízení.
+
+        :param table: pro výběr tabulky, ze které se získávají data.
+        :return n-tice seřazených názvů.
+        """
+        return self.lookups.get_sorted_names(table)
+
+
+    def create_query(self, table, date_range=None):
+        """
+        Vytvoření sestavovače SQL dotazu pro filtraci a třídění dat tabulky.
+
+        :param table: Název tabulky pro zobrazení.
+        :param date_range: N-tice (počáteční, koncové datum) filtru pohledu nebo None, u audit_logu
+                           určuje, které archivy se čtou.
+        :return: Instance QueryBuilder.
+        """
+        return self.model.create_query(table, self.search_index, date_range)
+
+
+    def fetch_query_rows(self, query, limit=None, offset=0):
+        """
+        Získání vyfiltrovaných a seřazených řádků podle sestaveného dotazu.
+
+        :param query: Instance QueryBuilder.
+        :param limit: Maximální počet řádků, pokud None, získají se všechny.
+        :param offset: Počet přeskočených řádků.
+        """
+        return self.model.fetch_query_rows(query, limit, offset)
+
+
+    def fetch_query_count(self, query):
+        """
+        Získání počtu vyfiltrovaných řádků podle sestaveného dotazu.
+        """
+        return self.model.fetch_query_count(query)
+
+
+    def fetch_query_ids(self, query):
+        """
+        Získání id vyfiltrovaných řádků v pořadí třídění podle sestaveného dotazu.
+        """
+        return self.model.fetch_query_ids(query)
 
 
     def get_max_id(self, curr_table, id_col_name):
@@ -64,13 +439,14 @@ class Controller:
         :param table: Název tabulky pro zobrazení.
         """     
         if table == 'varianty':
-            data = self.model.fetch_varianty_data()
             col_names = list(self.model.fetch_col_names(table)) + ["Nazev_dilu", "Dodavatel", "Pod_minimem"]
         elif table == 'sklad':
-            data = self.model.fetch_sklad_data()
             col_names = list(self.model.fetch_col_names(table)) + ["Pod_minimem"]
+        elif table == 'audit_log':
+            col_names = list(self.model.fetch_col_names(table)) + list(self.model.schema.generated_columns(table))
+        elif table == 'reporty':
+            col_names = list(StockAnalytics.report_columns[next(iter(CommonResources.report_names))])
         else:
-            data = self.model.fetch_data(table)
             col_names = self.model.fetch_col_names(table)
 
         if self.current_table != table:
@@ -88,14 +464,13 @@ class Controller:
                 self.current_view_instance = ZarizeniView(self.root, self, col_names, self.current_table)
             elif table == "uzivatele":
                 self.current_view_instance = UzivateleView(self.root, self, col_names, self.current_table)                
+            elif table == "reporty":
+                self.current_view_instance = ReportyView(self.root, self, col_names, self.current_table)
             else:
                 messagebox.showwarning("Varování", "Nebyla vytvořena nová instance třídy View.")
                 return
         
-        if current_id_num:
-            self.current_view_instance.add_data(data, current_id_num=current_id_num)
-        else:
-            self.current_view_instance.add_data(data)
+        self.current_view_instance.load_data(current_id_num=current_id_num)
 
 
     def show_data_for_editing(self, table, id_num, id_col_name, master, check_columns):
@@ -123,10 +498,9 @@ class Controller:
         self.name_of_user = "Zdeněk Pilát"
         self.current_role = "admin"
         self.current_table = "sklad"
-        data = self.model.fetch_sklad_data()
         col_names = list(self.model.fetch_col_names(self.current_table)) + ["Pod_minimem"]
         self.current_view_instance = SkladView(self.root, self, col_names, self.current_table)
-        self.current_view_instance.add_data(data)
+        self.current_view_instance.load_data()
         if sys.platform.startswith('win'):
             self.root.state('zoomed')
         else:
@@ -275,6 +649,7 @@ class Controller:
         except sqlite3.IntegrityError:
             messagebox.showwarning("Varování", "Položka se zadaným ID číslem, uživatelem nebo jménem už v databázi existuje.")
             return False
+        self.lookups.on_insert(table, columns, values_to_insert)
         return True     
 
 
@@ -293,9 +668,105 @@ class Controller:
         except Exception as e:
             messagebox.showwarning("Varování", f"Chyba při ukládání dat do databáze: {e}!")
             return False
+        self.lookups.on_update(table, selected_item_id)
         return True
 
 
+    def save_movement(self, id_num, id_col_name, values_to_sklad, audit_log_col_names, values_to_audit_log,
+                      variant_unit_price=None):
+        """
+        Uloží skladový pohyb v jedné transakci - aktualizaci položky v tabulce sklad, zápis do audit_logu
+        a případně aktualizaci jednotkové ceny varianty. Při chybě se nic neuloží.
+
+        :param id_num: Evidenční číslo skladové položky.
+        :param id_col_name: Název sloupce s evidenčním číslem.
+        :param values_to_sklad: Slovník aktualizovaných hodnot položky v tabulce sklad.
+        :param audit_log_col_names: Názvy sloupců zápisu do audit_logu.
+        :param values_to_audit_log: Hodnoty zápisu do audit_logu.
+        :param variant_unit_price: N-tice (id_sklad, id_dodavatele, jednotková cena) pro aktualizaci
+                                   ceny varianty nebo None.
+        :return: True, pokud byl pohyb uložen, jinak False.
+        """
+        try:
+            with self.model.transaction():
+                self.model.update_row("sklad", id_num, id_col_name, values_to_sklad)
+                self.model.insert_item("audit_log", audit_log_col_names, values_to_audit_log)
+                if variant_unit_price:
+                    self.model.update_variant_unit_price(*variant_unit_price)
+        except Exception as e:
+            messagebox.showwarning("Varování", f"Chyba při ukládání pohybu do databáze, nic nebylo uloženo: {e}!")
+            return False
+        self.lookups.on_update("sklad", id_num)
+        return True
+
+
+    def import_movements_csv(self):
+        """
+        Načte pohyby ze souboru csv (záhlaví názvy sloupců nebo jejich popisy z tab2hum), provede je
+        hromadně a uloží výsledky jednotlivých řádků do souboru *_vysledek.csv vedle vstupního souboru.
+        Načtení i uložení běží na pozadí s průběhem.
+        """
+        csv_file_name = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+        if not csv_file_name:
+            return
+        movement_job = MovementImportJob(self.db_path, csv_file_name, self.name_of_user)
+        movement_job.start()
+        self.show_movement_import_progress(movement_job)
+
+
+    def show_movement_import_progress(self, movement_job):
+        """
+        Zobrazení okna s průběhem načítání a ukládání hromadných pohybů a tlačítkem pro zrušení
+        (jen během načítání souboru), po dokončení výsledek a obnovení zobrazených dat.
+
+        :param movement_job: Spuštěná instance MovementImportJob.
+        """
+        window = tk.Toplevel(self.root)
+        window.title("Hromadné pohyby")
+        window.transient(self.root)
+        window.resizable(False, False)
+        label = tk.Label(window, text="Probíhá načítání pohybů...", width=45)
+        label.pack(padx=10, pady=5)
+        progressbar = ttk.Progressbar(window, length=300, mode="determinate", maximum=100)
+        progressbar.pack(padx=10, pady=5)
+        cancel_button = tk.Button(window, text="Zrušit", command=movement_job.cancel)
+        cancel_button.pack(pady=5)
+        window.protocol("WM_DELETE_WINDOW", movement_job.cancel)
+
+        def update_progress():
+            if movement_job.done:
+                window.destroy()
+                if movement_job.error is not None:
+                    if movement_job.report:
+                        messagebox.showwarning("Varování", f"Pohyby byly uloženy ({movement_job.saved} z "
+                                                           f"{len(movement_job.report)}), ale nepodařilo se uložit "
+                                                           f"soubor výsledků: {movement_job.error}")
+                    else:
+                        messagebox.showwarning("Varování", f"Chyba při zpracování hromadných pohybů, "
+                                                           f"nic nebylo uloženo: {movement_job.error}")
+                elif movement_job.cancelled:
+                    messagebox.showinfo("Informace", "Hromadné pohyby byly zrušeny, nic nebylo uloženo.")
+                else:
+                    messagebox.showinfo("Informace", f"Uloženo {movement_job.saved} z {len(movement_job.report)} "
+                                                     f"pohybů.\nVýsledky jsou v souboru "
+                                                     f"'{movement_job.report_file_name}'.")
+                if movement_job.saved:
+                    self.show_data(self.current_table)
+                return
+            if movement_job.saving:
+                if str(progressbar.cget("mode")) != "indeterminate":
+                    progressbar.config(mode="indeterminate")
+                    progressbar.start(10)
+                    label.config(text=f"Ukládání {movement_job.rows_read} pohybů...")
+                    cancel_button.config(state=tk.DISABLED)
+            elif movement_job.total:
+                progressbar["value"] = 100 * movement_job.processed / movement_job.total
+                label.config(text=f"Načteno {movement_job.rows_read} řádků")
+            self.root.after(100, update_progress)
+
+        self.root.after(100, update_progress)
+
+
     def delete_row(self, evidencni_cislo):
         """
         Vymazání položky vybrané v treeview - pouze nulová poslední zadaná položka.
@@ -305,36 +776,50 @@ class Controller:
         except Exception as e:
             messagebox.showwarning("Varování", f"Chyba při ukládání dat do databáze: {e}!")
             return False
+        self.lookups.on_delete("sklad", evidencni_cislo)
         return True
 
 
-    def add_column_and_set_default(self, new_col_name):
+    def fetch_item_devices(self, id_num):
         """
-        Řídí proces přidání nového sloupce do tabulky 'sklad' a nastavení jeho výchozích hodnot.
+        Získání zkratek zařízení, ve kterých se skladová položka používá.
 
-        :param new_col_name: Název nového sloupce, který má být přidán.
+        :param id_num: Evidenční číslo skladové položky.
+        :return: Seznam zkratek zařízení.
         """
+        return self.model.fetch_item_devices(id_num)
+
+
+    def update_item_devices(self, id_num, devices):
+        """
+        Uložení zařízení, ve kterých se skladová položka používá.
+
+        :param id_num: Evidenční číslo skladové položky.
+        :param devices: Seznam zkratek zaškrtnutých zařízení.
+        :return: True při úspěšném uložení, jinak False.
+        """
+        device_ids = self.fetch_dict("zarizeni")
+        rows = [(id_num, device_id, code in devices) for code, device_id in device_ids.items()]
         try:
-            self.model.add_integer_column_with_default(new_col_name)
-            messagebox.showinfo("Informace",
-                                f"Sloupec {new_col_name} byl úspěšně přidán do tabulky sklad s výchozími hodnotami 0.")
+            self.model.update_device_links(rows)
         except Exception as e:
-            messagebox.showerror("Chyba", f"Nastala chyba při přidávání sloupce {new_col_name}: {e}")
+            messagebox.showwarning("Varování", f"Chyba při ukládání zařízení skladové položky: {e}!")
             return False
         return True
 
 
-    def fetch_data_for_inquiry(self, ids):
+    def fetch_data_for_inquiry(self, ids, id_dodavatele=None):
         """
-        Načte specifická data na základě ID z tabulky varianty a získá odpovídající data ze tabulek varianty a sklad.
+        Načte data pro poptávku pro varianty ze zadaných ID, jejichž skladová položka je pod minimem.
 
         :param ids: Seznam nebo n-tice ID položek z tabulky varianty.
+        :param id_dodavatele: Id dodavatele, pro kterého se poptávka tvoří.
         :return: Seznam n-tic s hodnotami rozdíl 'Min_Mnozstvi_ks' - 'Mnozstvi_ks_m_l', jednotky ,
                  název varianty, číslo varianty pro každou odpovídající položku.
         """
         
         try:
-            data_for_inquiry = self.model.fetch_data_for_inquiry(ids)
+            data_for_inquiry = self.model.fetch_data_for_inquiry(ids, id_dodavatele)
         except Exception as e:
             messagebox.showwarning("Varování", f"Chyba při načítání dat z databáze: {e}!")
             return False
@@ -373,37 +858,210 @@ class Controller:
         webbrowser.open(mailto_link)    
     
 
-    def export_csv(self, table=None, tree=None):
+    def export_csv(self, table=None, tree=None, query=None):
         """
-        Export dat z vybrané tabulky v GUI.
+        Export dat z vybrané tabulky nebo aktuálně vyfiltrovaných dat pohledu do souboru csv,
+        xlsx nebo parquet (podle zvolené přípony). Export běží na pozadí s průběhem a možností zrušení.
         
-        :param table: Název tabulky pro zobrazení.
+        :param table: Název tabulky pro export celé tabulky.
+        :param tree: Treeview, ze kterého se převezmou názvy sloupců.
+        :param query: Instance QueryBuilder s filtry a tříděním aktuálního pohledu.
         """
-        csv_file_name = filedialog.asksaveasfilename(defaultextension=".csv",
-                                                     filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],)
-        if not csv_file_name:
+        file_name = filedialog.asksaveasfilename(defaultextension=".csv",
+                                                 filetypes=[("CSV files", "*.csv"), ("Excel files", "*.xlsx"),
+                                                            ("Parquet files", "*.parquet"), ("All files", "*.*")],)
+        if not file_name:
+            return
+        missing_module = ExportJob.missing_module(file_name)
+        if missing_module:
+            messagebox.showwarning("Upozornění", f"Pro export do zvoleného formátu je potřeba nainstalovat "
+                                                 f"knihovnu {missing_module}.")
             return
 
-        if tree:
-            col_ids = tree["columns"]
-            col_names = [tree.heading(col)["text"] for col in col_ids]
-            data = [tree.item(item)["values"] for item in tree.get_children()]
-        elif table:    
-            col_names = self.model.fetch_col_names(table)
-            data = self.model.fetch_data(table)
+        attached = {}
+        if query is not None:
+            attached = query.attached
+            sql_query, params = query.build()
+            count_query = query.build_count()
+            if tree:
+                headers = [tree.heading(col)["text"] for col in tree["columns"]]
+            else:
+                headers = list(query.col_names)
+            table_col_types = self.model.schema.col_types(query.tables[0])
+            col_types = [table_col_types.get(col, "") for col in query.col_names]
+        elif table:
+            sql_query, params = f"SELECT {self.model.select_columns(table)} FROM {table}", ()
+            count_query = (f"SELECT COUNT(*) FROM {table}", ())
+            headers = self.model.fetch_col_names(table)
+            table_col_types = self.model.schema.col_types(table)
+            col_types = [table_col_types[col] for col in headers]
         else:
-            messagebox.showwarning("Upozornění", "Nebyla vybrána tabulka ani tree pro export.")
+            messagebox.showwarning("Upozornění", "Nebyla vybrána tabulka ani pohled pro export.")
             return
 
+        export_job = ExportJob(self.db_path, file_name, sql_query, params, headers, count_query, col_types,
+                               attached=attached)
+        export_job.start()
+        self.show_export_progress(export_job)
+
+
+    def show_export_progress(self, export_job):
+        """
+        Zobrazení okna s průběhem exportu a tlačítkem pro zrušení, po dokončení výsledek exportu.
+
+        :param export_job: Spuštěná instance ExportJob.
+        """
+        window = tk.Toplevel(self.root)
+        window.title("Export dat")
+        window.transient(self.root)
+        window.resizable(False, False)
+        label = tk.Label(window, text="Probíhá export dat...", width=45)
+        label.pack(padx=10, pady=5)
+        progressbar = ttk.Progressbar(window, length=300, mode="determinate", maximum=100)
+        progressbar.pack(padx=10, pady=5)
+        tk.Button(window, text="Zrušit", command=export_job.cancel).pack(pady=5)
+        window.protocol("WM_DELETE_WINDOW", export_job.cancel)
+
+        def update_progress():
+            if export_job.done:
+                window.destroy()
+                if export_job.error is not None:
+                    messagebox.showerror("Chyba při exportu", f"Nastala chyba při exportu dat: {export_job.error}")
+                elif export_job.cancelled:
+                    messagebox.showinfo("Export zrušen", "Export dat byl zrušen.")
+                else:
+                    messagebox.showinfo("Export dokončen", f"Data byla úspěšně exportována do souboru "
+                                                          f"'{export_job.file_name}'.")
+                return
+            if export_job.total:
+                progressbar["value"] = 100 * export_job.written / export_job.total
+                label.config(text=f"Exportováno {export_job.written} z {export_job.total} řádků")
+            self.root.after(100, update_progress)
+
+        self.root.after(100, update_progress)
+
+
+
+    def import_csv(self, table):
+        """
+        Hromadný import dat ze souboru csv do tabulky. Import běží na pozadí s průběhem a možností
+        zrušení, odmítnuté řádky se uloží s důvodem do souboru vedle importovaného souboru.
+
+        :param table: Název tabulky, do které se importuje.
+        """
+        if table not in CommonResources.import_tables:
+            messagebox.showwarning("Upozornění", f"Do tabulky {table} nelze importovat data.")
+            return
+        file_name = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+        if not file_name:
+            return
+        import_job = ImportJob(self.db_path, file_name, table)
+        import_job.start()
+        self.show_import_progress(import_job)
+
+
+    def show_import_progress(self, import_job):
+        """
+        Zobrazení okna s průběhem importu a tlačítkem pro zrušení, po dokončení výsledek importu
+        a obnovení zobrazených dat.
+
+        :param import_job: Spuštěná instance ImportJob.
+        """
+        window = tk.Toplevel(self.root)
+        window.title("Import dat")
+        window.transient(self.root)
+        window.resizable(False, False)
+        label = tk.Label(window, text="Probíhá import dat...", width=45)
+        label.pack(padx=10, pady=5)
+        progressbar = ttk.Progressbar(window, length=300, mode="determinate", maximum=100)
+        progressbar.pack(padx=10, pady=5)
+        tk.Button(window, text="Zrušit", command=import_job.cancel).pack(pady=5)
+        window.protocol("WM_DELETE_WINDOW", import_job.cancel)
+
+        def update_progress():
+            if import_job.done:
+                window.destroy()
+                result = f"Uloženo {import_job.imported} řádků, odmítnuto {import_job.rejected} řádků."
+                if import_job.rejected:
+                    result += f"\nOdmítnuté řádky s důvodem jsou v souboru '{import_job.reject_file_name}'."
+                if import_job.error is not None:
+                    messagebox.showerror("Chyba při importu", f"Nastala chyba při importu dat: {import_job.error}\n{result}")
+                elif import_job.cancelled:
+                    messagebox.showinfo("Import zrušen", f"Import dat byl zrušen.\n{result}")
+                else:
+                    messagebox.showinfo("Import dokončen", result)
+                if import_job.imported:
+                    self.show_data(import_job.table)
+                return
+            if import_job.total:
+                progressbar["value"] = 100 * import_job.processed / import_job.total
+                label.config(text=f"Zpracováno {import_job.rows_read} řádků, odmítnuto {import_job.rejected}")
+            self.root.after(100, update_progress)
+
+        self.root.after(100, update_progress)
+
+
+    def export_report(self, headers, rows):
+        """
+        Export zobrazeného přehledu do souboru csv.
+
+        :param headers: Názvy sloupců pro hlavičku.
+        :param rows: Řádky přehledu.
+        """
+        file_name = filedialog.asksaveasfilename(defaultextension=".csv",
+                                                 filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+        if not file_name:
+            return
         try:
-            with open(csv_file_name, mode='w', newline='', encoding='utf-8') as csv_file:
-                csv_writer = csv.writer(csv_file)    
-                csv_writer.writerow(col_names)
-                for row in data:
-                    csv_writer.writerow(row)
-            messagebox.showinfo("Export dokončen", f"Data byla úspěšně exportována do souboru '{csv_file_name}'.")
-        except Exception as e:
-            messagebox.showerror("Chyba při exportu", f"Nastala chyba při exportu dat: {e}")
+            with open(file_name, mode='w', newline='', encoding='utf-8') as csv_file:
+                csv_writer = csv.writer(csv_file)
+                csv_writer.writerow(headers)
+                csv_writer.writerows(rows)
+        except OSError as e:
+            messagebox.showerror("Chyba při exportu", f"Nastala chyba při exportu přehledu: {e}")
+            return
+        messagebox.showinfo("Export dokončen", f"Přehled byl úspěšně exportován do souboru '{file_name}'.")
+
+
+    def fetch_audit_archive_years(self):
+        """
+        Získání seznamu archivovaných roků audit_logu.
+
+        :return: Seřazený seznam archivovaných roků.
+        """
+        return sorted(AuditArchive(self.model).archived_years())
+
+
+    def archive_audit_log(self):
+        """
+        Přesun uzavřených roků audit_logu do archivních souborů vedle databáze po potvrzení uživatelem.
+        Archivované roky lze dál zobrazit výběrem měsíce v pohledu audit_log.
+        """
+        if self.current_role != "admin":
+            messagebox.showwarning("Upozornění", "Archivaci audit logu může provést jen administrátor.")
+            return
+        audit_archive = AuditArchive(self.model)
+        try:
+            years = audit_archive.archivable_years()
+        except sqlite3.Error as e:
+            messagebox.showwarning("Varování", f"Chyba při načítání dat z databáze: {e}!")
+            return
+        if not years:
+            messagebox.showinfo("Archivace audit logu", "Audit log neobsahuje žádné uzavřené roky k archivaci.")
+            return
+        years_text = ", ".join(str(year) for year in years)
+        if not messagebox.askyesno("Archivace audit logu", f"Přesunout záznamy audit logu z roků {years_text} "
+                                                          f"do archivních souborů?"):
+            return
+        try:
+            archived = audit_archive.archive_closed_years()
+        except sqlite3.Error as e:
+            messagebox.showwarning("Varování", f"Chyba při archivaci audit logu: {e}!")
+            return
+        result = "\n".join(f"{year}: {count} záznamů" for year, count in archived.items())
+        messagebox.showinfo("Archivace audit logu", f"Archivováno:\n{result}")
+        if self.current_table == "audit_log":
+            self.current_view_instance.load_data()
 
             
 if __name__ == "__main__":
@@ -414,3 +1072,7 @@ if __name__ == "__main__":
     controller = Controller(root, db_file)
     controller.start_login()
     root.mainloop()
+    if controller.data_worker is not None:
+        controller.data_worker.stop()
+    if controller.profiler.enabled and os.environ.get(Profiler.env_var):
+        controller.profiler.dump(os.getcwd())
@@ -0,0 +1,226 @@
+from datetime import datetime
+
+from auditarchive import AuditArchive
+from operationdate import OperationDateIndex
+
+class StockAnalytics:
+    """
+    Třída StockAnalytics počítá měsíční přehledy z audit_logu a tabulky sklad - hodnotu skladu
+    na konci měsíce, spotřebu podle použitého zařízení a nákupy podle dodavatelů.
+    Součty se počítají dotazy GROUP BY nad indexovaným datem operace (včetně archivů audit_logu).
+    Výsledky uzavřených měsíců se ukládají do tabulek reporty_mesice a reporty_hodnoty a znovu se
+    počítají jen měsíce, do kterých od posledního výpočtu přibyly záznamy (podle nejvyššího id
+    audit_logu). Aktuální (otevřený) měsíc se počítá vždy znovu.
+    """
+    months_table = "reporty_mesice"
+    values_table = "reporty_hodnoty"
+    aggregates = {
+        "zmena_hodnoty": ("1", "''", 1),
+        "zarizeni": ("Typ_operace = 'VÝDEJ'", "COALESCE(Pouzite_zarizeni, '')", -1),
+        "dodavatele": ("Typ_operace = 'PŘÍJEM'", "COALESCE(Dodavatel, '')", 1),
+        }
+    report_columns = {
+        "hodnota": ("Mesic", "Prijem_EUR", "Vydej_EUR", "Zmena_hodnoty_EUR", "Hodnota_skladu_EUR"),
+        "zarizeni": ("Mesic", "Pouzite_zarizeni", "Mnozstvi", "Hodnota_EUR", "Pocet_operaci"),
+        "dodavatele": ("Mesic", "Dodavatel", "Mnozstvi", "Hodnota_EUR", "Pocet_operaci"),
+        }
+
+    def __init__(self, model):
+        """
+        Inicializace výpočtu přehledů.
+
+        :param model: Instance třídy Model s připojením k databázi a registrem schématu.
+        """
+        self.model = model
+        self.conn = model.conn
+        self.archive = AuditArchive(model)
+
+
+    def create_tables(self):
+        """
+        Vytvoří tabulky pro uložené výsledky uzavřených měsíců, pokud neexistují.
+        """
+        if self.model.schema.has_table(self.months_table) and self.model.schema.has_table(self.values_table):
+            return
+        self.conn.execute(f"CREATE TABLE IF NOT EXISTS {self.months_table} ("
+                          "Mesic TEXT PRIMARY KEY, Posledni_id INTEGER NOT NULL, Cas_vypoctu TEXT)")
+        self.conn.execute(f"CREATE TABLE IF NOT EXISTS {self.values_table} ("
+                          "Mesic TEXT NOT NULL, Report TEXT NOT NULL, Klic TEXT NOT NULL, "
+                          "Mnozstvi REAL, Hodnota_EUR REAL, Pocet_operaci INTEGER, "
+                          "PRIMARY KEY (Mesic, Report, Klic)) WITHOUT ROWID")
+        self.conn.commit()
+        self.model.schema.load()
+
+
+    @staticmethod
+    def current_month():
+        """
+        Vrátí aktuální (otevřený) měsíc ve formátu RRRR-MM.
+        """
+        return datetime.now().strftime("%Y-%m")
+
+
+    @staticmethod
+    def month_range(first_month, last_month):
+        """
+        Vrátí seznam měsíců RRRR-MM od first_month do last_month včetně.
+        """
+        year, month = map(int, first_month.split("-"))
+        last_year, last_month_num = map(int, last_month.split("-"))
+        months = []
+        while (year, month) <= (last_year, last_month_num):
+            months.append(f"{year:04d}-{month:02d}")
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return months
+
+
+    def date_col(self):
+        """
+        Vrátí výraz s datem operace, podle kterého má audit_log index.
+        """
+        return OperationDateIndex.expression
+
+
+    def first_month(self):
+        """
+        Vrátí první měsíc s pohybem v audit_logu (včetně archivovaných roků) nebo None.
+        """
+        date_col = self.date_col()
+        first_date = self.conn.execute(f"SELECT MIN({date_col}) FROM audit_log "
+                                       f"WHERE {date_col} IS NOT NULL").fetchone()[0]
+        archived_years = self.archive.archived_years()
+        if archived_years:
+            archived_first = f"{min(archived_years)}-01"
+            if first_date is None or archived_first < first_date[:7]:
+                return archived_first
+        return first_date[:7] if first_date else None
+
+
+    def aggregate(self, first_month, last_month):
+        """
+        Spočítá součty všech přehledů po měsících v rozmezí měsíců dotazy GROUP BY nad audit_logem
+        a archivy, které do rozmezí zasahují. Rozmezí se počítá po úsecích let, aby počet připojených
+        archivů v jednom dotazu nepřekročil limit SQLite.
+
+        :return: Seznam n-tic (měsíc, přehled, klíč, množství, hodnota EUR, počet operací).
+        """
+        date_col = self.date_col()
+        chunk_years = self.archive.max_attached()
+        first_year, last_year = int(first_month[:4]), int(last_month[:4])
+        rows = []
+        for year in range(first_year, last_year + 1, chunk_years):
+            start_date = f"{first_month}-01" if year == first_year else f"{year}-01-01"
+            end_year = year + chunk_years - 1
+            end_date = f"{last_month}-31" if end_year >= last_year else f"{end_year}-12-31"
+            source, _ = self.archive.partition_query(start_date, end_date)
+            for report, (condition, key_expr, sign) in self.aggregates.items():
+                rows.extend(self.conn.execute(
+                    f"SELECT substr({date_col}, 1, 7) AS Mesic, ?, {key_expr}, "
+                    f"{sign} * TOTAL(Zmena_mnozstvi), ROUND({sign} * TOTAL(Celkova_cena_EUR), 2), COUNT(*) "
+                    f"FROM ({source}) WHERE {date_col} BETWEEN ? AND ? AND {condition} "
+                    f"GROUP BY Mesic, {key_expr}", (report, start_date, end_date)).fetchall())
+        return rows
+
+
+    def refresh(self):
+        """
+        Doplní uložené výsledky uzavřených měsíců - spočítá chybějící měsíce a znovu spočítá
+        měsíce, do kterých od posledního výpočtu přibyly záznamy audit_logu.
+
+        :return: Seznam znovu spočítaných měsíců.
+        """
+        self.create_tables()
+        date_col = self.date_col()
+        max_id = self.conn.execute("SELECT MAX(id) FROM audit_log").fetchone()[0] or 0
+        last_id = self.conn.execute(f"SELECT MAX(Posledni_id) FROM {self.months_table}").fetchone()[0]
+        current_month = self.current_month()
+        first_month = self.first_month()
+        if first_month is None or first_month >= current_month:
+            return []
+
+        dirty = []
+        if last_id is not None and max_id > last_id:
+            dirty = [row[0] for row in self.conn.execute(
+                f"SELECT DISTINCT substr({date_col}, 1, 7) FROM audit_log WHERE id > ? AND {date_col} < ?",
+                (last_id, f"{current_month}-01"))]
+        cached = {row[0] for row in self.conn.execute(f"SELECT Mesic FROM {self.months_table}")} - set(dirty)
+        missing = [month for month in self.month_range(first_month, current_month)[:-1] if month not in cached]
+        rows = []
+        if missing:
+            missing_set = set(missing)
+            rows = [row for row in self.aggregate(missing[0], missing[-1]) if row[0] in missing_set]
+
+        with self.model.transaction():
+            for month in dirty:
+                self.conn.execute(f"DELETE FROM {self.values_table} WHERE Mesic = ?", (month,))
+            self.conn.executemany(f"INSERT OR REPLACE INTO {self.values_table} (Mesic, Report, Klic, Mnozstvi, "
+                                  f"Hodnota_EUR, Pocet_operaci) VALUES (?, ?, ?, ?, ?, ?)", rows)
+            computed_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self.conn.executemany(f"INSERT OR REPLACE INTO {self.months_table} (Mesic, Posledni_id, Cas_vypoctu) "
+                                  f"VALUES (?, ?, ?)", [(month, max_id, computed_at) for month in missing])
+            if last_id != max_id:
+                self.conn.execute(f"UPDATE {self.months_table} SET Posledni_id = ?", (max_id,))
+            self.model.commit(self.months_table, self.values_table)
+        return missing
+
+
+    def monthly_values(self, report):
+        """
+        Vrátí součty přehledu po měsících - uložené uzavřené měsíce a aktuálně spočítaný otevřený měsíc.
+
+        :param report: Název přehledu z StockAnalytics.aggregates.
+        :return: Seznam n-tic (měsíc, klíč, množství, hodnota EUR, počet operací) seřazený podle měsíce a klíče.
+        """
+        current_month = self.current_month()
+        rows = self.conn.execute(f"SELECT Mesic, Klic, Mnozstvi, Hodnota_EUR, Pocet_operaci FROM {self.values_table} "
+                                 f"WHERE Report = ? AND Mesic < ? ORDER BY Mesic, Klic",
+                                 (report, current_month)).fetchall()
+        open_rows = [row[:1] + row[2:] for row in self.aggregate(current_month, current_month) if row[1] == report]
+        return rows + sorted(open_rows)
+
+
+    def stock_value(self):
+        """
+        Vrátí hodnotu skladu na konci každého měsíce. Hodnota se počítá zpětně od aktuální
+        celkové hodnoty skladu odečtením změn hodnoty (příjmy a výdeje) pozdějších měsíců.
+
+        :return: Seznam n-tic (měsíc, příjem EUR, výdej EUR, změna hodnoty EUR, hodnota skladu EUR).
+        """
+        changes = {month: value for month, _, _, value, _ in self.monthly_values("zmena_hodnoty")}
+        receipts = {}
+        for month, _, _, value, _ in self.monthly_values("dodavatele"):
+            receipts[month] = receipts.get(month, 0.0) + value
+        issues = {}
+        for month, _, _, value, _ in self.monthly_values("zarizeni"):
+            issues[month] = issues.get(month, 0.0) + value
+        current_value = self.conn.execute("SELECT TOTAL(Celkova_cena_EUR) FROM sklad").fetchone()[0]
+        first_month = self.first_month()
+        if first_month is None:
+            return []
+        rows = []
+        value = current_value
+        for month in reversed(self.month_range(first_month, self.current_month())):
+            change = changes.get(month, 0.0)
+            rows.append((month, round(receipts.get(month, 0.0), 2), round(issues.get(month, 0.0), 2),
+                         round(change, 2), round(value, 2)))
+            value -= change
+        rows.reverse()
+        return rows
+
+
+    def report(self, report, year=None):
+        """
+        Vrátí řádky přehledu pro zobrazení - před výpočtem doplní uložené výsledky uzavřených měsíců.
+
+        :param report: 'hodnota', 'zarizeni' nebo 'dodavatele'.
+        :param year: Rok (text RRRR) pro omezení na jeden rok, pokud None, vrátí se všechny měsíce.
+        :return: N-tice (názvy sloupců, seznam řádků).
+        """
+        self.refresh()
+        if report == "hodnota":
+            rows = self.stock_value()
+        else:
+            rows = self.monthly_values(report)
+        if year:
+            rows = [row for row in rows if row[0].startswith(f"{year}-")]
+        return self.report_columns[report], rows
@@ -0,0 +1,236 @@
+import os
+import sqlite3
+from datetime import datetime
+
+from commonresources import CommonResources
+from operationdate import OperationDateIndex
+
+class AuditArchive:
+    """
+    Třída AuditArchive přesouvá uzavřené roky z tabulky audit_log do archivních databázových souborů
+    (jeden soubor pro každý rok vedle hlavní databáze), takže tabulka audit_log obsahuje jen
+    posledních několik let. Archivované roky jsou zapsané v tabulce audit_log_archiv. Archivní soubory
+    se připojují (ATTACH) k připojení, které se na archivovaný rok dotazuje, a dotaz pohledu audit_log
+    pak čte tabulku audit_log spojenou s archivy roků ve zvoleném rozmezí datumů.
+    """
+    table = "audit_log"
+    registry_table = "audit_log_archiv"
+
+    def __init__(self, model):
+        """
+        Inicializace správce archivu.
+
+        :param model: Instance třídy Model s připojením k databázi a registrem schématu.
+        """
+        self.model = model
+        self.conn = model.conn
+        self.db_dir, db_file = os.path.split(os.path.abspath(model.db))
+        self.db_stem = os.path.splitext(db_file)[0]
+
+
+    @staticmethod
+    def schema_name(year):
+        """
+        Vrátí název, pod kterým se archivní soubor roku připojuje k databázi.
+        """
+        return f"audit_log_{int(year)}"
+
+
+    def file_name(self, year):
+        """
+        Vrátí název archivního souboru roku (bez cesty, soubor leží vedle hlavní databáze).
+        """
+        return f"{self.db_stem}_audit_log_{int(year)}.db"
+
+
+    def create_registry(self):
+        """
+        Vytvoří tabulku se seznamem archivovaných roků, pokud neexistuje.
+        """
+        if self.model.schema.has_table(self.registry_table):
+            return
+        self.conn.execute(f"CREATE TABLE IF NOT EXISTS {self.registry_table} ("
+                          "Rok INTEGER PRIMARY KEY, Soubor TEXT NOT NULL, "
+                          "Pocet_zaznamu INTEGER NOT NULL DEFAULT 0, Cas_archivace TEXT)")
+        self.conn.commit()
+        self.model.schema.load()
+
+
+    def archived_years(self):
+        """
+        Vrátí slovník archivovaný rok -> cesta k archivnímu souboru.
+        """
+        if not self.model.schema.has_table(self.registry_table):
+            return {}
+        rows = self.conn.execute(f"SELECT Rok, Soubor FROM {self.registry_table} ORDER BY Rok").fetchall()
+        return {year: os.path.join(self.db_dir, file_name) for year, file_name in rows}
+
+
+    def date_col(self):
+        """
+        Vrátí výraz s datem záznamu pro tabulku audit_log, podle kterého má tabulka i archivy index.
+        """
+        return OperationDateIndex.expression
+
+
+    def hot_from_year(self):
+        """
+        Vrátí první rok, který zůstává v tabulce audit_log (počet let podle CommonResources.audit_log_hot_years).
+        """
+        return datetime.now().year - max(CommonResources.audit_log_hot_years, 1) + 1
+
+
+    def archivable_years(self):
+        """
+        Vrátí seznam uzavřených roků, které mají v tabulce audit_log záznamy a už nepatří
+        do ponechaného rozmezí let.
+        """
+        date_col = self.date_col()
+        rows = self.conn.execute(f"SELECT DISTINCT CAST(substr({date_col}, 1, 4) AS INTEGER) FROM {self.table} "
+                                 f"WHERE {date_col} < ? ORDER BY 1", (f"{self.hot_from_year()}-01-01",)).fetchall()
+        return [row[0] for row in rows]
+
+
+    def attach(self, years):
+        """
+        Připojí archivní soubory roků k připojení modelu, ostatní připojené archivy se odpojí.
+
+        :param years: Seznam roků.
+        :return: Slovník název připojeného schématu -> cesta k archivnímu souboru.
+        """
+        databases = {self.schema_name(year): os.path.join(self.db_dir, self.file_name(year)) for year in years}
+        self.model.attach_databases(databases)
+        return databases
+
+
+    def archive_columns(self, schema):
+        """
+        Vrátí názvy sloupců tabulky audit_log v připojeném archivu.
+        """
+        return [row[1] for row in self.conn.execute(f'PRAGMA "{schema}".table_info("{self.table}")')]
+
+
+    def prepare_archive_table(self, schema):
+        """
+        Vytvoří v archivu tabulku audit_log se sloupci hlavní tabulky, případně do existující
+        archivní tabulky doplní sloupce, které do hlavní tabulky přibyly. Archiv dostane index
+        podle výrazu data operace, který se použije při filtraci rozmezí datumů.
+        """
+        col_types = self.model.schema.col_types(self.table)
+        primary_key = self.model.schema.primary_key(self.table)
+        archive_cols = self.archive_columns(schema)
+        if not archive_cols:
+            col_defs = [f'"{col}" {col_type}' + (" PRIMARY KEY" if (col,) == primary_key else "")
+                        for col, col_type in col_types.items()]
+            self.conn.execute(f'CREATE TABLE "{schema}"."{self.table}" ({", ".join(col_defs)})')
+        else:
+            for col, col_type in col_types.items():
+                if col not in archive_cols:
+                    self.conn.execute(f'ALTER TABLE "{schema}"."{self.table}" ADD COLUMN "{col}" {col_type}')
+        self.conn.execute(f'CREATE INDEX IF NOT EXISTS "{schema}"."{OperationDateIndex.index_name}" '
+                          f'ON "{self.table}" ({OperationDateIndex.expression})')
+
+
+    def archive_year(self, year):
+        """
+        Přesune záznamy roku z tabulky audit_log do archivního souboru roku ve dvou transakcích.
+        Záznamy se nejdřív zkopírují do archivu (INSERT OR IGNORE podle id, takže opakování po
+        přerušení nic nezdvojí) a kopie se potvrdí. Po ověření, že archiv obsahuje všechny záznamy
+        roku, se záznamy v druhé transakci smažou z hlavní tabulky. SQLite v režimu WAL nezaručuje
+        atomický commit přes více připojených souborů, při přerušení mezi transakcemi proto záznamy
+        zůstanou v obou souborech a opakovaná archivace je jen smaže z hlavní tabulky.
+
+        :param year: Archivovaný rok.
+        :return: Počet přesunutých záznamů.
+        :raises sqlite3.IntegrityError: Pokud archiv po zkopírování neobsahuje všechny záznamy roku.
+        """
+        self.create_registry()
+        schema = self.schema_name(year)
+        self.attach([year])
+        self.prepare_archive_table(schema)
+        self.conn.commit()
+        cols = ", ".join(f'"{col}"' for col in self.model.fetch_col_names(self.table))
+        condition = f"{self.date_col()} BETWEEN ? AND ?"
+        params = (f"{year}-01-01", f"{year}-12-31")
+        with self.model.transaction():
+            self.conn.execute(f'INSERT OR IGNORE INTO "{schema}"."{self.table}" ({cols}) '
+                              f'SELECT {cols} FROM main."{self.table}" WHERE {condition}', params)
+        missing = self.conn.execute(f'SELECT COUNT(*) FROM main."{self.table}" AS m WHERE {condition} '
+                                    f'AND NOT EXISTS (SELECT 1 FROM "{schema}"."{self.table}" AS a '
+                                    f'WHERE a.id = m.id)', params).fetchone()[0]
+        if missing:
+            raise sqlite3.IntegrityError(f"Archiv roku {year} neobsahuje {missing} záznamů audit logu, "
+                                         f"záznamy nebyly z audit logu smazány.")
+        with self.model.transaction():
+            moved = self.conn.execute(f'DELETE FROM main."{self.table}" WHERE {condition}', params).rowcount
+            self.conn.execute(f"INSERT INTO {self.registry_table} (Rok, Soubor, Pocet_zaznamu, Cas_archivace) "
+                              f"VALUES (?, ?, ?, ?) ON CONFLICT (Rok) DO UPDATE SET "
+                              f"Pocet_zaznamu = Pocet_zaznamu + excluded.Pocet_zaznamu, "
+                              f"Cas_archivace = excluded.Cas_archivace",
+                              (year, self.file_name(year), moved, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+            self.model.commit(self.table, self.registry_table)
+        return moved
+
+
+    def archive_closed_years(self):
+        """
+        Archivuje všechny uzavřené roky mimo ponechané rozmezí let.
+
+        :return: Slovník archivovaný rok -> počet přesunutých záznamů.
+        """
+        return {year: self.archive_year(year) for year in self.archivable_years()}
+
+
+    def years_in_range(self, start_date, end_date):
+        """
+        Vrátí archivované roky, které zasahují do rozmezí datumů.
+
+        :param start_date: Počáteční datum ve formátu RRRR-MM-DD.
+        :param end_date: Koncové datum ve formátu RRRR-MM-DD.
+        :return: Slovník rok -> cesta k archivnímu souboru.
+        """
+        first_year, last_year = int(start_date[:4]), int(end_date[:4])
+        return {year: path for year, path in self.archived_years().items()
+                if first_year <= year <= last_year and os.path.exists(path)}
+
+
+    def max_attached(self):
+        """
+        Vrátí nejvyšší počet souborů, které lze najednou připojit k připojení (limit SQLite).
+        """
+        if hasattr(sqlite3, "SQLITE_LIMIT_ATTACHED"):
+            return self.conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+        return 10
+
+
+    def partition_query(self, start_date=None, end_date=None):
+        """
+        Vrátí dotaz na záznamy audit_logu - pokud rozmezí datumů zasahuje do archivovaných roků,
+        spojí (UNION ALL) tabulku audit_log s tabulkami připojených archivů, chybějící sloupce
+        starších archivů se doplní hodnotou NULL. Archivy mají index podle stejného výrazu s datem
+        operace jako tabulka audit_log.
+
+        :param start_date: Počáteční datum ve formátu RRRR-MM-DD nebo None (jen tabulka audit_log).
+        :param end_date: Koncové datum ve formátu RRRR-MM-DD.
+        :return: N-tice (text dotazu, slovník připojených schémat -> cesta k souboru).
+        :raises ValueError: Pokud rozmezí zasahuje do více archivovaných roků, než lze najednou připojit.
+        """
+        query = f"SELECT * FROM {self.table}"
+        if not start_date:
+            return query, {}
+        years = self.years_in_range(start_date, end_date or start_date)
+        if len(years) > self.max_attached():
+            raise ValueError(f"Rozmezí zasahuje do {len(years)} archivovaných roků audit logu, "
+                             f"najednou lze zobrazit nejvýše {self.max_attached()} archivovaných roků.")
+        parts = [f"SELECT * FROM main.{self.table}"]
+        attached = self.attach(years)
+        for schema in attached:
+            archive_cols = self.archive_columns(schema)
+            cols = [f'"{col}"' if col in archive_cols else f'NULL AS "{col}"'
+                    for col in self.model.fetch_col_names(self.table)]
+            cols.extend(f'NULL AS "{col}"' for col in self.model.schema.generated_columns(self.table))
+            cols = ", ".join(cols)
+            parts.append(f'SELECT {cols} FROM "{schema}"."{self.table}"')
+        if not attached:
+            return query, {}
+        return " UNION ALL ".join(parts), attached
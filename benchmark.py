@@ -0,0 +1,313 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from datagenerator import DataGenerator
+from devicelinks import DeviceLinks
+from lowstock import LowStockIndex
+from model import Model
+from operationdate import OperationDateIndex
+from schemaoptimizer import SchemaOptimizer
+from searchindex import SearchIndex
+
+SCALES = {
+    "small": {"sklad_items": 1000, "audit_rows": 20000},
+    "medium": {"sklad_items": 10000, "audit_rows": 200000},
+    "large": {"sklad_items": 100000, "audit_rows": 2000000},
+    }
+
+
+def prepare_database(db_file):
+    """
+    Provede na databázi stejnou údržbu schématu jako Controller při startu aplikace
+    (vazby zařízení, generované sloupce, indexy, fulltextové indexy) a dokončí převod sloupců
+    zařízení na vazby (bez zálohy, databáze je syntetická).
+    """
+    model = Model(db_file, use_cache=False)
+    DeviceLinks(model).ensure()
+    DeviceLinks(model).drop_legacy_columns(backup=False)
+    LowStockIndex(model).ensure()
+    OperationDateIndex(model).ensure()
+    SchemaOptimizer(model).optimize()
+    SearchIndex(model).ensure()
+    del model
+
+
+def time_case(func, repeat):
+    """
+    Změří opakovaně dobu volání funkce.
+
+    :param func: Měřená funkce bez parametrů, vrací výsledek pro určení počtu řádků.
+    :param repeat: Počet opakování.
+    :return: Slovník s mediánem, minimem a maximem v milisekundách a počtem řádků výsledku.
+    """
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - start) * 1000)
+    rows = len(result) if isinstance(result, (list, tuple)) else None
+    return {"median_ms": round(statistics.median(timings), 3), "min_ms": round(min(timings), 3),
+            "max_ms": round(max(timings), 3), "repeat": repeat, "rows": rows}
+
+
+def model_cases(model, search_index, end_date):
+    """
+    Vrátí měřené případy nad modelem - čtení pohledů, filtraci a třídění v SQL, stránkování
+    podle id, přehledy a zápisy. Zapisující případy jsou na konci, aby neovlivnily čtení.
+
+    :param end_date: Poslední den historie pohybů syntetické databáze (RRRR-MM-DD), jeho měsíc
+                     se čte v případu audit_log_month.
+    :return: Seznam n-tic (název případu, funkce bez parametrů).
+    """
+    id_num = model.get_max_id("sklad", "Evidencni_cislo") // 2 or 1
+    audit_cols = model.fetch_col_names("audit_log")[1:]
+    audit_row = model.conn.execute(f"SELECT {', '.join(audit_cols)} FROM audit_log LIMIT 1").fetchone()
+    month = end_date[:7]
+    device_id = model.conn.execute("SELECT id FROM zarizeni ORDER BY id").fetchone()[0]
+
+    def sklad_query(search="", order="Evidencni_cislo", flags=(), device=None):
+        query = model.create_query("sklad", search_index)
+        query.search(search)
+        query.flags(list(flags))
+        if device is not None:
+            query.linked("Evidencni_cislo", "sklad_zarizeni", "id_sklad", "id_zarizeni", device)
+        query.order_by(order, True)
+        return query
+
+    def first_page(query):
+        ids = model.fetch_query_ids(query)
+        return model.fetch_rows_by_ids(query, ids[:1000])
+
+    def audit_month():
+        date_range = (f"{month}-01", f"{month}-31")
+        query = model.create_query("audit_log", search_index, date_range)
+        query.expression_range(OperationDateIndex.expression, OperationDateIndex.source_cols, *date_range)
+        query.order_by("id", True)
+        return first_page(query)
+
+    def insert_batch():
+        with model.transaction():
+            model.insert_many("audit_log", audit_cols, [audit_row] * 500)
+        return [audit_row] * 500
+
+    def save_movements():
+        sklad_ids = model.conn.execute("SELECT Evidencni_cislo FROM sklad ORDER BY Evidencni_cislo "
+                                       "LIMIT 200").fetchall()
+        with model.transaction():
+            for (sklad_id,) in sklad_ids:
+                model.update_row("sklad", sklad_id, "Evidencni_cislo", {"Poznamka": "benchmark"})
+                model.insert_item("audit_log", audit_cols, audit_row)
+        return sklad_ids
+
+    return [
+        ("fetch_sklad_data", model.fetch_sklad_data),
+        ("fetch_varianty_data", model.fetch_varianty_data),
+        ("fetch_data_audit_log", lambda: model.fetch_data("audit_log")),
+        ("sklad_first_page", lambda: first_page(sklad_query())),
+        ("sklad_count", lambda: [model.fetch_query_count(sklad_query())]),
+        ("sklad_sort_nazev", lambda: first_page(sklad_query(order="Nazev_dilu"))),
+        ("sklad_search", lambda: first_page(sklad_query(search="lož"))),
+        ("sklad_search_substring", lambda: first_page(sklad_query(search="m8 1"))),
+        ("sklad_flag_pod_minimem", lambda: first_page(sklad_query(flags=("Pod_minimem",)))),
+        ("sklad_device_filter", lambda: first_page(sklad_query(device=device_id))),
+        ("varianty_first_page", lambda: first_page(model.create_query("varianty", search_index)
+                                                   .order_by("id", True))),
+        ("audit_log_month", audit_month),
+        ("fetch_low_stock_items", model.fetch_low_stock_items),
+        ("fetch_low_stock_variants", model.fetch_low_stock_variants),
+        ("fetch_item_variants", lambda: model.fetch_item_variants("varianty", id_num, "id_sklad")),
+        ("fetch_item_for_editing", lambda: model.fetch_item_for_editing("sklad", id_num, "Evidencni_cislo")),
+        ("fetch_item_devices", lambda: model.fetch_item_devices(id_num)),
+        ("fetch_lookup_pairs", lambda: model.fetch_lookup_pairs("sklad", "Nazev_dilu", "Evidencni_cislo")),
+        ("fetch_report_hodnota", lambda: model.fetch_report("hodnota")[1]),
+        ("fetch_report_zarizeni", lambda: model.fetch_report("zarizeni")[1]),
+        ("get_max_id", lambda: [model.get_max_id("audit_log", "id")]),
+        ("get_max_interne_cislo", lambda: [model.get_max_interne_cislo()]),
+        ("update_row", lambda: model.update_row("sklad", id_num, "Evidencni_cislo",
+                                                {"Poznamka": str(time.perf_counter())})),
+        ("insert_many_audit_log", insert_batch),
+        ("save_movements_200", save_movements),
+        ]
+
+
+def benchmark_model(db_file, repeat, end_date):
+    """
+    Změří všechny případy modelu bez cache modelu, aby každé čtení šlo do SQLite.
+
+    :param end_date: Poslední den historie pohybů syntetické databáze (RRRR-MM-DD).
+
+    :return: Slovník název případu -> výsledek měření.
+    """
+    model = Model(db_file, use_cache=False)
+    search_index = SearchIndex(model)
+    search_index.ensure()
+    results = {}
+    for name, func in model_cases(model, search_index, end_date):
+        results[name] = time_case(func, repeat)
+    del model
+    return results
+
+
+def benchmark_render(db_file, repeat):
+    """
+    Změří zobrazení pohledu skladu ve skrytém okně Tk - sestavení dotazu z filtrů pohledu,
+    první vložení řádků do Treeview, porovnání se stejnými řádky a přeřazení po změně třídění.
+    Bez grafického displeje (Tk nelze spustit) se měření přeskočí, na serveru bez displeje
+    lze spustit pod virtuálním displejem (např. xvfb-run).
+
+    :return: Slovník název případu -> výsledek měření, nebo slovník s důvodem přeskočení.
+    """
+    import tkinter as tk
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        return {"skipped": str(e)}
+    root.withdraw()
+    from MVC_OOP_skladova_databaze import Controller
+    controller = Controller(root, db_file)
+    results = {}
+    try:
+        controller.start_login()
+        view = controller.current_view_instance
+        model = controller.model
+
+        def fetch_page():
+            query = view.build_query()
+            ids = model.fetch_query_ids(query)
+            return model.fetch_rows_by_ids(query, ids[:view.page_size]), ids
+
+        def render_new():
+            view.tree.delete(*view.tree.get_children())
+            view.rendered_rows = {}
+            view.rendered_count = 0
+            view.add_data(rows, total_count=len(ids))
+            root.update_idletasks()
+            return rows
+
+        def render_same():
+            view.add_data(rows, total_count=len(ids))
+            root.update_idletasks()
+            return rows
+
+        rows, ids = fetch_page()
+        results["view_build_query"] = time_case(lambda: [view.build_query()], repeat)
+        results["view_render_new"] = time_case(render_new, repeat)
+        results["view_render_same"] = time_case(render_same, repeat)
+        view.click_col = view.col_names.index("Nazev_dilu")
+        orders = [fetch_page()[0], rows]
+
+        def render_resorted():
+            orders.reverse()
+            view.add_data(orders[0], total_count=len(ids))
+            root.update_idletasks()
+            return orders[0]
+
+        results["view_render_resorted"] = time_case(render_resorted, repeat)
+    finally:
+        if controller.data_worker is not None:
+            controller.data_worker.stop()
+        root.destroy()
+    return results
+
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """
+    Porovná výsledky s uloženými výsledky a vrátí seznam zhoršení nad povolenou mez.
+    Zhoršení se hlásí, pokud je medián delší o více než threshold (poměr) a zároveň
+    o více než min_delta_ms milisekund, aby šum krátkých případů nezpůsobil chybu.
+
+    :param results: Slovník výsledků (měřítko -> případ -> měření).
+    :param baseline: Slovník uložených výsledků ve stejném tvaru.
+    :return: Seznam textových popisů zhoršení.
+    """
+    regressions = []
+    for scale, cases in results.items():
+        for name, current in cases.items():
+            previous = baseline.get(scale, {}).get(name)
+            if not isinstance(current, dict) or not isinstance(previous, dict):
+                continue
+            if "median_ms" not in current or "median_ms" not in previous:
+                continue
+            old, new = previous["median_ms"], current["median_ms"]
+            if new > old * (1 + threshold) and new - old > min_delta_ms:
+                regressions.append(f"{scale}/{name}: {old:.2f} ms -> {new:.2f} ms (+{(new / old - 1) * 100:.0f} %)"
+                                   if old else f"{scale}/{name}: {old:.2f} ms -> {new:.2f} ms")
+    return regressions
+
+
+def main():
+    """
+    Vytvoří syntetické databáze zvolených měřítek, změří model a zobrazení pohledu, zapíše
+    výsledky do JSON a při zadaném souboru s předchozími výsledky skončí chybou při zhoršení.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark dotazů modelu a zobrazení pohledů skladu.")
+    parser.add_argument("--scales", nargs="+", choices=SCALES, default=["small"])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--end-date", default=DataGenerator.default_end_date,
+                        help="Poslední den historie pohybů syntetických databází (RRRR-MM-DD).")
+    parser.add_argument("--output", default="benchmark_results.json", help="Soubor JSON s výsledky.")
+    parser.add_argument("--baseline", default=None, help="Soubor JSON s předchozími výsledky pro porovnání.")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Povolené zhoršení mediánu jako poměr (0.25 = o 25 %%).")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0,
+                        help="Minimální zhoršení v ms, menší rozdíly se považují za šum.")
+    parser.add_argument("--no-render", action="store_true", help="Neměřit zobrazení pohledů v Tk.")
+    parser.add_argument("--workdir", default=None, help="Adresář pro syntetické databáze.")
+    args = parser.parse_args()
+
+    if args.workdir:
+        os.makedirs(args.workdir, exist_ok=True)
+    workdir = tempfile.mkdtemp(dir=args.workdir)
+    results = {}
+    try:
+        for scale in args.scales:
+            db_file = os.path.join(workdir, f"benchmark_{scale}.db")
+            start = time.perf_counter()
+            DataGenerator(args.seed, end_date=args.end_date, **SCALES[scale]).generate(db_file)
+            prepare_database(db_file)
+            print(f"{scale}: databáze vytvořena za {time.perf_counter() - start:.1f} s")
+            results[scale] = benchmark_model(db_file, args.repeat, args.end_date)
+            if not args.no_render:
+                render = benchmark_render(db_file, args.repeat)
+                if "skipped" in render:
+                    print(f"{scale}: zobrazení přeskočeno ({render['skipped']})")
+                    results[scale]["view_render"] = render
+                else:
+                    results[scale].update(render)
+            for name, result in results[scale].items():
+                if "median_ms" in result:
+                    print(f"{scale:7} {name:28} {result['median_ms']:10.2f} ms  řádků {result['rows']}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = {"meta": {"time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "python": platform.python_version(),
+                       "sqlite": sqlite3.sqlite_version, "platform": platform.platform(), "seed": args.seed,
+                       "end_date": args.end_date, "repeat": args.repeat,
+                       "scales": {scale: SCALES[scale] for scale in args.scales}},
+              "results": results}
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(output, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+        for regression in regressions:
+            print(f"Zhoršení: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from commonresources import CommonResources
+from model import Model
+
+def time_calls(func, iterations):
+    """
+    Změří průměrnou dobu volání funkce v milisekundách.
+
+    :param func: Měřená funkce bez parametrů.
+    :param iterations: Počet opakování.
+    """
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) * 1000 / iterations
+
+
+def benchmark_profile(db_file, profile, iterations):
+    """
+    Změří latenci čtení (fetch_sklad_data) a zápisu (update_row) pro jeden profil připojení.
+    Měří se bez cache modelu, aby každé čtení šlo do SQLite.
+
+    :param db_file: Cesta ke kopii databáze.
+    :param profile: Název profilu z CommonResources.db_connection_profiles.
+    :param iterations: Počet opakování každé operace.
+    :return: Slovník s nastavením připojení a naměřenými latencemi.
+    """
+    model = Model(db_file, use_cache=False, profile=profile)
+    evidencni_cislo = model.get_max_id("sklad", "Evidencni_cislo")
+    read_ms = time_calls(model.fetch_sklad_data, iterations)
+    write_ms = time_calls(lambda: model.update_row("sklad", evidencni_cislo, "Evidencni_cislo",
+                                                   {"Poznamka": str(time.perf_counter())}), iterations)
+    settings = model.connection_settings
+    model.conn.execute("PRAGMA journal_mode = DELETE")
+    del model
+    return {"settings": settings, "read_ms": read_ms, "write_ms": write_ms}
+
+
+def main():
+    """
+    Porovná profily připojení na kopii zadané databáze a vypíše výsledky.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark profilů připojení k databázi skladu.")
+    parser.add_argument("db_file", help="Cesta k databázi, měří se na její dočasné kopii.")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--workdir", default=None,
+                        help="Adresář pro dočasnou kopii, např. na síťovém disku pro měření v reálném prostředí.")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(dir=args.workdir)
+    try:
+        for profile in CommonResources.db_connection_profiles:
+            db_copy = os.path.join(workdir, f"benchmark_{profile}.db")
+            shutil.copyfile(args.db_file, db_copy)
+            result = benchmark_profile(db_copy, profile, args.iterations)
+            print(f"{profile:10} čtení {result['read_ms']:8.2f} ms  zápis {result['write_ms']:8.2f} ms  {result['settings']}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
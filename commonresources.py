@@ -22,6 +22,46 @@ class CommonResources:
         'Min_obj_mnozstvi': 'Min. obj. množ.', 'Zarizeni': 'Zařízení', 'Nazev_zarizeni': 'Název zařízení',
         'Umisteni': 'Umístění', 'Typ_zarizeni': 'Typ zařízení', 'Pod_minimem': 'Pod minimem',
         'username': 'Uživatel', 'role': 'Oprávnění', 'password_hash': 'Heslo', 'Jazyk': 'Jazyk',
+        'Mesic': 'Měsíc', 'Mnozstvi': 'Množství',
+        'Hodnota_EUR': 'Hodnota EUR', 'Pocet_operaci': 'Počet operací', 'Prijem_EUR': 'Příjem EUR',
+        'Vydej_EUR': 'Výdej EUR', 'Zmena_hodnoty_EUR': 'Změna hodnoty EUR', 'Hodnota_skladu_EUR': 'Hodnota skladu EUR',
+        }
+
+    slow_query_ms = 200
+
+    db_cached_statements = 512
+
+    db_connection_profile = "auto"
+
+    db_connection_profiles = {
+        "auto": {"journal_mode": "auto", "synchronous": "auto", "cache_size": -20000,
+                 "mmap_size": 0, "busy_timeout": 10000, "temp_store": "MEMORY"},
+        "local": {"journal_mode": "WAL", "synchronous": "NORMAL", "cache_size": -20000,
+                  "mmap_size": 268435456, "busy_timeout": 5000, "temp_store": "MEMORY"},
+        "network": {"journal_mode": "DELETE", "synchronous": "FULL", "cache_size": -20000,
+                    "mmap_size": 0, "busy_timeout": 15000, "temp_store": "MEMORY"},
+        "default": {},
+        }
+
+    lookup_table_config = {
+        "dodavatele": ("Dodavatel", "id"),
+        "sklad": ("Nazev_dilu", "Evidencni_cislo"),
+        "zarizeni": ("Zarizeni", "id"),
+        }
+
+    search_index_config = {
+        "sklad": {"id_col": "Evidencni_cislo",
+                  "columns": ('Evidencni_cislo', 'Interne_cislo', 'Nazev_dilu', 'Jednotky', 'Umisteni',
+                              'Dodavatel', 'Datum_nakupu', 'Cislo_objednavky', 'Poznamka')},
+        "varianty": {"id_col": "id",
+                     "columns": ('id_sklad', 'Nazev_varianty', 'Cislo_varianty', 'Poznamka'),
+                     "related": {"id_sklad": "sklad", "id_dodavatele": "dodavatele"}},
+        "dodavatele": {"id_col": "id",
+                       "columns": ('Dodavatel', 'Kontakt', 'E-mail', 'Telefon', 'Jazyk')},
+        "audit_log": {"id_col": "id",
+                      "columns": ('Evidencni_cislo', 'Interne_cislo', 'Nazev_dilu', 'Typ_operace',
+                                  'Operaci_provedl', 'Umisteni', 'Dodavatel', 'Datum_nakupu', 'Datum_vydeje',
+                                  'Cas_operace', 'Cislo_objednavky', 'Pouzite_zarizeni', 'Poznamka')},
         }
 
     common_radiobutton_menus = {
@@ -32,6 +72,7 @@ class CommonResources:
             ("Dodavatelé", 'dodavatele'),
             ("Zařízení", 'zarizeni'),
             ("Uživatelé", 'uzivatele'),
+            ("Reporty", 'reporty'),
             ],
         }
 
@@ -81,6 +122,13 @@ class CommonResources:
                          'Nazev_dilu': {"width": 200, "anchor": "w", "stretch": tk.YES},
                          },
                      },
+        "reporty": {"default_params": {"width": 120, "anchor": "e"},
+                    "col_params_dict": {
+                        'Mesic': {"width": 80, "anchor": "center"},
+                        'Pouzite_zarizeni': {"width": 200, "anchor": "w"},
+                        'Dodavatel': {"width": 300, "anchor": "w"},
+                        },
+                    },
         "item_variants": {"col_params_dict": {
                               'Nazev_varianty': {"width": 300, "anchor": "w"},
                               'Nazev_dilu': {"width": 200, "anchor": "w", "stretch": tk.YES},  
@@ -117,6 +165,83 @@ class CommonResources:
                      },
         }
     
+    movement_rules = {
+        "prijem": {"mandatory": ('Zmena_mnozstvi', 'Umisteni', 'Dodavatel', 'Cislo_objednavky'),
+                   "date": ('Datum_nakupu',),
+                   "pos_real": ('Jednotkova_cena_EUR',),
+                   "pos_integer": ('Zmena_mnozstvi',),
+                   "tuple_values_to_save": ('Objednano', 'Mnozstvi_ks_m_l', 'Umisteni', 'Dodavatel', 'Datum_nakupu',
+                                            'Cislo_objednavky', 'Jednotkova_cena_EUR', 'Celkova_cena_EUR', 'Poznamka'),
+                   "insert_item_value": ('Ucetnictvi', 'Evidencni_cislo', 'Interne_cislo', 'Jednotky', 'Mnozstvi_ks_m_l',
+                                         'Umisteni', 'Jednotkova_cena_EUR', 'Objednano', 'Poznamka', 'Nazev_dilu'),
+                   },
+        "vydej": {"mandatory": ('Zmena_mnozstvi', 'Pouzite_zarizeni', 'Umisteni'),
+                  "date": ('Datum_vydeje',),
+                  "pos_integer": ('Zmena_mnozstvi',),
+                  "tuple_values_to_save": ('Mnozstvi_ks_m_l', 'Umisteni', 'Poznamka', 'Celkova_cena_EUR'),
+                  "insert_item_value": ('Ucetnictvi', 'Evidencni_cislo', 'Interne_cislo', 'Jednotky', 'Mnozstvi_ks_m_l',
+                                        'Umisteni', 'Jednotkova_cena_EUR', 'Objednano', 'Poznamka', 'Nazev_dilu'),
+                  },
+        }
+
+    import_tables = ('sklad', 'varianty', 'dodavatele', 'zarizeni')
+
+    audit_log_hot_years = 2
+
+    report_names = {
+        "hodnota": "Hodnota skladu po měsících",
+        "zarizeni": "Spotřeba podle zařízení",
+        "dodavatele": "Nákupy podle dodavatelů",
+        }
+
+    item_rules = {
+        "sklad": {
+            "edit": {"read_only": ('Evidencni_cislo', 'Mnozstvi_ks_m_l', 'Jednotky', 'Dodavatel',
+                                   'Datum_nakupu', 'Jednotkova_cena_EUR', 'Celkova_cena_EUR'),
+                     "mandatory": ('Min_Mnozstvi_ks', 'Nazev_dilu',),
+                     "not_neg_integer": ('Interne_cislo', 'Min_Mnozstvi_ks',),
+                     },
+            "add": {"mandatory": ('Min_Mnozstvi_ks', 'Nazev_dilu', 'Jednotky',),
+                    "not_neg_integer": ('Min_Mnozstvi_ks',),
+                    "defaults": {'Mnozstvi_ks_m_l': 0, 'Jednotkova_cena_EUR': 0.0, 'Celkova_cena_EUR': 0.0,},
+                    },
+            },
+        "dodavatele": {
+            "edit": {"read_only": ('id', 'Dodavatel'),
+                     "mandatory": ('Jazyk',),
+                     },
+            "add": {"mandatory": ('Dodavatel', 'Jazyk',),
+                    },
+            },
+        "zarizeni": {
+            "edit": {"read_only": ('id', 'Zarizeni'),
+                     "mandatory": ('Zarizeni', 'Nazev_zarizeni', 'Umisteni', 'Typ_zarizeni',),
+                     },
+            "add": {"mandatory": ('Zarizeni', 'Nazev_zarizeni', 'Umisteni', 'Typ_zarizeni',),
+                    "code": {'Zarizeni': 8},
+                    },
+            },
+        "varianty": {
+            "edit": {"read_only": ('id', 'id_sklad', 'id_dodavatele',),
+                     "mandatory": ('Nazev_varianty', 'Cislo_varianty',),
+                     "not_neg_real": ('Jednotkova_cena_EUR',),
+                     "not_neg_integer": ('Dodaci_lhuta', 'Min_obj_mnozstvi'),
+                     },
+            "add": {"mandatory": ('Nazev_varianty', 'Cislo_varianty', 'Dodavatel', 'Jednotkova_cena_EUR',),
+                    "not_neg_real": ('Jednotkova_cena_EUR',),
+                    "not_neg_integer": ('Dodaci_lhuta', 'Min_obj_mnozstvi'),
+                    "defaults": {'Dodaci_lhuta': 0, 'Min_obj_mnozstvi': 0,},
+                    },
+            },
+        "uzivatele": {
+            "edit": {"read_only": ('id', 'username'),
+                     "mandatory": ('password_hash', 'name', 'role',),
+                     },
+            "add": {"mandatory": ('username', 'password_hash', 'name', 'role',),
+                    },
+            },
+        }
+
     item_frame_unit_dict = {
         "ks": {"SK": "ks", "DE": "Stück", "EN": "pcs"},
         "kg": {"SK": "kg", "DE": "kg", "EN": "kg"},
@@ -0,0 +1,380 @@
+import argparse
+import hashlib
+import itertools
+import os
+import random
+import sqlite3
+import time
+import unicodedata
+from datetime import date, timedelta
+
+from commonresources import CommonResources
+from movements import calculate_movement
+
+class DataGenerator:
+    """
+    Třída DataGenerator vytváří syntetickou databázi skladu se stejným schématem jako produkční
+    databáze (sklad se sloupci zařízení, varianty, dodavatele, zarizeni, uzivatele, audit_log)
+    pro zátěžové testy, benchmarky a profilování. Data jsou pro stejné semínko vždy stejná.
+    Skladové položky mají české názvy, dodavatelé jsou české, slovenské, německé a anglické firmy
+    s jazykem pro poptávky, četnost pohybů položek má Paretovo rozdělení (malá část položek má většinu
+    pohybů). Audit_log vzniká simulací příjmů a výdejů ve stejném pořadí a se stejnými výpočty jako
+    v aplikaci, takže stav a ceny položek ve skladu odpovídají jejich historii. Vše se zapisuje
+    hromadnými zápisy (executemany) v jedné transakci.
+    """
+    create_statements = (
+        "CREATE TABLE sklad (Evidencni_cislo INTEGER PRIMARY KEY, Interne_cislo INTEGER, Min_Mnozstvi_ks INTEGER, "
+        "Objednano INTEGER, Ucetnictvi INTEGER, Kriticky_dil INTEGER, Nazev_dilu TEXT, Mnozstvi_ks_m_l INTEGER, "
+        "Jednotky TEXT, Umisteni TEXT, Dodavatel TEXT, Datum_nakupu TEXT, Cislo_objednavky TEXT, "
+        "Jednotkova_cena_EUR REAL, Celkova_cena_EUR REAL, Poznamka TEXT{device_cols})",
+        "CREATE TABLE audit_log (id INTEGER PRIMARY KEY AUTOINCREMENT, Ucetnictvi INTEGER, Evidencni_cislo INTEGER, "
+        "Interne_cislo INTEGER, Objednano INTEGER, Nazev_dilu TEXT, Zmena_mnozstvi INTEGER, Mnozstvi_ks_m_l INTEGER, "
+        "Jednotky TEXT, Typ_operace TEXT, Operaci_provedl TEXT, Umisteni TEXT, Dodavatel TEXT, Datum_nakupu TEXT, "
+        "Datum_vydeje TEXT, Cislo_objednavky TEXT, Jednotkova_cena_EUR REAL, Celkova_cena_EUR REAL, "
+        "Pouzite_zarizeni TEXT, Poznamka TEXT, Cas_operace TEXT)",
+        "CREATE TABLE dodavatele (id INTEGER PRIMARY KEY, Dodavatel TEXT UNIQUE, Kontakt TEXT, \"E-mail\" TEXT, "
+        "Telefon TEXT, Jazyk TEXT)",
+        "CREATE TABLE varianty (id INTEGER PRIMARY KEY, id_sklad INTEGER, id_dodavatele INTEGER, "
+        "Nazev_varianty TEXT, Cislo_varianty TEXT, Jednotkova_cena_EUR REAL, Dodaci_lhuta INTEGER, "
+        "Min_obj_mnozstvi INTEGER, Poznamka TEXT)",
+        "CREATE TABLE zarizeni (id INTEGER PRIMARY KEY, Zarizeni TEXT UNIQUE, Nazev_zarizeni TEXT, Umisteni TEXT, "
+        "Typ_zarizeni TEXT)",
+        "CREATE TABLE uzivatele (id INTEGER PRIMARY KEY, username TEXT UNIQUE, password_hash TEXT, name TEXT, "
+        "role TEXT)",
+        )
+
+    audit_log_col_names = ("Ucetnictvi", "Evidencni_cislo", "Interne_cislo", "Objednano", "Nazev_dilu",
+                           "Zmena_mnozstvi", "Mnozstvi_ks_m_l", "Jednotky", "Typ_operace", "Operaci_provedl",
+                           "Umisteni", "Dodavatel", "Datum_nakupu", "Datum_vydeje", "Cislo_objednavky",
+                           "Jednotkova_cena_EUR", "Celkova_cena_EUR", "Pouzite_zarizeni", "Poznamka", "Cas_operace")
+
+    part_catalog = {
+        "Ložisko": ({"SK": "Ložisko", "DE": "Kugellager", "EN": "Bearing"},
+                    ("6204-2RS", "6205 ZZ", "6305-2RS", "NU 206", "22210 E"), ("ks",)),
+        "Těsnění": ({"SK": "Tesnenie", "DE": "Dichtung", "EN": "Seal"},
+                    ("NBR 40x2", "Viton 25x3", "DN50 PN16", "hřídelové 35x52x7"), ("ks", "balení")),
+        "Šroub": ({"SK": "Skrutka", "DE": "Schraube", "EN": "Screw"},
+                  ("M8x30", "M10x40", "M12x60", "M16x80 8.8"), ("ks", "balení")),
+        "Matice": ({"SK": "Matica", "DE": "Mutter", "EN": "Nut"}, ("M8", "M10", "M12 samojistná"), ("ks", "balení")),
+        "Hadice": ({"SK": "Hadica", "DE": "Schlauch", "EN": "Hose"},
+                   ("hydraulická 1/2\"", "hydraulická 3/4\"", "tlaková DN25", "silikonová 10 mm"), ("m", "ks")),
+        "Čidlo teploty": ({"SK": "Snímač teploty", "DE": "Temperaturfühler", "EN": "Temperature sensor"},
+                          ("Pt100", "Pt1000", "0-400 °C"), ("ks",)),
+        "Termočlánek": ({"SK": "Termočlánok", "DE": "Thermoelement", "EN": "Thermocouple"},
+                        ("typ K 500 mm", "typ K 1000 mm", "typ S 800 mm", "typ N"), ("ks",)),
+        "Řemen": ({"SK": "Remeň", "DE": "Riemen", "EN": "Belt"}, ("SPZ 1250", "XPA 1500", "A 1000"), ("ks",)),
+        "Ventil": ({"SK": "Ventil", "DE": "Ventil", "EN": "Valve"},
+                   ("kulový DN25", "elektromagnetický 24V DC", "pojistný 10 bar", "zpětný 1/2\""), ("ks",)),
+        "Stykač": ({"SK": "Stýkač", "DE": "Schütz", "EN": "Contactor"}, ("3P 25A 230V AC", "3P 40A 24V DC"), ("ks",)),
+        "Jistič": ({"SK": "Istič", "DE": "Leitungsschutzschalter", "EN": "Circuit breaker"},
+                   ("1P B16", "3P C25", "3P C63"), ("ks",)),
+        "Pojistka": ({"SK": "Poistka", "DE": "Sicherung", "EN": "Fuse"}, ("gG 16A", "gG 63A", "aR 100A"), ("ks",)),
+        "Filtr oleje": ({"SK": "Filter oleja", "DE": "Ölfilter", "EN": "Oil filter"}, ("HF 35", "10 µm", "25 µm"), ("ks",)),
+        "Olej hydraulický": ({"SK": "Olej hydraulický", "DE": "Hydrauliköl", "EN": "Hydraulic oil"},
+                             ("ISO VG 32", "ISO VG 46", "ISO VG 68"), ("l",)),
+        "Topné těleso": ({"SK": "Vykurovacie teleso", "DE": "Heizelement", "EN": "Heating element"},
+                         ("SiC 2 kW", "Kanthal 6 kW", "MoSi2 3 kW"), ("ks",)),
+        "Spojka": ({"SK": "Spojka", "DE": "Kupplung", "EN": "Coupling"}, ("ROTEX 28", "pružná 42 mm"), ("ks",)),
+        "Koncový spínač": ({"SK": "Koncový spínač", "DE": "Endschalter", "EN": "Limit switch"},
+                           ("kladkový", "indukční M18", "indukční M12"), ("ks",)),
+        "Kabel": ({"SK": "Kábel", "DE": "Kabel", "EN": "Cable"}, ("CYKY 3x2,5", "CYKY 5x1,5", "silikonový 1,5"), ("m",)),
+        "Rukavice pracovní": ({"SK": "Rukavice pracovné", "DE": "Arbeitshandschuhe", "EN": "Work gloves"},
+                              ("kožené", "tepluvzdorné"), ("pár",)),
+        "Izolace keramická": ({"SK": "Izolácia keramická", "DE": "Keramikisolierung", "EN": "Ceramic insulation"},
+                              ("rohož 25 mm", "deska 50 mm"), ("m", "kg")),
+        }
+    supplier_names = {
+        "CZ": (("Strojírny", "Elektro", "Hydraulika", "Ložiska", "Technické plyny", "Spojovací materiál"),
+               ("Morava", "Praha", "Brno", "Vysočina", "Ostrava", "Plzeň"), ("s.r.o.", "a.s.", "spol. s r.o.")),
+        "SK": (("Strojárne", "Elektro", "Hydraulika", "Ložiská", "Priemyselné potreby", "Technika"),
+               ("Slovakia", "Žilina", "Košice", "Trnava", "Nitra", "Zvolen"), ("s.r.o.", "a.s.")),
+        "DE": (("Industrietechnik", "Elektro", "Hydraulik", "Wälzlager", "Antriebstechnik", "Messtechnik"),
+               ("Müller", "Schmidt", "Bayern", "Sachsen", "Rhein", "Weber"), ("GmbH", "AG", "GmbH & Co. KG")),
+        "EN": (("Industrial Supply", "Bearings", "Fluid Power", "Automation", "Thermal", "Components"),
+               ("Midlands", "Northern", "Atlas", "Sterling", "Pioneer", "Global"), ("Ltd", "Inc.", "LLC")),
+        }
+    supplier_languages = ("CZ", "CZ", "CZ", "SK", "SK", "DE", "DE", "EN")
+    email_domains = {"CZ": "cz", "SK": "sk", "DE": "de", "EN": "com"}
+    phone_prefixes = {"CZ": "+420", "SK": "+421", "DE": "+49", "EN": "+44"}
+    first_names = ("Jan", "Petr", "Pavel", "Martin", "Tomáš", "Jana", "Eva", "Lucie", "Zdeněk", "Miroslav")
+    last_names = ("Novák", "Svoboda", "Dvořák", "Černý", "Procházka", "Kučera", "Veselý", "Horák", "Pilát", "Král")
+    device_types = {"LIS": "Lis", "PEC": "Pec", "KOMP": "Kompresor", "JER": "Jeřáb", "LIN": "Linka", "CNC": "CNC"}
+    halls = ("Hala 1", "Hala 2", "Hala 3", "Kompresorovna", "Sklad")
+    notes = ("", "", "", "", "", "", "náhradní díl", "kritické pro provoz", "objednat s předstihem",
+             "ověřit u dodavatele", "původní díl výrobce")
+    receipt_share = 0.35
+    pareto_alpha = 1.16
+    default_end_date = "2025-12-31"
+
+    def __init__(self, seed=1, sklad_items=1000, audit_rows=20000, suppliers=40, devices=12, users=8, years=3,
+                 end_date=None):
+        """
+        Inicializace generátoru.
+
+        :param seed: Semínko generátoru náhodných čísel, stejné semínko vytvoří stejná data.
+        :param sklad_items: Počet skladových položek.
+        :param audit_rows: Počet záznamů audit_logu (pohybů).
+        :param suppliers: Počet dodavatelů.
+        :param devices: Počet zařízení (sloupců zařízení v tabulce sklad).
+        :param users: Počet uživatelů.
+        :param years: Počet let historie pohybů končící dnem end_date.
+        :param end_date: Poslední den historie pohybů (text RRRR-MM-DD), pokud None, použije se
+                         DataGenerator.default_end_date, aby stejné semínko vytvořilo stejná data každý den.
+        """
+        self.seed = seed
+        self.sklad_items = sklad_items
+        self.audit_rows = audit_rows
+        self.suppliers = suppliers
+        self.devices = devices
+        self.users = users
+        self.years = years
+        self.end_date = date.fromisoformat(end_date or self.default_end_date)
+        self.rnd = random.Random(seed)
+
+
+    def person(self):
+        """
+        Vrátí náhodné jméno a příjmení.
+        """
+        return f"{self.rnd.choice(self.first_names)} {self.rnd.choice(self.last_names)}"
+
+
+    def generate_suppliers(self):
+        """
+        Vrátí řádky tabulky dodavatele - název firmy, kontakt, e-mail a telefon podle jazyka dodavatele.
+        Jazyk odpovídá klíčům CommonResources.item_frame_language_dict (jazyk poptávky).
+        """
+        languages = [lang for lang in self.supplier_languages
+                     if lang in CommonResources.item_frame_language_dict["email_subject"]]
+        rows, used = [], set()
+        for id_num in range(1, self.suppliers + 1):
+            lang = languages[(id_num - 1) % len(languages)]
+            kinds, places, forms = self.supplier_names[lang]
+            name = f"{self.rnd.choice(kinds)} {self.rnd.choice(places)} {self.rnd.choice(forms)}"
+            if name in used:
+                name = f"{name} {id_num}"
+            used.add(name)
+            domain = unicodedata.normalize("NFKD", name.split()[0].lower()).encode("ascii", "ignore").decode()
+            rows.append((id_num, name, self.person(), f"obchod@{domain}{id_num}.{self.email_domains[lang]}",
+                         f"{self.phone_prefixes[lang]} {self.rnd.randint(100000000, 999999999)}", lang))
+        return rows
+
+
+    def generate_devices(self):
+        """
+        Vrátí řádky tabulky zarizeni - zkratka zařízení (nejvýše 8 znaků), název, umístění a typ.
+        """
+        rows = []
+        prefixes = list(self.device_types)
+        for id_num in range(1, self.devices + 1):
+            prefix = prefixes[(id_num - 1) % len(prefixes)]
+            number = (id_num - 1) // len(prefixes) + 1
+            rows.append((id_num, f"{prefix}{number}", f"{self.device_types[prefix]} {number}",
+                         self.rnd.choice(self.halls), self.device_types[prefix]))
+        return rows
+
+
+    def generate_users(self):
+        """
+        Vrátí řádky tabulky uzivatele, první uživatel je admin. Heslo všech uživatelů je 'heslo'
+        (uložené jako SHA-256 hash stejně jako při přihlášení).
+        """
+        password_hash = hashlib.sha256("heslo".encode()).hexdigest()
+        rows = [(1, "admin", password_hash, "Zdeněk Pilát", "admin")]
+        for id_num in range(2, self.users + 1):
+            rows.append((id_num, f"uzivatel{id_num}", password_hash, self.person(),
+                         "admin" if id_num % 4 == 0 else "user"))
+        return rows
+
+
+    def generate_items(self, suppliers, devices):
+        """
+        Vrátí počáteční stav skladových položek (slovníky sloupců tabulky sklad) a jejich varianty.
+        Každá položka má 1 až 3 varianty u různých dodavatelů s názvem v jazyce dodavatele
+        a je použitá v 0 až 3 zařízeních.
+        """
+        items, variants = [], []
+        part_names = list(self.part_catalog)
+        device_codes = [device[1] for device in devices]
+        interne_cislo = 1000
+        for id_num in range(1, self.sklad_items + 1):
+            base_name = self.rnd.choice(part_names)
+            translations, specs, units = self.part_catalog[base_name]
+            spec = self.rnd.choice(specs)
+            unit = self.rnd.choice(units)
+            price = round(self.rnd.lognormvariate(2.5, 1.3) + 0.1, 2)
+            minimum = self.rnd.choice((0, 0, 1, 2, 2, 5, 10, 20))
+            quantity = self.rnd.randint(0, max(minimum * 3, 5))
+            interne_cislo += self.rnd.randint(1, 3)
+            item_suppliers = self.rnd.sample(suppliers, k=min(len(suppliers), self.rnd.choice((1, 1, 2, 3))))
+            item = {"Evidencni_cislo": id_num, "Interne_cislo": interne_cislo if self.rnd.random() < 0.8 else None,
+                    "Min_Mnozstvi_ks": minimum, "Objednano": 0, "Ucetnictvi": int(self.rnd.random() < 0.7),
+                    "Kriticky_dil": int(self.rnd.random() < 0.1), "Nazev_dilu": f"{base_name} {spec}",
+                    "Mnozstvi_ks_m_l": quantity, "Jednotky": unit,
+                    "Umisteni": f"R{self.rnd.randint(1, 30):02d}-P{self.rnd.randint(1, 6)}",
+                    "Dodavatel": item_suppliers[0][1], "Datum_nakupu": "", "Cislo_objednavky": "",
+                    "Jednotkova_cena_EUR": price, "Celkova_cena_EUR": round(quantity * price, 1),
+                    "Poznamka": self.rnd.choice(self.notes),
+                    "devices": tuple(sorted(self.rnd.sample(device_codes,
+                                                            k=min(len(device_codes), self.rnd.choice((0, 1, 1, 2, 3)))))),
+                    "suppliers": []}
+            for supplier in item_suppliers:
+                lang = supplier[5]
+                name = translations.get(lang, base_name)
+                variant_price = round(price * self.rnd.uniform(0.85, 1.25), 2)
+                variants.append((len(variants) + 1, id_num, supplier[0], f"{name} {spec}",
+                                 f"{supplier[1][:3].upper()}-{self.rnd.randint(10000, 99999)}", variant_price,
+                                 self.rnd.choice((3, 5, 7, 14, 21, 28, 42)), self.rnd.choice((1, 1, 5, 10, 50)), ""))
+                item["suppliers"].append((supplier[1], variant_price))
+            items.append(item)
+        return items, variants
+
+
+    def movement_times(self):
+        """
+        Vrátí seřazený seznam časů pohybů (text RRRR-MM-DD HH:MM:SS) rovnoměrně v pracovních dnech
+        za zvolený počet let končících dnem end_date, ve dnech a hodinách směn.
+        """
+        first_day = self.end_date - timedelta(days=365 * self.years)
+        days = (self.end_date - first_day).days
+        workdays = [first_day + timedelta(days=offset) for offset in range(days + 1)]
+        workdays = [day.isoformat() for day in workdays if day.weekday() < 5] or [first_day.isoformat()]
+        random, span = self.rnd.random, len(workdays) * 54000
+        offsets = sorted(int(random() * span) for _ in range(self.audit_rows))
+        times = []
+        for offset in offsets:
+            day, seconds = divmod(offset, 54000)
+            seconds += 6 * 3600
+            times.append(f"{workdays[day]} {seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}")
+        return times
+
+
+    def generate_movements(self, items, devices, user_names):
+        """
+        Generátor řádků audit_logu - simulace příjmů a výdejů v časovém pořadí. Položka pohybu se
+        vybírá podle vah z Paretova rozdělení. Položka s nulovým stavem nebo pod minimem se přijímá,
+        jinak se s pravděpodobností receipt_share přijímá a jinak vydává do zařízení položky.
+        Nové hodnoty pohybu i stavu položky se počítají funkcí calculate_movement jako v aplikaci,
+        stav položek v items se průběžně mění.
+        """
+        weights = [self.rnd.paretovariate(self.pareto_alpha) for _ in items]
+        cum_weights = list(itertools.accumulate(weights))
+        chosen = self.rnd.choices(range(len(items)), cum_weights=cum_weights, k=self.audit_rows)
+        device_codes = tuple(device[1] for device in devices)
+        random = self.rnd.random
+        order_number = 0
+        for idx, time_of_operation in zip(chosen, self.movement_times()):
+            item = items[idx]
+            actual_date = time_of_operation[:10]
+            quantity = item["Mnozstvi_ks_m_l"]
+            minimum = item["Min_Mnozstvi_ks"]
+            receipt = quantity == 0 or quantity < minimum or random() < self.receipt_share
+            if receipt:
+                action = "prijem"
+                suppliers = item["suppliers"]
+                supplier, variant_price = suppliers[int(random() * len(suppliers))]
+                change = max(minimum * 2 - quantity, 0) + 1 + int(random() * max(minimum, 5))
+                unit_price = round(variant_price * (0.95 + random() * 0.13), 2)
+                order_number += 1
+                order = f"OBJ-{actual_date[:4]}-{order_number:06d}"
+            else:
+                action = "vydej"
+                change = 1 + int(random() * max(1, min(quantity, max(minimum, 3))))
+                unit_price = item["Jednotkova_cena_EUR"]
+            audit_log_values, sklad_values = calculate_movement(action, quantity, quantity,
+                                                                item["Jednotkova_cena_EUR"], change, unit_price)
+            if receipt:
+                item.update(sklad_values)
+                item.update({"Dodavatel": supplier, "Datum_nakupu": actual_date, "Cislo_objednavky": order})
+                device = ""
+            else:
+                item["Mnozstvi_ks_m_l"] = sklad_values["Mnozstvi_ks_m_l"]
+                item["Celkova_cena_EUR"] = sklad_values["Celkova_cena_EUR"]
+                item_devices = item["devices"] or device_codes
+                device = item_devices[int(random() * len(item_devices))]
+            yield (item["Ucetnictvi"], item["Evidencni_cislo"], item["Interne_cislo"], item["Objednano"],
+                   item["Nazev_dilu"], audit_log_values["Zmena_mnozstvi"], audit_log_values["Mnozstvi_ks_m_l"],
+                   item["Jednotky"], "PŘÍJEM" if receipt else "VÝDEJ", user_names[int(random() * len(user_names))],
+                   item["Umisteni"], supplier if receipt else "", actual_date if receipt else "",
+                   "" if receipt else actual_date, order if receipt else "", unit_price,
+                   round(audit_log_values["Celkova_cena_EUR"], 2), device, "", time_of_operation)
+
+
+    def generate(self, path):
+        """
+        Vytvoří databázový soubor se syntetickými daty. Zařízení položek se zapíšou jako sloupce
+        tabulky sklad (jeden sloupec 0/1 pro každé zařízení) stejně jako v původní databázi,
+        vazby podle nich doplní aplikace při startu a sloupce odstraní převod zařízení (DeviceLinks).
+
+        :param path: Cesta k novému databázovému souboru, soubor nesmí existovat.
+        :return: Slovník tabulka -> počet vytvořených řádků.
+        """
+        if os.path.exists(path):
+            raise FileExistsError(f"Databázový soubor {path} již existuje.")
+        suppliers = self.generate_suppliers()
+        devices = self.generate_devices()
+        users = self.generate_users()
+        items, variants = self.generate_items(suppliers, devices)
+        device_codes = [device[1] for device in devices]
+
+        conn = sqlite3.connect(path, isolation_level=None)
+        try:
+            conn.execute("PRAGMA journal_mode = OFF")
+            conn.execute("PRAGMA synchronous = OFF")
+            conn.execute("BEGIN")
+            device_cols = "".join(f', "{code}" INTEGER DEFAULT 0' for code in device_codes)
+            for statement in self.create_statements:
+                conn.execute(statement.format(device_cols=device_cols))
+            conn.executemany("INSERT INTO dodavatele VALUES (?, ?, ?, ?, ?, ?)", suppliers)
+            conn.executemany("INSERT INTO zarizeni VALUES (?, ?, ?, ?, ?)", devices)
+            conn.executemany("INSERT INTO uzivatele VALUES (?, ?, ?, ?, ?)", users)
+            conn.executemany("INSERT INTO varianty VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", variants)
+            cols = ", ".join(f'"{col}"' for col in self.audit_log_col_names)
+            placeholders = ", ".join("?" * len(self.audit_log_col_names))
+            conn.executemany(f"INSERT INTO audit_log ({cols}) VALUES ({placeholders})",
+                             self.generate_movements(items, devices, [user[3] for user in users]))
+            for item in items:
+                if item["Mnozstvi_ks_m_l"] < item["Min_Mnozstvi_ks"]:
+                    item["Objednano"] = int(self.rnd.random() < 0.5)
+            sklad_cols = [col for col in items[0] if col not in ("devices", "suppliers")] if items else []
+            cols = ", ".join(f'"{col}"' for col in sklad_cols + device_codes)
+            placeholders = ", ".join("?" * (len(sklad_cols) + len(device_codes)))
+            conn.executemany(f"INSERT INTO sklad ({cols}) VALUES ({placeholders})",
+                             ([item[col] for col in sklad_cols] + [int(code in item["devices"]) for code in device_codes]
+                              for item in items))
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return {"sklad": len(items), "varianty": len(variants), "dodavatele": len(suppliers),
+                "zarizeni": len(devices), "uzivatele": len(users), "audit_log": self.audit_rows}
+
+
+def main():
+    """
+    Vytvoří syntetickou databázi podle parametrů z příkazové řádky.
+    """
+    parser = argparse.ArgumentParser(description="Generátor syntetické databáze skladu.")
+    parser.add_argument("db_file", help="Cesta k nové databázi.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--sklad-items", type=int, default=1000)
+    parser.add_argument("--audit-rows", type=int, default=20000)
+    parser.add_argument("--suppliers", type=int, default=40)
+    parser.add_argument("--devices", type=int, default=12)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--end-date", default=DataGenerator.default_end_date,
+                        help="Poslední den historie pohybů (RRRR-MM-DD).")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = DataGenerator(args.seed, args.sklad_items, args.audit_rows, args.suppliers, args.devices,
+                           years=args.years, end_date=args.end_date).generate(args.db_file)
+    print(", ".join(f"{table} {count}" for table, count in counts.items())
+          + f" - vytvořeno za {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import queue
+import sqlite3
+import threading
+
+from model import Model
+
+class DataWorker:
+    """
+    Třída DataWorker provádí čtecí dotazy v samostatném vlákně s vlastním připojením k databázi,
+    aby hlavní smyčka Tk při načítání velkých tabulek nezamrzla. Výsledky se předávají zpět
+    do vlákna GUI přes frontu, kterou hlavní vlákno čte pomocí root.after.
+    Požadavky jsou rozděleny do kanálů (např. 'view', 'page'), nový požadavek v kanálu
+    zneplatní předchozí - zastaralé požadavky se přeruší (conn.interrupt) a jejich výsledek se zahodí.
+    """
+    poll_interval = 20
+
+    def __init__(self, root, db_path):
+        """
+        Inicializace a spuštění pracovního vlákna.
+
+        :param root: Hlavní okno aplikace pro plánování zpracování výsledků (root.after).
+        :param db_path: Cesta k databázovému souboru.
+        """
+        self.root = root
+        self.db_path = db_path
+        self.requests = queue.Queue()
+        self.results = queue.Queue()
+        self.generations = {}
+        self.running = None
+        self.pending = 0
+        self.polling = False
+        self.model = None
+        self.lock = threading.Lock()
+        self.ready = threading.Event()
+        self.start_error = None
+        self.thread = threading.Thread(target=self.run, name="DataWorker", daemon=True)
+        self.thread.start()
+        self.ready.wait()
+        if self.start_error is not None:
+            raise self.start_error
+
+
+    def run(self):
+        """
+        Smyčka pracovního vlákna - vytvoří vlastní model s připojením a postupně zpracovává požadavky.
+        """
+        try:
+            self.model = Model(self.db_path)
+        except Exception as e:
+            self.start_error = e
+            self.ready.set()
+            return
+        self.ready.set()
+        while True:
+            request = self.requests.get()
+            if request is None:
+                break
+            channel, generation, func, callback, error_callback = request
+            with self.lock:
+                if generation != self.generations.get(channel):
+                    self.results.put(None)
+                    continue
+                self.running = (channel, generation)
+            result, error = self.execute(channel, generation, func)
+            with self.lock:
+                self.running = None
+            self.results.put((channel, generation, callback, error_callback, result, error))
+        with self.lock:
+            model, self.model = self.model, None
+        del model
+
+
+    def execute(self, channel, generation, func):
+        """
+        Provede funkci požadavku nad modelem pracovního vlákna. Pokud byl dotaz aktuálního
+        požadavku přerušen omylem (přerušení určené předchozímu požadavku), provede se znovu.
+        Výjimka se předává bez tracebacku, aby vlákno GUI nedrželo odkazy na objekty pracovního vlákna.
+
+        :return: N-tice (výsledek, výjimka).
+        """
+        for _ in range(2):
+            try:
+                return func(self.model), None
+            except sqlite3.OperationalError as e:
+                if "interrupt" not in str(e).lower() or generation != self.generations.get(channel):
+                    return None, e.with_traceback(None)
+            except Exception as e:
+                return None, e.with_traceback(None)
+        return None, sqlite3.OperationalError("interrupted")
+
+
+    def submit(self, channel, func, callback, error_callback=None):
+        """
+        Zařadí požadavek do fronty pracovního vlákna a zneplatní předchozí požadavky kanálu.
+
+        :param channel: Název kanálu požadavku.
+        :param func: Funkce s parametrem model (Model pracovního vlákna), která vrátí výsledek.
+        :param callback: Funkce volaná ve vlákně GUI s výsledkem, pokud je požadavek stále aktuální.
+        :param error_callback: Funkce volaná ve vlákně GUI s výjimkou při chybě.
+        """
+        generation = self.cancel(channel)
+        self.pending += 1
+        self.requests.put((channel, generation, func, callback, error_callback))
+        if not self.polling:
+            self.polling = True
+            self.root.after(self.poll_interval, self.poll)
+
+
+    def cancel(self, channel):
+        """
+        Zneplatní všechny dosavadní požadavky kanálu, právě prováděný dotaz kanálu se přeruší.
+
+        :param channel: Název kanálu.
+        :return: Nové číslo generace kanálu.
+        """
+        with self.lock:
+            generation = self.generations.get(channel, 0) + 1
+            self.generations[channel] = generation
+            if self.running is not None and self.running[0] == channel and self.model is not None:
+                self.model.conn.interrupt()
+        return generation
+
+
+    def is_current(self, channel, generation):
+        """
+        Vrátí True, pokud je požadavek s danou generací v kanálu stále aktuální.
+        """
+        return self.generations.get(channel) == generation
+
+
+    def poll(self):
+        """
+        Ve vlákně GUI předá výsledky hotových aktuálních požadavků jejich callbackům.
+        Dokud čekají další požadavky, naplánuje se znovu.
+        """
+        while True:
+            try:
+                item = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.pending -= 1
+            if item is None:
+                continue
+            channel, generation, callback, error_callback, result, error = item
+            if not self.is_current(channel, generation):
+                continue
+            if error is None:
+                callback(result)
+            elif error_callback is not None:
+                error_callback(error)
+        if self.pending > 0:
+            self.root.after(self.poll_interval, self.poll)
+        else:
+            self.polling = False
+
+
+    def stop(self):
+        """
+        Ukončí pracovní vlákno po dokončení rozpracovaného požadavku.
+        """
+        for channel in list(self.generations):
+            self.cancel(channel)
+        self.requests.put(None)
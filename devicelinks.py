@@ -0,0 +1,135 @@
+import os
+import sqlite3
+from datetime import datetime
+
+class DeviceLinks:
+    """
+    Třída DeviceLinks spravuje vazební tabulku sklad_zarizeni (skladová položka - zařízení), která
+    nahrazuje původní sloupce zařízení v tabulce sklad (jeden sloupec INTEGER 0/1 pro každé zařízení).
+    Při startu aplikace doplní vazby podle existujících sloupců zařízení, sloupce z tabulky sklad
+    odstraní až jednorázový převod spuštěný administrátorem (se zálohou databáze), po kterém šířka
+    řádku skladu nezávisí na počtu zařízení. Do té doby se vazby zapisují i do sloupců zařízení.
+    """
+    table = "sklad_zarizeni"
+    migrated_user_version = 1
+
+    def __init__(self, model):
+        """
+        Inicializace správce vazeb.
+
+        :param model: Instance třídy Model s připojením k databázi a registrem schématu.
+        """
+        self.model = model
+        self.conn = model.conn
+
+
+    def create_statement(self):
+        """
+        Vrátí příkaz pro vytvoření vazební tabulky. Primární klíč (id_sklad, id_zarizeni) slouží
+        pro zařízení položky, index podle zařízení vytváří SchemaOptimizer.
+        """
+        return (f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "id_sklad INTEGER NOT NULL REFERENCES sklad(Evidencni_cislo) ON DELETE CASCADE, "
+                "id_zarizeni INTEGER NOT NULL REFERENCES zarizeni(id) ON DELETE CASCADE, "
+                "PRIMARY KEY (id_sklad, id_zarizeni)) WITHOUT ROWID")
+
+
+    def legacy_columns(self):
+        """
+        Vrátí seznam n-tic (zkratka zařízení, id zařízení) pro zařízení, která mají v tabulce sklad
+        ještě vlastní sloupec.
+        """
+        sklad_cols = self.model.schema.col_index("sklad")
+        devices = self.conn.execute("SELECT Zarizeni, id FROM zarizeni").fetchall()
+        return [(code, id_num) for code, id_num in devices if code in sklad_cols]
+
+
+    def column_indexes(self, col):
+        """
+        Vrátí názvy indexů tabulky sklad, které obsahují zadaný sloupec (před odstraněním sloupce
+        je nutné je smazat).
+        """
+        indexes = []
+        for row in self.conn.execute('PRAGMA index_list("sklad")').fetchall():
+            index_name, origin = row[1], row[3]
+            if origin != "c":
+                continue
+            index_cols = [info[2] for info in self.conn.execute(f'PRAGMA index_info("{index_name}")')]
+            if col in index_cols:
+                indexes.append(index_name)
+        return indexes
+
+
+    def ensure(self):
+        """
+        Vytvoří vazební tabulku a doplní do ní vazby podle sloupců zařízení, které v tabulce sklad
+        ještě zůstaly (vazby se nastaví i zruší podle hodnoty sloupce). Sloupce se při startu
+        neodstraňují, aby pracovní stanice se starší verzí aplikace mohly sdílenou databázi dál
+        používat, odstraní je až administrátor metodou drop_legacy_columns.
+
+        :return: Seznam zkratek zařízení, která mají v tabulce sklad ještě vlastní sloupec.
+        """
+        if not (self.model.schema.has_table("sklad") and self.model.schema.has_table("zarizeni")):
+            return []
+        if not self.model.schema.has_table(self.table):
+            self.conn.execute(self.create_statement())
+            self.conn.commit()
+            self.model.schema.load()
+        legacy_columns = self.legacy_columns()
+        if legacy_columns:
+            with self.model.transaction():
+                self.sync_links(legacy_columns)
+                self.model.commit(self.table)
+        return [code for code, _ in legacy_columns]
+
+
+    def sync_links(self, legacy_columns):
+        """
+        Nastaví vazby podle hodnot sloupců zařízení v tabulce sklad.
+
+        :param legacy_columns: Seznam n-tic (zkratka zařízení, id zařízení).
+        """
+        for code, id_num in legacy_columns:
+            self.conn.execute(f'INSERT OR IGNORE INTO {self.table} (id_sklad, id_zarizeni) '
+                              f'SELECT Evidencni_cislo, ? FROM sklad WHERE "{code}" = 1', (id_num,))
+            self.conn.execute(f'DELETE FROM {self.table} WHERE id_zarizeni = ? AND id_sklad IN '
+                              f'(SELECT Evidencni_cislo FROM sklad WHERE COALESCE("{code}", 0) != 1)', (id_num,))
+
+
+    def backup_file_name(self):
+        """
+        Vrátí cestu k záloze databáze před odstraněním sloupců zařízení (vedle hlavní databáze).
+        """
+        stem = os.path.splitext(os.path.abspath(self.model.db))[0]
+        return f"{stem}_zaloha_zarizeni_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
+
+
+    def drop_legacy_columns(self, backup=True):
+        """
+        Jednorázový převod - po záloze databáze doplní vazby podle sloupců zařízení a sloupce
+        z tabulky sklad odstraní, vše v jedné transakci. Dokončený převod se zapíše do PRAGMA
+        user_version databáze.
+
+        :param backup: Pokud True, databáze se před odstraněním sloupců zkopíruje do zálohy.
+        :return: N-tice (seznam zkratek převedených zařízení, cesta k záloze nebo None).
+        """
+        legacy_columns = self.legacy_columns()
+        backup_file = None
+        if legacy_columns and backup:
+            backup_file = self.backup_file_name()
+            target = sqlite3.connect(backup_file)
+            try:
+                self.conn.backup(target)
+            finally:
+                target.close()
+        with self.model.transaction():
+            self.sync_links(legacy_columns)
+            for code, _ in legacy_columns:
+                for index_name in self.column_indexes(code):
+                    self.conn.execute(f'DROP INDEX "{index_name}"')
+                self.conn.execute(f'ALTER TABLE sklad DROP COLUMN "{code}"')
+            if self.conn.execute("PRAGMA user_version").fetchone()[0] < self.migrated_user_version:
+                self.conn.execute(f"PRAGMA user_version = {self.migrated_user_version}")
+            self.model.commit("sklad", self.table)
+        self.model.schema.load()
+        return [code for code, _ in legacy_columns], backup_file
@@ -0,0 +1,291 @@
+import csv
+import os
+import threading
+
+from model import Model
+
+class CsvExportWriter:
+    """
+    Zápis exportu do souboru csv po částech.
+    """
+    def __init__(self, file_name, headers, col_types=None):
+        """
+        Otevře soubor a zapíše hlavičku.
+
+        :param file_name: Cesta k souboru exportu.
+        :param headers: Názvy sloupců pro hlavičku.
+        :param col_types: Seznam deklarovaných typů sloupců (pro csv se nepoužívají).
+        """
+        self.csv_file = open(file_name, mode='w', newline='', encoding='utf-8')
+        self.csv_writer = csv.writer(self.csv_file)
+        self.csv_writer.writerow(headers)
+
+
+    def write_rows(self, rows):
+        """
+        Zapíše další část řádků.
+        """
+        self.csv_writer.writerows(rows)
+
+
+    def close(self):
+        """
+        Uzavře soubor.
+        """
+        self.csv_file.close()
+
+
+class XlsxExportWriter:
+    """
+    Zápis exportu do souboru xlsx v režimu write_only knihovny openpyxl, který drží v paměti
+    jen aktuální řádek. Po dosažení maximálního počtu řádků listu pokračuje na dalším listu.
+    """
+    max_sheet_rows = 1048576
+
+    def __init__(self, file_name, headers, col_types=None):
+        """
+        Vytvoří sešit a první list s hlavičkou.
+
+        :param file_name: Cesta k souboru exportu.
+        :param headers: Názvy sloupců pro hlavičku.
+        :param col_types: Seznam deklarovaných typů sloupců (pro xlsx se nepoužívají).
+        """
+        from openpyxl import Workbook
+        self.file_name = file_name
+        self.headers = list(headers)
+        self.workbook = Workbook(write_only=True)
+        self.sheet = None
+        self.sheet_rows = 0
+        self.add_sheet()
+
+
+    def add_sheet(self):
+        """
+        Přidá do sešitu nový list s hlavičkou.
+        """
+        sheet_number = len(self.workbook.worksheets) + 1
+        self.sheet = self.workbook.create_sheet(title=f"Export {sheet_number}")
+        self.sheet.append(self.headers)
+        self.sheet_rows = 1
+
+
+    def write_rows(self, rows):
+        """
+        Zapíše další část řádků.
+        """
+        for row in rows:
+            if self.sheet_rows >= self.max_sheet_rows:
+                self.add_sheet()
+            self.sheet.append(list(row))
+            self.sheet_rows += 1
+
+
+    def close(self):
+        """
+        Uloží sešit do souboru.
+        """
+        self.workbook.save(self.file_name)
+
+
+class ParquetExportWriter:
+    """
+    Zápis exportu do sloupcového souboru parquet knihovnou pyarrow, každá část řádků se zapíše
+    jako samostatná skupina řádků (row group). Typ sloupce se určí podle deklarovaného typu
+    v databázi, případně podle hodnot první části (číselné sloupce jako float64, ostatní jako text).
+    """
+    def __init__(self, file_name, headers, col_types=None):
+        """
+        Připraví zápis, soubor se vytvoří s první částí řádků, kdy je známé schéma.
+
+        :param file_name: Cesta k souboru exportu.
+        :param headers: Názvy sloupců.
+        :param col_types: Seznam deklarovaných typů sloupců v databázi ve stejném pořadí jako headers.
+        """
+        import pyarrow
+        import pyarrow.parquet
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+        self.file_name = file_name
+        self.headers = list(headers)
+        self.col_types = list(col_types or [])
+        self.schema = None
+        self.writer = None
+
+
+    def infer_schema(self, rows):
+        """
+        Určí schéma souboru podle deklarovaných typů sloupců a hodnot první části řádků.
+        """
+        fields = []
+        for idx, col in enumerate(self.headers):
+            declared = str(self.col_types[idx] if idx < len(self.col_types) else "").upper()
+            values = [row[idx] for row in rows if row[idx] is not None]
+            if "INT" in declared:
+                pa_type = self.pa.int64()
+            elif any(name in declared for name in ("REAL", "FLOA", "DOUB")):
+                pa_type = self.pa.float64()
+            elif values and all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in values):
+                pa_type = self.pa.float64()
+            else:
+                pa_type = self.pa.string()
+            fields.append(self.pa.field(col, pa_type))
+        return self.pa.schema(fields)
+
+
+    def convert(self, value, pa_type):
+        """
+        Převede hodnotu z databáze na typ sloupce souboru. Prázdný text (formuláře ukládají
+        nevyplněné položky jako '') se v číselných sloupcích zapíše jako chybějící hodnota.
+        """
+        if value is None:
+            return None
+        if pa_type == self.pa.string():
+            return str(value)
+        if isinstance(value, str) and not value.strip():
+            return None
+        return value
+
+
+    def write_rows(self, rows):
+        """
+        Zapíše další část řádků jako skupinu řádků souboru.
+        """
+        if not rows:
+            return
+        if self.writer is None:
+            self.schema = self.infer_schema(rows)
+            self.writer = self.pq.ParquetWriter(self.file_name, self.schema)
+        arrays = [self.pa.array([self.convert(row[idx], field.type) for row in rows], type=field.type)
+                  for idx, field in enumerate(self.schema)]
+        self.writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+
+
+    def close(self):
+        """
+        Uzavře soubor, prázdný export uloží jen se schématem.
+        """
+        if self.writer is None:
+            self.schema = self.infer_schema([])
+            self.writer = self.pq.ParquetWriter(self.file_name, self.schema)
+        self.writer.close()
+
+
+class ExportJob:
+    """
+    Třída ExportJob provede export výsledku dotazu do souboru v samostatném vlákně s vlastním
+    připojením k databázi. Řádky se čtou kurzorem po částech (fetchmany) a hned se zapisují,
+    takže paměť nezávisí na počtu řádků. Průběh lze číst z hlavního vlákna a export lze zrušit.
+    """
+    writers = {".csv": CsvExportWriter, ".xlsx": XlsxExportWriter, ".parquet": ParquetExportWriter}
+    required_modules = {".xlsx": "openpyxl", ".parquet": "pyarrow"}
+
+    def __init__(self, db_path, file_name, query, params, headers, count_query=None, col_types=None,
+                 chunk_size=5000, attached=None):
+        """
+        Inicializace exportu.
+
+        :param db_path: Cesta k databázovému souboru.
+        :param file_name: Cesta k souboru exportu, formát se určí podle přípony (.csv, .xlsx, .parquet).
+        :param query: SQL dotaz s exportovanými řádky.
+        :param params: Parametry SQL dotazu.
+        :param headers: Názvy sloupců pro hlavičku souboru.
+        :param count_query: N-tice (dotaz, parametry) na počet řádků pro zobrazení průběhu, nebo None.
+        :param col_types: Seznam deklarovaných typů sloupců v databázi ve stejném pořadí jako headers.
+        :param chunk_size: Počet řádků načtených a zapsaných najednou.
+        :param attached: Slovník název schématu -> cesta k souboru databází, které dotaz čte (archivy).
+        """
+        self.db_path = db_path
+        self.file_name = file_name
+        self.query = query
+        self.params = params
+        self.headers = list(headers)
+        self.count_query = count_query
+        self.col_types = col_types
+        self.chunk_size = chunk_size
+        self.attached = dict(attached or {})
+        self.total = None
+        self.written = 0
+        self.error = None
+        self.cancelled = False
+        self.done = False
+        self.conn = None
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self.run, name="ExportJob", daemon=True)
+
+
+    @classmethod
+    def missing_module(cls, file_name):
+        """
+        Vrátí název chybějící knihovny potřebné pro formát souboru, nebo None, pokud je k dispozici.
+        """
+        module = cls.required_modules.get(os.path.splitext(file_name)[1].lower())
+        if module is None:
+            return None
+        try:
+            __import__(module)
+        except ImportError:
+            return module
+        return None
+
+
+    def start(self):
+        """
+        Spustí export ve vlákně.
+        """
+        self.thread.start()
+
+
+    def cancel(self):
+        """
+        Zruší probíhající export, rozpracovaný soubor se smaže.
+        """
+        with self.lock:
+            self.cancelled = True
+            if self.conn is not None:
+                self.conn.interrupt()
+
+
+    def run(self):
+        """
+        Provedení exportu ve vlákně.
+        """
+        writer = None
+        model = None
+        try:
+            model = Model(self.db_path, use_cache=False)
+            model.conn.execute("PRAGMA temp_store = FILE")
+            model.attach_databases(self.attached)
+            with self.lock:
+                self.conn = model.conn
+            if self.count_query is not None:
+                self.total = model.conn.execute(*self.count_query).fetchone()[0]
+            extension = os.path.splitext(self.file_name)[1].lower()
+            writer_class = self.writers.get(extension, CsvExportWriter)
+            writer = writer_class(self.file_name, self.headers, self.col_types)
+            cursor = model.conn.execute(self.query, self.params)
+            while not self.cancelled:
+                rows = cursor.fetchmany(self.chunk_size)
+                if not rows:
+                    break
+                writer.write_rows(rows)
+                self.written += len(rows)
+            cursor.close()
+        except Exception as e:
+            if not self.cancelled:
+                self.error = e.with_traceback(None)
+        finally:
+            if writer is not None:
+                try:
+                    writer.close()
+                except Exception as e:
+                    if self.error is None and not self.cancelled:
+                        self.error = e.with_traceback(None)
+            with self.lock:
+                self.conn = None
+            del model
+            if (self.cancelled or self.error is not None) and os.path.exists(self.file_name):
+                try:
+                    os.remove(self.file_name)
+                except OSError:
+                    pass
+            self.done = True
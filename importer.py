@@ -0,0 +1,442 @@
+import csv
+import os
+import sqlite3
+import threading
+
+from commonresources import CommonResources
+from model import Model
+from movements import BatchMovements
+from validation import check_item, normalize_code
+
+class ImportJob:
+    """
+    Třída ImportJob provede hromadný import souboru csv do tabulky v samostatném vlákně s vlastním
+    připojením k databázi. Soubor se čte po řádcích, sloupce se přiřadí podle hlavičky (názvy
+    z CommonResources.tab2hum nebo názvy sloupců tabulky) a každý řádek se zkontroluje stejnými
+    pravidly jako při ručním zadání. Platné řádky se po částech zapíšou příkazem executemany
+    (nové vloží, existující podle ID aktualizují), každá část v samostatné transakci. Odmítnuté
+    řádky se zapíšou s důvodem do souboru <název>_odmitnute.csv, který lze po opravě znovu importovat.
+    """
+    sniff_size = 65536
+
+    def __init__(self, db_path, file_name, table, chunk_size=5000):
+        """
+        Inicializace importu.
+
+        :param db_path: Cesta k databázovému souboru.
+        :param file_name: Cesta k importovanému souboru csv.
+        :param table: Název tabulky, do které se importuje (jedna z CommonResources.import_tables).
+        :param chunk_size: Počet řádků zapsaných v jedné transakci.
+        """
+        self.db_path = db_path
+        self.file_name = file_name
+        self.table = table
+        self.chunk_size = chunk_size
+        self.reject_file_name = os.path.splitext(file_name)[0] + "_odmitnute.csv"
+        self.rules = CommonResources.item_rules[table]
+        self.total = os.path.getsize(file_name)
+        self.processed = 0
+        self.rows_read = 0
+        self.imported = 0
+        self.rejected = 0
+        self.error = None
+        self.cancelled = False
+        self.done = False
+        self.reject_file = None
+        self.reject_writer = None
+        self.header = []
+        self.thread = threading.Thread(target=self.run, name="ImportJob", daemon=True)
+
+
+    def start(self):
+        """
+        Spustí import ve vlákně.
+        """
+        self.thread.start()
+
+
+    def cancel(self):
+        """
+        Zruší probíhající import, dříve zapsané části zůstanou uložené.
+        """
+        self.cancelled = True
+
+
+    def map_header(self, header):
+        """
+        Přiřadí sloupce souboru ke sloupcům tabulky podle lidských názvů z CommonResources.tab2hum
+        nebo přímo podle názvů sloupců (bez ohledu na velikost písmen), u skladu i sloupce zařízení
+        (zkratky zařízení s hodnotou 0 / 1). Neznámé sloupce se ignorují.
+
+        :param header: Seznam názvů sloupců z hlavičky souboru.
+        :return: Seznam n-tic (index sloupce v souboru, název sloupce tabulky).
+        """
+        accepted = list(self.col_names) + list(self.device_ids)
+        if self.table == "varianty":
+            accepted.append("Dodavatel")
+        names = {}
+        for col in accepted:
+            names[CommonResources.tab2hum.get(col, col).strip().casefold()] = col
+        for col in accepted:
+            names[col.casefold()] = col
+        mapping = []
+        mapped_cols = set()
+        for idx, name in enumerate(header):
+            col = names.get(name.strip().casefold())
+            if col is not None and col not in mapped_cols:
+                mapping.append((idx, col))
+                mapped_cols.add(col)
+        return mapping
+
+
+    def load_keys(self, model):
+        """
+        Načte existující klíče a převodní slovníky potřebné pro kontrolu a doplnění importovaných řádků.
+        """
+        self.existing_ids = {row[0] for row in model.fetch_column_values(self.table, [self.id_col])}
+        self.next_id = max(self.existing_ids, default=0) + 1
+        if self.table == "sklad":
+            self.next_interne_cislo = model.get_max_interne_cislo() + 1
+        elif self.table == "varianty":
+            self.variant_ids = {(id_sklad, id_dodavatele): id_num for id_num, id_sklad, id_dodavatele
+                                in model.fetch_column_values("varianty", ["id", "id_sklad", "id_dodavatele"])}
+            self.sklad_ids = {row[0] for row in model.fetch_column_values("sklad", ["Evidencni_cislo"])}
+            suppliers = model.fetch_column_values("dodavatele", ["Dodavatel", "id"])
+            self.supplier_ids = {name: id_num for name, id_num in suppliers}
+            self.supplier_names = {id_num: name for name, id_num in suppliers}
+
+
+    @staticmethod
+    def to_int(value):
+        """
+        Převede text na celé číslo, nebo vrátí None, pokud to není celé nezáporné číslo.
+        """
+        return int(value) if value.isdigit() else None
+
+
+    def prepare_variant(self, values):
+        """
+        Doplní u varianty id dodavatele podle názvu dodavatele (nebo naopak) a ID existující varianty
+        se stejnou skladovou položkou a dodavatelem.
+
+        :return: None, pokud je varianta v pořádku, jinak text důvodu odmítnutí.
+        """
+        id_sklad = self.to_int(values.get("id_sklad", ""))
+        if id_sklad is None or id_sklad not in self.sklad_ids:
+            return f"Skladová položka s evidenčním číslem '{values.get('id_sklad', '')}' neexistuje."
+        id_dodavatele = self.to_int(values.get("id_dodavatele", ""))
+        if id_dodavatele is None and values.get("Dodavatel"):
+            id_dodavatele = self.supplier_ids.get(values["Dodavatel"])
+        if id_dodavatele is None or id_dodavatele not in self.supplier_names:
+            return f"Dodavatel '{values.get('Dodavatel') or values.get('id_dodavatele', '')}' neexistuje."
+        values["id_dodavatele"] = str(id_dodavatele)
+        values["Dodavatel"] = self.supplier_names[id_dodavatele]
+        if not values.get(self.id_col) and (id_sklad, id_dodavatele) in self.variant_ids:
+            values[self.id_col] = str(self.variant_ids[(id_sklad, id_dodavatele)])
+        return None
+
+
+    def prepare_row(self, values):
+        """
+        Zkontroluje importovaný řádek pravidly z CommonResources.item_rules (pro nový řádek pravidla
+        přidání, pro existující pravidla úpravy jen u aktualizovaných sloupců) a doplní hodnoty
+        nového řádku (ID, výchozí hodnoty).
+
+        :param values: Slovník hodnot řádku jako řetězců podle sloupců tabulky.
+        :return: N-tice (n-tice hodnot pro zápis, nebo None, text důvodu odmítnutí, nebo None).
+        """
+        if self.table == "varianty":
+            reason = self.prepare_variant(values)
+            if reason:
+                return None, reason
+        for code in self.mapped_devices:
+            if values[code] not in ("", "0", "1"):
+                return None, f"Zařízení {code} musí mít hodnotu 0 nebo 1."
+        id_value = values.get(self.id_col, "")
+        id_num = self.to_int(id_value) if id_value else None
+        if id_value and id_num is None:
+            return None, f"Položka {CommonResources.tab2hum.get(self.id_col, self.id_col)} musí být celé nezáporné číslo."
+        is_new = id_num not in self.existing_ids
+        if is_new:
+            rules = self.rules["add"]
+            for col, default in rules.get("defaults", {}).items():
+                if not values.get(col):
+                    values[col] = str(default)
+        else:
+            rules = self.edit_rules
+        warning = check_item(rules, values)
+        if warning:
+            return None, " ".join(warning[1].split())
+
+        if is_new:
+            if id_num is None:
+                id_num = self.next_id
+            self.next_id = max(self.next_id, id_num + 1)
+            values[self.id_col] = str(id_num)
+            if self.table == "sklad" and not values.get("Interne_cislo"):
+                values["Interne_cislo"] = str(self.next_interne_cislo)
+                self.next_interne_cislo += 1
+            for col in rules.get("code", {}):
+                values[col] = normalize_code(values[col])
+            self.existing_ids.add(id_num)
+            if self.table == "varianty":
+                self.variant_ids[(int(values["id_sklad"]), int(values["id_dodavatele"]))] = id_num
+        return tuple(self.convert(col, values.get(col, "")) for col in self.columns), None
+
+
+    def convert(self, col, value):
+        """
+        Převede prázdnou hodnotu číselného sloupce na NULL, ostatní hodnoty zapíše beze změny
+        (převod na číslo provede SQLite podle typu sloupce).
+        """
+        if value == "" and self.numeric_cols.get(col):
+            return None
+        return value
+
+
+    def reject(self, line_num, row, reason):
+        """
+        Zapíše odmítnutý řádek s důvodem do souboru odmítnutých řádků.
+        """
+        if self.reject_writer is None:
+            self.reject_file = open(self.reject_file_name, mode='w', newline='', encoding='utf-8-sig')
+            self.reject_writer = csv.writer(self.reject_file, dialect=self.dialect)
+            self.reject_writer.writerow(list(self.header) + ["Řádek souboru", "Důvod odmítnutí"])
+        row = list(row) + [""] * (len(self.header) - len(row))
+        self.reject_writer.writerow(row[:len(self.header)] + [line_num, reason])
+        self.rejected += 1
+
+
+    def write_chunk(self, model, chunk):
+        """
+        Zapíše část platných řádků v jedné transakci. Pokud zápis poruší omezení integrity
+        (např. duplicitní název dodavatele), transakce se vrátí zpět a řádky se zapíšou jednotlivě,
+        aby se odmítly jen chybné řádky.
+
+        :param chunk: Seznam n-tic (číslo řádku souboru, původní řádek, hodnoty pro zápis,
+                      vazby na zařízení).
+        """
+        try:
+            with model.transaction():
+                model.upsert_many(self.table, self.id_col, self.columns, self.update_columns,
+                                  [values for _, _, values, _ in chunk])
+                self.after_write(model, chunk)
+            self.imported += len(chunk)
+            return
+        except sqlite3.IntegrityError:
+            pass
+        with model.transaction():
+            written = []
+            for item in chunk:
+                line_num, row, values, _ = item
+                try:
+                    model.upsert_many(self.table, self.id_col, self.columns, self.update_columns, [values])
+                except sqlite3.IntegrityError as e:
+                    self.reject(line_num, row, f"Porušení integrity databáze: {e}")
+                    continue
+                written.append(item)
+            self.after_write(model, written)
+        self.imported += len(written)
+
+
+    def after_write(self, model, chunk):
+        """
+        Po zápisu skladových položek nastaví jejich vazby na zařízení podle sloupců zařízení v souboru.
+        """
+        links = [link for _, _, _, item_links in chunk for link in item_links]
+        if links:
+            model.update_device_links(links)
+
+
+    def prepare_columns(self, model, mapping):
+        """
+        Určí sloupce pro zápis - sloupce ze souboru, ID, doplňované a výchozí hodnoty nových řádků -
+        a sloupce, které se u existujících řádků aktualizují (bez sloupců jen pro čtení).
+        """
+        self.mapping = mapping
+        self.mapped_devices = [col for _, col in mapping if col in self.device_ids]
+        mapped = [col for _, col in mapping if col in self.col_names]
+        extra = [self.id_col]
+        if self.table == "sklad":
+            extra.append("Interne_cislo")
+        elif self.table == "varianty":
+            extra.append("id_dodavatele")
+        extra.extend(self.rules["add"].get("defaults", {}))
+        self.columns = list(dict.fromkeys(extra + mapped))
+        read_only = set(self.rules["edit"].get("read_only", ())) | {self.id_col}
+        self.update_columns = [col for col in mapped if col not in read_only]
+        self.edit_rules = {key: tuple(col for col in cols if col in self.update_columns)
+                           for key, cols in self.rules["edit"].items() if key != "read_only"}
+        col_types = model.schema.col_types(self.table)
+        self.numeric_cols = {col: any(name in str(col_types.get(col, "")).upper()
+                                      for name in ("INT", "REAL", "FLOA", "DOUB", "NUM"))
+                             for col in self.columns}
+
+
+    def run(self):
+        """
+        Provedení importu ve vlákně.
+        """
+        model = None
+        try:
+            model = Model(self.db_path, use_cache=False)
+            self.col_names = model.schema.col_names(self.table)
+            self.device_ids = {}
+            if self.table == "sklad":
+                self.device_ids = dict(model.fetch_column_values("zarizeni", ["Zarizeni", "id"]))
+            self.id_col = model.schema.primary_key(self.table)[0]
+            with open(self.file_name, mode='r', newline='', encoding='utf-8-sig') as csv_file:
+                sample = csv_file.read(self.sniff_size)
+                csv_file.seek(0)
+                try:
+                    self.dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+                except csv.Error:
+                    self.dialect = csv.excel
+                reader = csv.reader(csv_file, self.dialect)
+                self.header = next(reader, [])
+                mapping = self.map_header(self.header)
+                if not any(col in self.col_names for _, col in mapping):
+                    raise ValueError(f"Hlavička souboru neobsahuje žádný sloupec tabulky {self.table}.")
+                self.prepare_columns(model, mapping)
+                self.load_keys(model)
+
+                chunk = []
+                for row in reader:
+                    if self.cancelled:
+                        break
+                    self.rows_read += 1
+                    line_num = reader.line_num
+                    if not any(cell.strip() for cell in row):
+                        continue
+                    values = {col: (row[idx].strip() if idx < len(row) else "") for idx, col in mapping}
+                    values_to_write, reason = self.prepare_row(values)
+                    if reason:
+                        self.reject(line_num, row, reason)
+                        continue
+                    id_num = int(values[self.id_col])
+                    links = [(id_num, self.device_ids[code], values[code] == "1") for code in self.mapped_devices]
+                    chunk.append((line_num, row, values_to_write, links))
+                    if len(chunk) >= self.chunk_size:
+                        self.write_chunk(model, chunk)
+                        chunk = []
+                        self.processed = csv_file.buffer.tell()
+                if chunk and not self.cancelled:
+                    self.write_chunk(model, chunk)
+                self.processed = self.total
+        except Exception as e:
+            self.error = e.with_traceback(None)
+        finally:
+            if self.reject_file is not None:
+                self.reject_file.close()
+            del model
+            self.done = True
+
+
+class MovementImportJob:
+    """
+    Třída MovementImportJob provede hromadné pohyby ze souboru csv v samostatném vlákně s vlastním
+    připojením k databázi. Soubor se načte (záhlaví názvy sloupců nebo jejich popisy z tab2hum,
+    oddělovač se rozpozná, jinak se použije čárka), pohyby se zpracují třídou BatchMovements v jedné
+    transakci a výsledky jednotlivých řádků se uloží do souboru <název>_vysledek.csv.
+    """
+    sniff_size = 65536
+    progress_rows = 1000
+
+    def __init__(self, db_path, file_name, name_of_user):
+        """
+        Inicializace hromadných pohybů ze souboru.
+
+        :param db_path: Cesta k databázovému souboru.
+        :param file_name: Cesta k souboru csv s pohyby.
+        :param name_of_user: Jméno uživatele, který pohyby provádí.
+        """
+        self.db_path = db_path
+        self.file_name = file_name
+        self.name_of_user = name_of_user
+        self.report_file_name = os.path.splitext(file_name)[0] + "_vysledek.csv"
+        self.total = 0
+        self.processed = 0
+        self.rows_read = 0
+        self.saved = 0
+        self.report = []
+        self.saving = False
+        self.error = None
+        self.cancelled = False
+        self.done = False
+        self.thread = threading.Thread(target=self.run, name="MovementImportJob", daemon=True)
+
+
+    def start(self):
+        """
+        Spustí zpracování ve vlákně.
+        """
+        self.thread.start()
+
+
+    def cancel(self):
+        """
+        Zruší zpracování během načítání souboru, pohyby se uloží jen po načtení celého souboru.
+        """
+        if not self.saving:
+            self.cancelled = True
+
+
+    def read_lines(self):
+        """
+        Načte pohyby ze souboru jako seznam slovníků název sloupce -> hodnota.
+        """
+        hum2tab = {value: key for key, value in CommonResources.tab2hum.items()}
+        self.total = os.path.getsize(self.file_name)
+        lines = []
+        with open(self.file_name, mode='r', newline='', encoding='utf-8-sig') as csv_file:
+            sample = csv_file.read(self.sniff_size)
+            csv_file.seek(0)
+            try:
+                dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+            except csv.Error:
+                dialect = csv.excel
+            reader = csv.DictReader(csv_file, dialect=dialect)
+            for row in reader:
+                if self.cancelled:
+                    break
+                lines.append({hum2tab.get(key, key): value for key, value in row.items() if key is not None})
+                self.rows_read += 1
+                if not self.rows_read % self.progress_rows:
+                    self.processed = csv_file.buffer.tell()
+            header = [hum2tab.get(name, name) for name in reader.fieldnames or []]
+        if "Evidencni_cislo" not in header:
+            raise ValueError(f"Hlavička souboru neobsahuje sloupec '{CommonResources.tab2hum['Evidencni_cislo']}'.")
+        self.processed = self.total
+        return lines
+
+
+    def write_report(self):
+        """
+        Uloží výsledky jednotlivých řádků do souboru výsledků.
+        """
+        with open(self.report_file_name, mode='w', newline='', encoding='utf-8') as csv_file:
+            csv_writer = csv.writer(csv_file)
+            csv_writer.writerow(["Řádek", "Uloženo", "Zpráva"])
+            for result in self.report:
+                csv_writer.writerow([result["line"], "ANO" if result["ok"] else "NE", result["message"]])
+
+
+    def run(self):
+        """
+        Provedení hromadných pohybů ve vlákně.
+        """
+        model = None
+        try:
+            lines = self.read_lines()
+            if self.cancelled:
+                return
+            self.saving = True
+            model = Model(self.db_path, use_cache=False)
+            self.report = BatchMovements(model, self.name_of_user).apply(lines)
+            self.saved = sum(result["ok"] for result in self.report)
+            self.write_report()
+        except Exception as e:
+            self.error = e.with_traceback(None)
+        finally:
+            del model
+            self.done = True
@@ -5,6 +5,8 @@ from datetime import datetime, timedelta
 import re
 
 from commonresources import CommonResources
+from movements import check_movement, calculate_movement
+from validation import check_item, normalize_code
 
 class ItemFrameBase:
     """
@@ -22,12 +24,13 @@ class ItemFrameBase:
         self.master = master
         self.controller = controller
         self.col_names = col_names
+        self.col_index = {col: idx for idx, col in enumerate(col_names)}
         self.tab2hum = CommonResources.tab2hum
         self.current_table = current_table
         self.check_columns = check_columns
         self.action = action
         self.suppliers_dict = self.controller.fetch_dict("dodavatele")
-        self.suppliers = tuple(sorted(self.suppliers_dict.keys()))
+        self.suppliers = self.controller.fetch_sorted_names("dodavatele")
         self.current_user = self.controller.current_user
         self.name_of_user = self.controller.name_of_user
         self.unit_dict = CommonResources.item_frame_unit_dict
@@ -37,6 +40,7 @@ class ItemFrameBase:
         self.special_columns = ('Ucetnictvi', 'Kriticky_dil', 'Pod_minimem')
         self.new_id = None
         self.new_interne_cislo = None
+        self.device_states = {}
         self.actual_date = datetime.now().strftime("%Y-%m-%d")
 
         self.initialize_fonts()
@@ -49,100 +53,66 @@ class ItemFrameBase:
         """ 
         entry_dict = {
             "sklad": {
-                "edit": {
-                    "read_only": ('Evidencni_cislo', 'Mnozstvi_ks_m_l', 'Jednotky', 'Dodavatel',
-                                  'Datum_nakupu', 'Jednotkova_cena_EUR', 'Celkova_cena_EUR'),
-                    "mandatory": ('Min_Mnozstvi_ks', 'Nazev_dilu',),
-                    "not_neg_integer": ('Interne_cislo', 'Min_Mnozstvi_ks',),
-                    },
+                "edit": CommonResources.item_rules["sklad"]["edit"],
                 "add": {
+                    **CommonResources.item_rules["sklad"]["add"],
                     "read_only": ('Evidencni_cislo', 'Interne_cislo', 'Mnozstvi_ks_m_l', 'Jednotkova_cena_EUR',
                                   'Celkova_cena_EUR', 'Objednano', 'Cislo_objednavky', 'Jednotky', 'Dodavatel',),
                     "pack_forget": ('Objednano', 'Mnozstvi_ks_m_l', 'Datum_nakupu', 'Cislo_objednavky',
                                     'Jednotkova_cena_EUR', 'Celkova_cena_EUR',),
                     "insert": {'Evidencni_cislo': self.new_id, 'Interne_cislo': self.new_interne_cislo, 'Mnozstvi_ks_m_l': '0',
                                'Jednotkova_cena_EUR': '0.0', 'Celkova_cena_EUR': '0.0',},
-                    "mandatory": ('Min_Mnozstvi_ks', 'Nazev_dilu', 'Jednotky',),
-                    "not_neg_integer":('Min_Mnozstvi_ks',),
                     },
                 "prijem": {
+                    **CommonResources.movement_rules["prijem"],
                     "grid_forget": ('Nazev_dilu', 'Celkova_cena_EUR', 'Pouzite_zarizeni',
                                     'Datum_vydeje', 'Cas_operace', 'id'),
-                    "mandatory": ('Zmena_mnozstvi', 'Umisteni', 'Dodavatel', 'Cislo_objednavky'),
-                    "date": ('Datum_nakupu',),
-                    "pos_real": ('Jednotkova_cena_EUR',),
-                    "pos_integer":('Zmena_mnozstvi',),
                     "actual_value": {'Typ_operace': "PŘÍJEM", 'Operaci_provedl': self.name_of_user,
                                      'Datum_nakupu': self.actual_date, 'Datum_vydeje': "",},
-                    "tuple_values_to_save": ('Objednano', 'Mnozstvi_ks_m_l', 'Umisteni', 'Dodavatel', 'Datum_nakupu',
-                                             'Cislo_objednavky', 'Jednotkova_cena_EUR', 'Celkova_cena_EUR', 'Poznamka'),
                     "read_only": ('Ucetnictvi', 'Evidencni_cislo', 'Interne_cislo', 'Jednotky', 'Mnozstvi_ks_m_l',
                                   'Typ_operace', 'Operaci_provedl', 'Pouzite_zarizeni', 'Dodavatel'),
-                    "insert_item_value": ('Ucetnictvi', 'Evidencni_cislo', 'Interne_cislo', 'Jednotky', 'Mnozstvi_ks_m_l',
-                                          'Umisteni', 'Jednotkova_cena_EUR', 'Objednano', 'Poznamka', 'Nazev_dilu'),
                     },
                 "vydej": {
+                    **CommonResources.movement_rules["vydej"],
                     "grid_forget": ('Nazev_dilu', 'Celkova_cena_EUR', 'Objednano', 'Dodavatel', 'Cas_operace',
                                     'Cislo_objednavky', 'Jednotkova_cena_EUR', 'Datum_nakupu', 'id'),
-                    "mandatory": ('Zmena_mnozstvi', 'Pouzite_zarizeni', 'Umisteni'),
-                    "date":('Datum_vydeje',),
-                    "pos_integer":('Zmena_mnozstvi',),
                     "actual_value": {'Typ_operace': "VÝDEJ", 'Operaci_provedl': self.name_of_user,
                                      'Datum_nakupu': "", 'Datum_vydeje': self.actual_date,},
-                    "tuple_values_to_save": ('Mnozstvi_ks_m_l', 'Umisteni', 'Poznamka', 'Celkova_cena_EUR'),
                     "read_only": ('Ucetnictvi', 'Evidencni_cislo', 'Interne_cislo', 'Jednotky', 'Mnozstvi_ks_m_l',
                                   'Typ_operace', 'Operaci_provedl', 'Pouzite_zarizeni', 'Dodavatel'),
-                    "insert_item_value": ('Ucetnictvi', 'Evidencni_cislo', 'Interne_cislo', 'Jednotky', 'Mnozstvi_ks_m_l',
-                                          'Umisteni', 'Jednotkova_cena_EUR', 'Objednano', 'Poznamka', 'Nazev_dilu'),
                     },
                 },
             "dodavatele": {
-                "edit": {
-                    "read_only": ('id', 'Dodavatel'),
-                    "mandatory": ('Jazyk',),
-                    },
+                "edit": CommonResources.item_rules["dodavatele"]["edit"],
                 "add": {
+                    **CommonResources.item_rules["dodavatele"]["add"],
                     "read_only": ('id',),
                     "insert": {'id': self.new_id},
-                    "mandatory": ('Dodavatel', 'Jazyk',),
                     },
                 },
             "zarizeni": {
-                "edit": {
-                    "read_only": ('id', 'Zarizeni'),
-                    "mandatory": ('Zarizeni', 'Nazev_zarizeni', 'Umisteni', 'Typ_zarizeni',),
-                    },
+                "edit": CommonResources.item_rules["zarizeni"]["edit"],
                 "add": {
+                    **CommonResources.item_rules["zarizeni"]["add"],
                     "read_only": ('id',),
                     "insert": {'id': self.new_id},
-                    "mandatory": ('Zarizeni', 'Nazev_zarizeni', 'Umisteni', 'Typ_zarizeni',),
                     },
                 },
             "varianty": {
-                "edit": {
-                    "read_only": ('id', 'id_sklad', 'id_dodavatele',),
-                    "mandatory": ('Nazev_varianty', 'Cislo_varianty',),
-                    "not_neg_real":('Jednotkova_cena_EUR',),
-                    "not_neg_integer": ('Dodaci_lhuta', 'Min_obj_mnozstvi'),
-                    },
+                "edit": CommonResources.item_rules["varianty"]["edit"],
                 "add": {
+                    **CommonResources.item_rules["varianty"]["add"],
                     "read_only": ('id','Nazev_dilu', 'id_sklad', 'Dodavatel', 'id_dodavatele',),
-                    "mandatory": ('Nazev_varianty', 'Cislo_varianty', 'Dodavatel', 'Jednotkova_cena_EUR',),
                     "insert": {'Dodaci_lhuta': 0, 'Min_obj_mnozstvi':0,},
-                    "not_neg_real":('Jednotkova_cena_EUR',),
-                    "not_neg_integer": ('Dodaci_lhuta', 'Min_obj_mnozstvi'),
                     "calculate": 'id_dodavatele',
                     },
                 },
             "uzivatele": {
-                "edit": {
-                    "read_only": ('id', 'username'),
-                    "mandatory": ('password_hash', 'name', 'role',),
-                    },
+                "edit": CommonResources.item_rules["uzivatele"]["edit"],
                 "add": {
+                    **CommonResources.item_rules["uzivatele"]["add"],
                     "read_only": ('id',),
                     "insert": {'id': self.new_id},
-                    "mandatory": ('username', 'password_hash', 'name', 'role',),
                     },
                 },
             }
@@ -243,33 +213,13 @@ class ItemFrameBase:
         """
         Metoda pro kontrolu zadání povinných dat a kontrolu správnosti dat před uložením. 
         """
-        for col in self.curr_entry_dict.get("mandatory", []):
-            if not self.entries[col].get():
-                messagebox.showwarning("Chyba", f"Před uložením nejdříve zadejte položku {self.tab2hum.get(col, col)}")
-                self.entries[col].focus()
-                return
-            
-        for col in self.curr_entry_dict.get("not_neg_integer", []):
-            entry_val = self.entries[col].get()
-            if not entry_val.isdigit() or int(entry_val) < 0:
-                messagebox.showwarning("Chyba", f"Položka {self.tab2hum.get(col, col)} musí být celé nezáporné číslo.")
-                self.entries[col].focus()
-                return
-            
-        for col in set(self.curr_entry_dict.get("pos_real", [])).union(self.curr_entry_dict.get("not_neg_real", [])):
-            entry_val = self.entries[col].get()
-            if entry_val:
-                try:
-                    float_entry_val = float(entry_val)
-                    if col in self.curr_entry_dict.get("pos_real", []) and float_entry_val <= 0:
-                        messagebox.showwarning("Chyba", f"Položka {self.tab2hum.get(col, col)} musí být kladné reálné číslo s desetinnou tečkou.")
-                        return
-                    if col in self.curr_entry_dict.get("not_neg_real", []) and float_entry_val < 0:
-                        messagebox.showwarning("Chyba", f"Položka {self.tab2hum.get(col, col)} musí být nezáporné reálné číslo s desetinnou tečkou.")
-                        return 
-                except ValueError:
-                    messagebox.showwarning("Chyba", f"Položka {self.tab2hum.get(col, col)} není platné reálné číslo s desetinnou tečkou.")
-                    return
+        values = {col: entry.get() for col, entry in self.entries.items()}
+        warning = check_item(self.curr_entry_dict, values)
+        if warning:
+            col, message = warning
+            messagebox.showwarning("Chyba", message)
+            self.entries[col].focus()
+            return
 
         if self.action=="add":
             if self.current_table=="zarizeni":
@@ -285,19 +235,13 @@ class ItemFrameBase:
 
     def check_length(self):
         """
-        Metoda pro kontrolu délky normalizované zkratky názvu zařízení.
+        Metoda pro normalizaci zkratky názvu zařízení, délka normalizované zkratky
+        se kontroluje v check_item podle pravidla "code".
         """
         col = "Zarizeni"
-        entry_val = self.entries[col].get()
-        normalized = unicodedata.normalize('NFKD', entry_val).encode('ASCII', 'ignore').decode('ASCII')
-        final_val = normalized.upper().replace(" ", "_")
+        final_val = normalize_code(self.entries[col].get())
         self.entries[col].delete(0, "end")
         self.entries[col].insert(0, final_val)
-        if len(final_val) > 8:
-            messagebox.showwarning("Varování", f"Zkratka zařízení po normalizaci:\n{final_val}\n je delší než 10 znaků.")
-            self.entries[col].focus()
-            return False
-        self.new_col_name = final_val
         return True
 
 
@@ -332,15 +276,15 @@ class ItemFrameBase:
             else:
                 col_names_to_save = self.col_names
             values_to_insert = [combined_values[col] for col in col_names_to_save]
-            if self.current_table == 'zarizeni':
-                success = self.controller.add_column_and_set_default(self.new_col_name)
-                if not success: return
             success = self.controller.insert_new_item(self.current_table, col_names_to_save, values_to_insert)
             if not success: return
             self.id_num = int(self.new_id)
         elif self.action == "edit" and self.id_num is not None:
             success = self.controller.update_row(self.current_table, self.id_num, self.id_col_name, combined_values)
             if not success: return
+        if self.device_states:
+            devices = [device for device, state in self.device_states.items() if state.get()]
+            self.controller.update_item_devices(int(self.id_num), devices)
         self.controller.show_data(self.current_table, self.id_num)
 
 
@@ -403,9 +347,33 @@ class ItemFrameBase:
                     label.pack_forget()
                     entry.pack_forget()
             frame.pack(fill=tk.X)
+        self.show_devices(self.item_values[0] if self.item_values else None)
         self.entries[self.curr_table_config["focus"]].focus()
 
 
+    def show_devices(self, id_num=None, read_only=False):
+        """
+        Zobrazení checkbuttonů zařízení, ve kterých se skladová položka používá, v samostatném
+        framu. Zařízení nejsou sloupce tabulky sklad, ale vazby v tabulce sklad_zarizeni.
+
+        :param id_num: Evidenční číslo skladové položky, None pro novou položku.
+        :param read_only: True pro pouhé zobrazení bez možnosti změny.
+        """
+        self.device_states = {}
+        if self.current_table != "sklad" or self.action not in ("show", "edit", "add"):
+            return
+        item_devices = set(self.controller.fetch_item_devices(int(id_num))) if id_num is not None else set()
+        devices_frame = tk.LabelFrame(self.right_frame, text="Zařízení")
+        for device in self.controller.fetch_sorted_names("zarizeni"):
+            self.device_states[device] = tk.BooleanVar(value=device in item_devices)
+            checkbutton = tk.Checkbutton(devices_frame, text=device, variable=self.device_states[device])
+            checkbutton.pack(anchor="w", padx=5)
+            if read_only:
+                checkbutton.bind("<Enter>", lambda event, cb=checkbutton: cb.config(state="disabled"))
+                checkbutton.bind("<Leave>", lambda event, cb=checkbutton: cb.config(state="normal"))
+        devices_frame.pack(fill=tk.X, padx=2, pady=2)
+
+
     def supplier_number(self, entry=None):
         """
         Metoda na vložení čísla dodavatele do entry pro id_dodavatele dle vybraného dodavatele v comboboxu.
@@ -468,6 +436,7 @@ class ItemFrameShow(ItemFrameBase):
                 label = tk.Label(frame, text=label_text, borderwidth=2, relief="ridge", wraplength=250)
                 label.pack(fill=tk.X)
             frame.pack(fill=tk.X)              
+        self.show_devices(self.item_values[0], read_only=True)
 
 
 class ItemFrameInquiry(ItemFrameBase):
@@ -485,12 +454,13 @@ class ItemFrameInquiry(ItemFrameBase):
         self.update_frames()
                           
 
-    def create_inquiry_form(self, tree, selected_supplier):
+    def create_inquiry_form(self, ids, selected_supplier):
         """
         Metoda pro zobrazení vybrané položky z Treeview ve frame item_frame
         Název položky je v title_frame, zbylé informace v show_frame.
 
-        :param item_values: n-tice řetězců obsahující hodnoty sloupců označené položky.
+        :param ids: id všech vyfiltrovaných řádků zobrazených v Treeview (i dosud nenačtených).
+        :param selected_supplier: dodavatel, pro kterého se tvoří poptávka.
         """
         self.initialize_current_entry_dict()
         self.init_curr_dict()
@@ -503,11 +473,7 @@ class ItemFrameInquiry(ItemFrameBase):
         inquiry_email_adress = self.lang_dict["adress"][supplier_lang]
         inquiry_email_start = self.lang_dict["inquiry_email_start"][supplier_lang]
         
-        ids = []
-        for item in tree.get_children():
-            item_values = tree.item(item, 'values') 
-            ids.append(item_values[0])          
-        data_for_inquiry = self.controller.fetch_data_for_inquiry(ids)
+        data_for_inquiry = self.controller.fetch_data_for_inquiry(ids, selected_supplier_dict["id"]) or []
 
         self.inquiry_texts = tk.Text(self.left_frame, font=self.default_font)
         self.inquiry_texts.pack()
@@ -667,8 +633,8 @@ class ItemFrameMovements(ItemFrameBase):
 
         self.left_frame.columnconfigure(1, weight=1)
         for idx, col in enumerate(self.audit_log_col_names):
-            if col in self.col_names:
-                index = self.col_names.index(col)
+            if col in self.col_index:
+                index = self.col_index[col]
             label = tk.Label(self.left_frame, text=self.tab2hum.get(col, col))
             label.grid(row=idx, column=0, sticky="ew", padx=5, pady=2)
             if col == 'Pouzite_zarizeni':
@@ -711,45 +677,14 @@ class ItemFrameMovements(ItemFrameBase):
         """
         Metoda pro kontrolu zadání povinných dat a kontrolu správnosti dat před uložením. 
         """
-        for col in self.curr_entry_dict.get("mandatory", []):
-            if not self.entries_al[col].get():
-                self.show_warning(col, f"Před uložením nejdříve zadejte položku {self.tab2hum.get(col, col)}")
-                return
-            
-        for col in self.curr_entry_dict.get("pos_integer", []):
-            entry_val = self.entries_al[col].get()
-            if not entry_val.isdigit() or int(entry_val) <= 0:
-                self.show_warning(col, f"Položka {self.tab2hum.get(col, col)} musí být kladné celé číslo.")
-                return
-
-        self.quantity_change = int(self.entries_al['Zmena_mnozstvi'].get())
-        self.quantity = int(self.entries_al['Mnozstvi_ks_m_l'].get())
-
-        if self.action=='vydej' and self.quantity_change > self.quantity:
-                self.show_warning('Zmena_mnozstvi', "Vydávané množství je větší než množství na skladě.")
-                return
-
-        for col in self.curr_entry_dict.get("pos_real", []):
-            entry_val = self.entries_al[col].get()
-            try:
-                float_entry_val = float(entry_val)
-                if float_entry_val <= 0:
-                    self.show_warning(col, f"Položka {self.tab2hum.get(col, col)} musí být kladné reálné číslo s desetinnou tečkou.")
-                    return
-            except ValueError:
-                self.show_warning(col, f"Položka {self.tab2hum.get(col, col)} není platné kladné reálné číslo s desetinnou tečkou.")
-                return
-
-        for col in self.curr_entry_dict.get("date", []):
-            date_str = self.entries_al[col].get()
-            if not re.match(r'^\d{4}-\d{2}-\d{2}$', date_str):
-                self.show_warning(col, "Datum nákupu musí být ve formátu RRRR-MM-DD.")
-                return
-            try:
-                datetime.strptime(date_str, "%Y-%m-%d")
-            except ValueError:
-                self.show_warning(col, f"Neplatné datum: {date_str}. Zadejte prosím platné datum.")
-                return
+        values = {col: entry_al.get() for col, entry_al in self.entries_al.items()}
+        warning = check_movement(self.curr_entry_dict, self.action, values)
+        if warning:
+            self.show_warning(*warning)
+            return
+
+        self.quantity_change = int(values['Zmena_mnozstvi'])
+        self.quantity = int(values['Mnozstvi_ks_m_l'])
 
         self.calculate_and_save()
 
@@ -757,32 +692,35 @@ class ItemFrameMovements(ItemFrameBase):
     def calculate_and_save(self): 
         """
         Metoda uložení dat výpočet hodnot před uložením do skladu a audit_logu a pro uložení
-        změn do tabulky sklad a nového zápisu do tabulky audit_log. Pokud je při příjmu zjištěno,
-        že ještě neexistuje varianta skladové položky se zadaným dodavatelem, tak připraví okno na
-        vytvoření nové varianty.
+        změn do tabulky sklad, nového zápisu do tabulky audit_log a jednotkové ceny varianty
+        v jedné transakci. Pokud je při příjmu zjištěno, že ještě neexistuje varianta skladové
+        položky se zadaným dodavatelem, tak po uložení připraví okno na vytvoření nové varianty.
         """           
         self.calculate_before_save_to_audit_log() 
         self.calculate_before_save_to_sklad()
-        
-        success = self.controller.update_row("sklad", self.id_num, self.id_col_name, self.values_to_sklad)
-        if not success:
-            return
-        success = self.controller.insert_new_item("audit_log", self.audit_log_col_names[1:], self.values_to_audit_log[1:])
-        if not success:
-            return
-        messagebox.showinfo("Informace", f"Úspěšně proběhl {self.title.lower()} a zápis do audit logu!")
 
+        exists_variant = True
+        variant_unit_price = None
         if self.action == "prijem":
             id_sklad_value = self.id_num
             dodavatel_value = self.values_to_sklad["Dodavatel"]
-            id_dodavatele_value = self.suppliers_dict[dodavatel_value]
-            exists_variant = self.controller.check_existence_of_variant(id_sklad_value, id_dodavatele_value, "varianty")
-            if not exists_variant:
-                messagebox.showinfo("Informace", "Varianta s tímto dodavatelem ještě neexistuje, prosím, vytvořte ji.")
-                self.current_view_instance.add_variant(curr_unit_price=self.new_unit_price)
-                return
-            else:
-                pass # uložit aktuální jednotkovou cenu do varianty
+            id_dodavatele_value = self.suppliers_dict.get(dodavatel_value)
+            exists_variant = id_dodavatele_value is not None and \
+                             self.controller.check_existence_of_variant(id_sklad_value, id_dodavatele_value, "varianty")
+            if exists_variant:
+                variant_unit_price = (id_sklad_value, id_dodavatele_value, self.new_unit_price)
+
+        success = self.controller.save_movement(self.id_num, self.id_col_name, self.values_to_sklad,
+                                                self.audit_log_col_names[1:], self.values_to_audit_log[1:],
+                                                variant_unit_price)
+        if not success:
+            return
+        messagebox.showinfo("Informace", f"Úspěšně proběhl {self.title.lower()} a zápis do audit logu!")
+
+        if not exists_variant:
+            messagebox.showinfo("Informace", "Varianta s tímto dodavatelem ještě neexistuje, prosím, vytvořte ji.")
+            self.current_view_instance.add_variant(curr_unit_price=self.new_unit_price)
+            return
 
         self.controller.show_data(self.current_table, self.id_num)
         
@@ -795,17 +733,16 @@ class ItemFrameMovements(ItemFrameBase):
         a také aktualizuje nové množství na skladě. Výsledné hodnoty jsou připraveny k uložení do audit logu.
         """
         self.new_unit_price = float(self.entries_al['Jednotkova_cena_EUR'].get())
-        
-        if self.action == 'vydej': 
-            self.quantity_change = -self.quantity_change
-        self.total_price = self.new_unit_price * self.quantity_change
-        self.new_quantity = self.quantity + self.quantity_change
+        audit_log_values, self.sklad_values = calculate_movement(self.action, self.quantity, self.actual_quantity,
+                                                                 self.actual_unit_price, self.quantity_change,
+                                                                 self.new_unit_price)
+        self.quantity_change = audit_log_values['Zmena_mnozstvi']
+        self.total_price = audit_log_values['Celkova_cena_EUR']
+        self.new_quantity = audit_log_values['Mnozstvi_ks_m_l']
 
         self.values = {col: entry_al.get() for col, entry_al in self.entries_al.items()}
         self.values['Cas_operace'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")    
-        self.values['Zmena_mnozstvi'] = self.quantity_change
-        self.values['Celkova_cena_EUR'] = self.total_price
-        self.values['Mnozstvi_ks_m_l'] = self.new_quantity
+        self.values.update(audit_log_values)
         
         self.values_to_audit_log = [self.values[col] for col in self.audit_log_col_names]
         
@@ -814,17 +751,10 @@ class ItemFrameMovements(ItemFrameBase):
         """
         Upravuje a připravuje hodnoty pro uložení do tabulky sklad v závislosti na provedené akci (příjem/výdej).
 
-        Výpočet nové celkové ceny a průměrné jednotkové ceny pro příjem a aktualizace celkové ceny pro výdej.
+        Výpočet nové celkové ceny a průměrné jednotkové ceny pro příjem a aktualizace celkové ceny pro výdej
+        provádí funkce calculate_movement společná s hromadnými pohyby.
         Změny jsou reflektovány ve slovníku `self.values`, který je poté použit pro aktualizaci záznamu v databázi.
         """
-        if self.action == 'prijem':
-            if self.actual_quantity > 0:
-                new_total_price = round(self.actual_quantity*self.actual_unit_price+self.quantity_change*self.new_unit_price, 1)
-                average_unit_price = round(new_total_price / (self.actual_quantity + self.quantity_change), 2)
-                self.values['Celkova_cena_EUR'] = new_total_price
-                self.values['Jednotkova_cena_EUR'] = average_unit_price
-        elif self.action == 'vydej': 
-            self.values['Celkova_cena_EUR'] = round(self.new_quantity * self.actual_unit_price, 1)
-
+        self.values.update(self.sklad_values)
         self.values_to_sklad = {col: self.values[col] for col in self.curr_entry_dict["tuple_values_to_save"] if col in self.values}
 
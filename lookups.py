@@ -0,0 +1,134 @@
+from commonresources import CommonResources
+
+class LookupService:
+    """
+    Třída LookupService uchovává sdílené převodní slovníky název -> id (dodavatelé, skladové položky,
+    zařízení) a jejich seřazené n-tice názvů. Slovníky se načítají úzkými dvousloupcovými dotazy
+    a po zápisu do tabulky se aktualizují jen změněné řádky.
+    """
+    def __init__(self, model):
+        """
+        Inicializace služby.
+
+        :param model: Instance třídy Model pro přístup k databázi.
+        """
+        self.model = model
+        self.lookup_config = CommonResources.lookup_table_config
+        self.lookups = {}
+        self.data_version = None
+
+
+    def check_data_version(self):
+        """
+        Pokud do databáze mezitím zapsalo jiné připojení, zahodí všechny načtené slovníky.
+        """
+        data_version = self.model.fetch_data_version()
+        if data_version != self.data_version:
+            self.lookups = {}
+            self.data_version = data_version
+
+
+    def load(self, table):
+        """
+        Načte převodní slovník dané tabulky úzkým dotazem.
+
+        :param table: Název tabulky.
+        """
+        name_col, id_col = self.lookup_config[table]
+        pairs = self.model.fetch_lookup_pairs(table, name_col, id_col)
+        self.lookups[table] = {"dict": {name: id_num for name, id_num in pairs},
+                               "names": {id_num: name for name, id_num in pairs},
+                               "sorted": None}
+
+
+    def get_lookup(self, table):
+        """
+        Vrátí načtený a aktuální záznam převodního slovníku dané tabulky.
+
+        :param table: Název tabulky.
+        """
+        self.check_data_version()
+        if table not in self.lookups:
+            self.load(table)
+        return self.lookups[table]
+
+
+    def get_dict(self, table):
+        """
+        Vrátí slovník název -> id pro danou tabulku.
+
+        :param table: Název tabulky.
+        """
+        return self.get_lookup(table)["dict"]
+
+
+    def get_sorted_names(self, table):
+        """
+        Vrátí abecedně seřazenou n-tici názvů pro danou tabulku.
+
+        :param table: Název tabulky.
+        """
+        lookup = self.get_lookup(table)
+        if lookup["sorted"] is None:
+            lookup["sorted"] = tuple(sorted(lookup["dict"].keys()))
+        return lookup["sorted"]
+
+
+    def refresh_row(self, table, id_num):
+        """
+        Aktualizuje ve slovníku jeden řádek tabulky podle jeho id.
+
+        :param table: Název tabulky.
+        :param id_num: Id změněného, vloženého nebo smazaného řádku.
+        """
+        lookup = self.lookups[table]
+        name_col, id_col = self.lookup_config[table]
+        pairs = self.model.fetch_lookup_pairs(table, name_col, id_col, id_num)
+        for stored_id, name in list(lookup["names"].items()):
+            if str(stored_id) == str(id_num):
+                del lookup["names"][stored_id]
+                if lookup["dict"].get(name) == stored_id:
+                    del lookup["dict"][name]
+        for name, new_id in pairs:
+            lookup["dict"][name] = new_id
+            lookup["names"][new_id] = name
+        lookup["sorted"] = None
+
+
+    def on_insert(self, table, columns, values):
+        """
+        Aktualizuje slovník po vložení nového řádku do tabulky.
+
+        :param table: Název tabulky.
+        :param columns: Sloupce vloženého řádku.
+        :param values: Hodnoty vloženého řádku.
+        """
+        if table not in self.lookups:
+            return
+        id_col = self.lookup_config[table][1]
+        if id_col in columns:
+            self.refresh_row(table, values[list(columns).index(id_col)])
+        else:
+            self.load(table)
+
+
+    def on_update(self, table, id_num):
+        """
+        Aktualizuje slovník po úpravě řádku tabulky.
+
+        :param table: Název tabulky.
+        :param id_num: Id upraveného řádku.
+        """
+        if table in self.lookups:
+            self.refresh_row(table, id_num)
+
+
+    def on_delete(self, table, id_num):
+        """
+        Aktualizuje slovník po smazání řádku tabulky.
+
+        :param table: Název tabulky.
+        :param id_num: Id smazaného řádku.
+        """
+        if table in self.lookups:
+            self.refresh_row(table, id_num)
@@ -0,0 +1,52 @@
+class LowStockIndex:
+    """
+    Třída LowStockIndex udržuje částečný index skladových položek pod minimem (aktuální množství
+    menší než minimum). Index aktualizuje SQLite při každém zápisu, takže stav pod minimem je vždy
+    aktuální a dotazy s podmínkou condition čtou jen index místo procházení celé tabulky. Sloupec
+    Pod_minimem se dál počítá v dotazu pohledu, tvar tabulky sklad se nemění, starší verze
+    aplikace tak mohou do databáze dál zapisovat.
+    """
+    col_name = "Pod_minimem"
+    index_name = "idx_sklad_Pod_minimem"
+    source_cols = ("Mnozstvi_ks_m_l", "Min_Mnozstvi_ks")
+    condition = "Mnozstvi_ks_m_l < Min_Mnozstvi_ks"
+
+    def __init__(self, model):
+        """
+        Inicializace správce indexu.
+
+        :param model: Instance třídy Model s připojením k databázi a registrem schématu.
+        """
+        self.model = model
+        self.conn = model.conn
+
+
+    def ensure(self):
+        """
+        Vytvoří částečný index položek pod minimem, pokud ještě neexistuje. Generovaný sloupec
+        Pod_minimem, který do databáze přidala předchozí verze aplikace (a kvůli kterému starší
+        verze nemohou upravovat položky), se odstraní i s indexem podle něj.
+
+        :return: True, pokud byl index vytvořen nebo sloupec odstraněn.
+        """
+        if not self.model.schema.has_table("sklad"):
+            return False
+        col_index = self.model.schema.col_index("sklad")
+        if not all(col in col_index for col in self.source_cols):
+            return False
+        created = False
+        with self.model.transaction():
+            if self.col_name in self.model.schema.generated_columns("sklad"):
+                self.conn.execute(f'DROP INDEX IF EXISTS "{self.index_name}"')
+                self.conn.execute(f'ALTER TABLE sklad DROP COLUMN "{self.col_name}"')
+                created = True
+            exists = self.conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?",
+                                       (self.index_name,)).fetchone()
+            if exists is None:
+                self.conn.execute(f'CREATE INDEX "{self.index_name}" ON sklad (Evidencni_cislo) '
+                                  f'WHERE {self.condition}')
+                created = True
+            self.model.commit("sklad")
+        if created:
+            self.model.schema.load()
+        return created
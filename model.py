@@ -1,28 +1,236 @@
+import os
 import sqlite3
+import sys
+from contextlib import contextmanager
+
+from analytics import StockAnalytics
+from auditarchive import AuditArchive
+from commonresources import CommonResources
+from lowstock import LowStockIndex
+from querybuilder import QueryBuilder, register_query_functions
+from querycache import QueryCache
+from querylog import LoggingConnection, QueryLog
+from schemaregistry import SchemaRegistry
+from statements import StatementRegistry
+
+def is_network_path(db):
+    """
+    Zjistí, zda databázový soubor leží na síťovém disku (UNC cesta nebo namapovaný síťový disk ve Windows).
+
+    :param db: Cesta k databázovému souboru.
+    :return: True, pokud jde o síťovou cestu.
+    """
+    path = os.path.abspath(db)
+    if path.startswith(("\\\\", "//")):
+        return True
+    if sys.platform.startswith('win'):
+        import ctypes
+        drive = os.path.splitdrive(path)[0]
+        DRIVE_REMOTE = 4
+        return bool(drive) and ctypes.windll.kernel32.GetDriveTypeW(drive + "\\") == DRIVE_REMOTE
+    return False
+
 
 class Model:
     """
     Třída Model se stará o práci s databází.
     """
-    def __init__(self, db):
+    def __init__(self, db, use_cache=True, profile=None):
         """
         Inicializace modelu s připojením k databázi.
         
         :param db: Cesta k databázovému souboru.
-        """
-        self.conn = sqlite3.connect(db)
+        :param use_cache: Pokud True, výsledky čtecích dotazů se uchovávají v paměti
+                          a při zápisu do tabulky se zneplatní.
+        :param profile: Název profilu nastavení připojení z CommonResources.db_connection_profiles,
+                        pokud None, použije se CommonResources.db_connection_profile.
+        """
+        self.db = db
+        self.conn = sqlite3.connect(db, factory=LoggingConnection,
+                                    cached_statements=CommonResources.db_cached_statements)
+        self.conn.query_log = QueryLog.shared()
+        self.query_log = self.conn.query_log
         self.cursor = self.conn.cursor()
+        register_query_functions(self.conn)
+        self.connection_settings = self.apply_connection_profile(profile or CommonResources.db_connection_profile)
+        self.cache = QueryCache() if use_cache else None
+        self.transaction_depth = 0
+        self.transaction_tables = set()
+        self.schema = SchemaRegistry(self.conn)
+        self.statements = StatementRegistry(self.schema)
+        self.attached = {}
+
+
+    def apply_connection_profile(self, profile):
+        """
+        Nastaví PRAGMA připojení podle zvoleného profilu (journal mode, synchronous, cache size,
+        mmap size, busy timeout, temp store). Journal mode "auto" zvolí WAL pro lokální disk
+        a DELETE pro síťový disk, kde WAL nelze bezpečně použít. Pokud WAL nejde zapnout,
+        použije se rollback journal DELETE. Synchronous "auto" zvolí NORMAL pro WAL a FULL jinak.
+
+        :param profile: Název profilu z CommonResources.db_connection_profiles.
+        :return: Slovník skutečně nastavených hodnot.
+        """
+        settings = CommonResources.db_connection_profiles[profile]
+        applied = {}
+        if "busy_timeout" in settings:
+            self.conn.execute(f"PRAGMA busy_timeout = {int(settings['busy_timeout'])}")
+            applied["busy_timeout"] = int(settings["busy_timeout"])
+
+        journal_mode = settings.get("journal_mode")
+        if journal_mode == "auto":
+            journal_mode = "DELETE" if is_network_path(self.db) else "WAL"
+        if journal_mode:
+            try:
+                result = self.conn.execute(f"PRAGMA journal_mode = {journal_mode}").fetchone()[0]
+                if journal_mode.upper() == "WAL" and result.upper() != "WAL":
+                    result = self.conn.execute("PRAGMA journal_mode = DELETE").fetchone()[0]
+            except sqlite3.OperationalError:
+                result = self.conn.execute("PRAGMA journal_mode").fetchone()[0]
+            applied["journal_mode"] = result.upper()
+
+        for pragma in ("synchronous", "cache_size", "mmap_size", "temp_store"):
+            if pragma in settings:
+                value = settings[pragma]
+                if pragma == "synchronous" and value == "auto":
+                    value = "NORMAL" if applied.get("journal_mode") == "WAL" else "FULL"
+                value = int(value) if isinstance(value, int) else str(value).upper()
+                self.conn.execute(f"PRAGMA {pragma} = {value}")
+                applied[pragma] = value
+        return applied
+
+
+    def attach_databases(self, databases):
+        """
+        Připojí (ATTACH) k připojení databázové soubory, které ještě nejsou připojené, a odpojí
+        (DETACH) dříve připojené soubory, které dotaz nepotřebuje, aby počet připojených souborů
+        nepřekročil limit SQLite (výchozí 10). Připojení nelze provést uvnitř transakce, proto
+        se volá jen před čtecími dotazy.
+
+        :param databases: Slovník název schématu -> cesta k databázovému souboru.
+        """
+        for schema in [schema for schema in self.attached if schema not in databases]:
+            if self.conn.in_transaction:
+                break
+            try:
+                self.conn.execute(f'DETACH DATABASE "{schema}"')
+            except sqlite3.OperationalError:
+                continue
+            del self.attached[schema]
+        for schema, path in databases.items():
+            if schema in self.attached:
+                continue
+            self.conn.execute(f'ATTACH DATABASE ? AS "{schema}"', (path,))
+            self.attached[schema] = path
+
+
+    def fetch_data_version(self):
+        """
+        Vrátí hodnotu PRAGMA data_version, která se mění při zápisu jiného připojení do databáze.
+        """
+        self.cursor.execute("PRAGMA data_version")
+        return self.cursor.fetchone()[0]
+
+
+    def fetch_cached(self, tables, query, params=()):
+        """
+        Provede čtecí dotaz, nebo vrátí jeho výsledek z cache, pokud se od posledního provedení
+        nezměnila žádná z čtených tabulek ani databáze z jiného připojení.
+
+        :param tables: N-tice tabulek, ze kterých dotaz čte.
+        :param query: Text SQL dotazu.
+        :param params: Parametry SQL dotazu.
+        :return: Seznam n-tic s výsledkem dotazu.
+        """
+        key = (query, tuple(params))
+        if self.cache is not None:
+            self.cache.check_data_version(self.fetch_data_version())
+            result = self.cache.get(key)
+            if result is not None:
+                return result
+        self.cursor.execute(query, params)
+        result = self.cursor.fetchall()
+        if self.cache is not None:
+            self.cache.set(key, tables, result)
+        return result
+
+
+    def invalidate_cache(self, *tables):
+        """
+        Zneplatní výsledky v cache pro zadané tabulky po zápisu.
+
+        :param tables: Názvy změněných tabulek.
+        """
+        if self.cache is not None:
+            self.cache.invalidate(*tables)
+
+
+    def commit(self, *tables):
+        """
+        Potvrdí zápis do zadaných tabulek a zneplatní pro ně cache. Uvnitř transakce
+        otevřené metodou transaction() se potvrzení odloží na konec transakce.
+
+        :param tables: Názvy změněných tabulek.
+        """
+        self.invalidate_cache(*tables)
+        if self.transaction_depth:
+            self.transaction_tables.update(tables)
+        else:
+            self.conn.commit()
+
+
+    @contextmanager
+    def transaction(self):
+        """
+        Context manager pro provedení více zápisů v jedné transakci. Na konci bloku se všechny
+        zápisy potvrdí jedním commitem, při výjimce se všechny zápisy vrátí zpět (rollback).
+        Vnořené bloky se připojí k vnější transakci.
+        """
+        self.transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self.transaction_depth -= 1
+            if not self.transaction_depth:
+                self.conn.rollback()
+                self.invalidate_cache(*self.transaction_tables)
+                self.transaction_tables = set()
+            raise
+        else:
+            self.transaction_depth -= 1
+            if not self.transaction_depth:
+                self.conn.commit()
+                self.transaction_tables = set()
 
     def fetch_col_names(self, table):
         """
-        Načte názvy sloupců z dané tabulky.
+        Vrátí názvy sloupců z dané tabulky z registru metadat schématu.
         
         :param table: Název tabulky pro načtení názvů sloupců.
         :return: N-tice názvů sloupců.
         """
-        query = f"SELECT * FROM {table} LIMIT 0"
-        self.cursor.execute(query)
-        return tuple(description[0] for description in self.cursor.description)
+        return self.schema.col_names(table)
+
+
+    def select_columns(self, table):
+        """
+        Vrátí seznam sloupců tabulky v uvozovkách pro klauzuli SELECT. Na rozdíl od SELECT * nevrací
+        generované sloupce, takže řádek odpovídá názvům sloupců z fetch_col_names.
+
+        :param table: Název tabulky.
+        :return: Text se seznamem sloupců oddělených čárkou.
+        """
+        return ", ".join(f'"{col}"' for col in self.fetch_col_names(table))
+
+
+    def fetch_col_index(self, table):
+        """
+        Vrátí slovník název sloupce -> index sloupce v řádku dané tabulky.
+
+        :param table: Název tabulky.
+        :return: Slovník názvů sloupců a jejich indexů.
+        """
+        return self.schema.col_index(table)
 
 
     def fetch_data(self, table):
@@ -33,8 +241,7 @@ class Model:
         :return: Všechna data z tabulky jako seznam n-tic.
         """
         query = f"SELECT * FROM {table}"
-        self.cursor.execute(query)
-        return self.cursor.fetchall()
+        return self.fetch_cached((table,), query)
 
 
     def fetch_sklad_data(self):
@@ -43,15 +250,7 @@ class Model:
         
         :return: Data variant spolu s názvy dílů a dodavatelů.
         """
-        query = """
-        SELECT *,
-               CASE 
-                   WHEN Mnozstvi_ks_m_l < Min_Mnozstvi_ks THEN 1
-                   ELSE 0
-               END AS 'Pod_minimem' FROM sklad
-        """
-        self.cursor.execute(query)
-        return self.cursor.fetchall()
+        return self.fetch_cached(*self.view_base_query("sklad"))
 
 
     def fetch_varianty_data(self):
@@ -60,17 +259,156 @@ class Model:
         
         :return: Data variant spolu s názvy dílů a dodavatelů a informací, zda je množství pod minimálním množstvím.
         """
-        query = """
-        SELECT v.*, s.Nazev_dilu, d.Dodavatel,
-               CASE 
-                   WHEN s.Mnozstvi_ks_m_l < s.Min_Mnozstvi_ks THEN 1
-                   ELSE 0
-               END AS 'Pod_minimem'
-        FROM varianty v
-        JOIN sklad s ON v.id_sklad = s.Evidencni_cislo
-        JOIN dodavatele d ON v.id_dodavatele = d.id
-        """
-        self.cursor.execute(query)
+        return self.fetch_cached(*self.view_base_query("varianty"))
+
+
+    def view_base_query(self, table):
+        """
+        Vrátí základní dotaz pro zobrazení tabulky v GUI - pro sklad a varianty rozšířený
+        o sloupec Pod_minimem, u variant navíc o názvy dílů a dodavatelů.
+
+        :param table: Název tabulky.
+        :return: N-tice (čtené tabulky, text dotazu).
+        """
+        if table == "sklad":
+            query = """
+            SELECT *,
+                   CASE 
+                       WHEN Mnozstvi_ks_m_l < Min_Mnozstvi_ks THEN 1
+                       ELSE 0
+                   END AS 'Pod_minimem' FROM sklad
+            """
+            return ("sklad", "sklad_zarizeni"), query
+        if table == "varianty":
+            query = """
+            SELECT v.*, s.Nazev_dilu, d.Dodavatel,
+                   CASE 
+                       WHEN s.Mnozstvi_ks_m_l < s.Min_Mnozstvi_ks THEN 1
+                       ELSE 0
+                   END AS 'Pod_minimem'
+            FROM varianty v
+            JOIN sklad s ON v.id_sklad = s.Evidencni_cislo
+            JOIN dodavatele d ON v.id_dodavatele = d.id
+            """
+            return ("varianty", "sklad", "dodavatele"), query
+        return (table,), f"SELECT * FROM {table}"
+
+
+    def create_query(self, table, search_index=None, date_range=None):
+        """
+        Vytvoří sestavovač dotazu nad základním dotazem tabulky pro filtraci a třídění v SQL.
+        U audit_logu se při rozmezí datumů zasahujícím do archivovaných roků čtou i připojené
+        archivy (viz AuditArchive), fulltextový index se pak nepoužije (obsahuje jen záznamy
+        hlavní tabulky).
+
+        :param table: Název tabulky.
+        :param search_index: Instance SearchIndex pro fulltextové vyhledávání nebo None.
+        :param date_range: N-tice (počáteční, koncové datum) filtru pohledu nebo None.
+        :return: Instance QueryBuilder.
+        """
+        attached = {}
+        if table == "audit_log" and date_range:
+            query, attached = AuditArchive(self).partition_query(*date_range)
+            tables = ("audit_log",)
+        else:
+            tables, query = self.view_base_query(table)
+        if attached:
+            search_index = None
+        self.cursor.execute(f"SELECT * FROM ({query}) LIMIT 0")
+        col_names = [description[0] for description in self.cursor.description]
+        primary_key = self.schema.primary_key(tables[0])
+        integer_key = None
+        if (len(primary_key) == 1 and primary_key[0] == col_names[0]
+                and self.schema.col_types(tables[0])[primary_key[0]].upper() == "INTEGER"):
+            integer_key = primary_key[0]
+        return QueryBuilder(query, tables, col_names, search_index, integer_key, attached)
+
+
+    def fetch_query_rows(self, query_builder, limit=None, offset=0):
+        """
+        Načte vyfiltrované a seřazené řádky podle sestavovače dotazu.
+
+        :param query_builder: Instance QueryBuilder se zadanými filtry a tříděním.
+        :param limit: Maximální počet řádků, pokud None, načtou se všechny.
+        :param offset: Počet přeskočených řádků.
+        :return: Seznam n-tic s řádky.
+        """
+        self.attach_databases(query_builder.attached)
+        return self.fetch_cached(query_builder.tables, *query_builder.build(limit, offset))
+
+
+    def fetch_query_count(self, query_builder):
+        """
+        Vrátí počet vyfiltrovaných řádků podle sestavovače dotazu.
+        """
+        self.attach_databases(query_builder.attached)
+        return self.fetch_cached(query_builder.tables, *query_builder.build_count())[0][0]
+
+
+    def fetch_query_ids(self, query_builder):
+        """
+        Vrátí seznam id (prvního sloupce) vyfiltrovaných řádků v pořadí třídění.
+        """
+        self.attach_databases(query_builder.attached)
+        return [row[0] for row in self.fetch_cached(query_builder.tables, *query_builder.build_ids())]
+
+
+    def fetch_refined_ids(self, query_builder, previous_ids, max_within_ids=50000):
+        """
+        Zpřesní předchozí výsledek - vrátí id řádků z previous_ids, které splňují podmínky
+        dotazu, v pořadí previous_ids. Použije se, když nový dotaz jen rozšiřuje hledaný text
+        předchozího dotazu se stejným tříděním, takže se výsledek nemusí znovu třídit. Při třídění
+        podle relevance se pořadí s novým textem mění, proto se provede nový úplný dotaz.
+
+        :param query_builder: Instance QueryBuilder se zadanými filtry včetně hledaného textu.
+        :param previous_ids: Seřazený seznam id předchozího výsledku se stejnými ostatními filtry.
+        :param max_within_ids: Maximální počet id předchozího výsledku, pro které se podmínka hledání
+                               vyhodnocuje jen v rámci předchozího výsledku, při větším počtu se
+                               provede nový úplný dotaz.
+        :return: Seznam id v pořadí třídění.
+        """
+        if (query_builder.search_condition is None or query_builder.rank_query is not None
+                or (query_builder.search_ids_query is None and len(previous_ids) > max_within_ids)):
+            return self.fetch_query_ids(query_builder)
+        self.attach_databases(query_builder.attached)
+        self.cursor.execute(*query_builder.build_search_ids(previous_ids))
+        matched = {row[0] for row in self.cursor.fetchall()}
+        return [id_num for id_num in previous_ids if id_num in matched]
+
+
+    def fetch_rows_by_ids(self, query_builder, ids, chunk_size=500):
+        """
+        Načte řádky základního dotazu podle seznamu id ve stejném pořadí jako ids.
+
+        :param query_builder: Instance QueryBuilder se základním dotazem tabulky.
+        :param ids: Seznam id řádků.
+        :param chunk_size: Maximální počet id v jednom dotazu.
+        :return: Seznam n-tic s řádky.
+        """
+        self.attach_databases(query_builder.attached)
+        rows_by_id = {}
+        for start in range(0, len(ids), chunk_size):
+            self.cursor.execute(*query_builder.build_by_ids(ids[start:start + chunk_size]))
+            for row in self.cursor.fetchall():
+                rows_by_id[row[0]] = row
+        return [rows_by_id[id_num] for id_num in ids if id_num in rows_by_id]
+
+
+    def fetch_lookup_pairs(self, table, name_col, id_col, id_num=None):
+        """
+        Načte z tabulky pouze dvojice (název, id) pro převodní slovníky.
+
+        :param table: Název tabulky.
+        :param name_col: Název sloupce s názvem.
+        :param id_col: Název sloupce s id.
+        :param id_num: Pokud je zadáno, načte se pouze řádek s tímto id.
+        :return: Seznam n-tic (název, id).
+        """
+        query = f'SELECT "{name_col}", "{id_col}" FROM {table}'
+        if id_num is None:
+            self.cursor.execute(f'{query} ORDER BY "{id_col}"')
+        else:
+            self.cursor.execute(f'{query} WHERE "{id_col}" = ?', (id_num,))
         return self.cursor.fetchall()
 
 
@@ -90,8 +428,7 @@ class Model:
         JOIN dodavatele AS d ON v.id_dodavatele = d.id
         WHERE v.{id_col_name} = ?
         """
-        self.cursor.execute(query, (id_num,))
-        return self.cursor.fetchall()
+        return self.fetch_cached((table, "dodavatele"), query, (id_num,))
 
 
 
@@ -104,40 +441,113 @@ class Model:
         :param id_col_name: Název sloupce, který obsahuje ID položky.
         :return: Řádek s daty položky nebo None, pokud položka nebyla nalezena.
         """
-        query = f"SELECT * FROM {table} WHERE {id_col_name} = ?"
-        self.cursor.execute(query, (id_num,))
+        self.cursor.execute(self.statements.select_by_id(table, id_col_name), (id_num,))
         return self.cursor.fetchone()
 
 
-    def fetch_data_for_inquiry(self, ids):
+    def fetch_report(self, report, year=None):
         """
-        Načte specifická data na základě ID z tabulky varianty a získá odpovídající data ze tabulky sklad.
+        Vypočítá měsíční přehled z audit_logu a tabulky sklad (viz StockAnalytics).
 
-        :param ids: Seznam ID položek z tabulky varianty.
-        :return: Seznam n-tic s hodnotami: rozdíl 'Min_Mnozstvi_ks' - 'Mnozstvi_ks_m_l',
-                 jednotky, název varianty, číslo varianty pro každou odpovídající položku.
+        :param report: 'hodnota', 'zarizeni' nebo 'dodavatele'.
+        :param year: Rok (text RRRR) pro omezení přehledu nebo None pro všechny měsíce.
+        :return: N-tice (názvy sloupců, seznam řádků).
         """
-        ids_placeholder = ','.join('?' for _ in ids)
-        
+        return StockAnalytics(self).report(report, year)
+
+
+    def fetch_low_stock_items(self):
+        """
+        Načte skladové položky, jejichž množství je pod minimem. Podmínka se vyhodnotí částečným
+        indexem položek pod minimem (viz LowStockIndex).
+
+        :return: Seznam řádků základního dotazu tabulky sklad (včetně sloupce Pod_minimem).
+        """
+        tables, query = self.view_base_query("sklad")
+        return self.fetch_cached(tables, f"SELECT * FROM ({query}) AS t WHERE {LowStockIndex.condition} "
+                                         f"ORDER BY Evidencni_cislo")
+
+
+    def fetch_low_stock_variants(self, id_dodavatele=None):
+        """
+        Načte varianty skladových položek, jejichž množství je pod minimem.
+
+        :param id_dodavatele: Id dodavatele, pokud None, načtou se varianty všech dodavatelů.
+        :return: Seznam n-tic (id varianty, rozdíl 'Min_Mnozstvi_ks' - 'Mnozstvi_ks_m_l', jednotky,
+                 číslo varianty, název varianty).
+        """
+        condition = "s.Mnozstvi_ks_m_l < s.Min_Mnozstvi_ks"
+        params = ()
+        if id_dodavatele is not None:
+            condition += " AND v.id_dodavatele = ?"
+            params = (id_dodavatele,)
         query = f"""
-        SELECT (s.Min_Mnozstvi_ks - s.Mnozstvi_ks_m_l) AS Rozdil, s.Jednotky, v.Cislo_varianty, v.Nazev_varianty
+        SELECT v.id, (s.Min_Mnozstvi_ks - s.Mnozstvi_ks_m_l) AS Rozdil, s.Jednotky, v.Cislo_varianty, v.Nazev_varianty
         FROM sklad s
         JOIN varianty v ON s.Evidencni_cislo = v.id_sklad
-        WHERE v.id IN ({ids_placeholder})
+        WHERE {condition}
+        ORDER BY v.id
         """
-        self.cursor.execute(query, ids)
-        return self.cursor.fetchall()
+        return self.fetch_cached(("sklad", "varianty"), query, params)
+
+
+    def fetch_data_for_inquiry(self, ids, id_dodavatele=None):
+        """
+        Načte data pro poptávku pro varianty ze zadaných ID, jejichž skladová položka je pod minimem.
+        Varianty pod minimem se načtou indexem a vyberou se z nich jen zadané ID (bez dlouhého IN).
+
+        :param ids: Seznam ID položek z tabulky varianty v pořadí, ve kterém se mají vrátit.
+        :param id_dodavatele: Id dodavatele, pro kterého se poptávka tvoří, nebo None.
+        :return: Seznam n-tic s hodnotami: rozdíl 'Min_Mnozstvi_ks' - 'Mnozstvi_ks_m_l',
+                 jednotky, číslo varianty, název varianty pro každou odpovídající položku.
+        """
+        low_stock = {row[0]: tuple(row[1:]) for row in self.fetch_low_stock_variants(id_dodavatele)}
+        return [low_stock[id_num] for id_num in ids if id_num in low_stock]
+
+
+    def fetch_sklad_items(self, ids, chunk_size=500):
+        """
+        Načte skladové položky podle seznamu evidenčních čísel.
+
+        :param ids: Evidenční čísla skladových položek.
+        :param chunk_size: Počet čísel v jednom dotazu IN (...).
+        :return: Seznam slovníků název sloupce -> hodnota.
+        """
+        col_names = self.fetch_col_names("sklad")
+        ids = list(ids)
+        items = []
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            placeholders = ','.join('?' for _ in chunk)
+            self.cursor.execute(f"SELECT {self.select_columns('sklad')} FROM sklad "
+                                f"WHERE Evidencni_cislo IN ({placeholders})", chunk)
+            items.extend(dict(zip(col_names, row)) for row in self.cursor.fetchall())
+        return items
+
+
+    def fetch_variant_keys(self, ids, chunk_size=500):
+        """
+        Načte dvojice (id_sklad, id_dodavatele) existujících variant zadaných skladových položek.
+
+        :param ids: Evidenční čísla skladových položek.
+        :param chunk_size: Počet čísel v jednom dotazu IN (...).
+        :return: Množina n-tic (id_sklad, id_dodavatele).
+        """
+        ids = list(ids)
+        keys = set()
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            placeholders = ','.join('?' for _ in chunk)
+            self.cursor.execute(f"SELECT id_sklad, id_dodavatele FROM varianty WHERE id_sklad IN ({placeholders})", chunk)
+            keys.update(self.cursor.fetchall())
+        return keys
 
 
     def check_existence(self, id_sklad_value, id_dodavatele_value, current_table):
         """
         SQL dotaz pro ověření existence varianty před uložením nové.
         """
-        query = f"""SELECT EXISTS(
-                        SELECT 1 FROM {current_table} 
-                        WHERE id_sklad = ? AND id_dodavatele = ?
-                    )"""
-        self.cursor.execute(query, (id_sklad_value, id_dodavatele_value))
+        self.cursor.execute(self.statements.exists_variant(current_table), (id_sklad_value, id_dodavatele_value))
 
         return self.cursor.fetchone()[0] == 1    
 
@@ -150,8 +560,7 @@ class Model:
         :param id_col_name: Název sloupce, ve kterém se hledá max ID.
         :return: Nejvyšší hodnota ID nebo None, pokud tabulka neobsahuje žádné záznamy.
         """
-        query = f"SELECT MAX({id_col_name}) FROM {curr_table}"
-        self.cursor.execute(query)
+        self.cursor.execute(self.statements.max_id(curr_table, id_col_name))
         max_id = self.cursor.fetchone()[0]
         return max_id if max_id is not None else 0
 
@@ -176,11 +585,8 @@ class Model:
         :param columns: Seznam sloupců, do kterých se vkládají hodnoty.
         :param values: Seznam hodnot odpovídajících sloupcům pro vkládání.
         """
-        columns_str = ', '.join([f'"{col}"' for col in columns])
-        placeholders = ', '.join('?' * len(columns))
-        sql = f"INSERT INTO {table} ({columns_str}) VALUES ({placeholders})"
-        self.cursor.execute(sql, values)
-        self.conn.commit()
+        self.cursor.execute(self.statements.insert(table, columns), values)
+        self.commit(table)
 
 
     def update_row(self, table, id_num, id_col_name, updated_values):
@@ -193,24 +599,131 @@ class Model:
         :param updated_values: Slovník, kde klíče jsou názvy sloupců a hodnoty
                                jsou aktualizované hodnoty pro tyto sloupce.
         """
-        set_clause = ', '.join([f"`{key}` = ?" for key in updated_values.keys()])
         values = list(updated_values.values())
         values.append(id_num)
-        sql = f"UPDATE `{table}` SET {set_clause} WHERE `{id_col_name}` = ?"
+        self.cursor.execute(self.statements.update(table, id_col_name, updated_values), values)
+        self.commit(table)
 
-        self.cursor.execute(sql, values)
-        self.conn.commit()
 
+    def insert_many(self, table, columns, rows):
+        """
+        Vloží hromadně více řádků do tabulky jedním příkazem executemany.
 
-    def add_integer_column_with_default(self, new_col_name):
+        :param table: Název tabulky.
+        :param columns: Seznam sloupců, do kterých se vkládají hodnoty.
+        :param rows: Seznam seznamů hodnot odpovídajících sloupcům.
         """
-        Přidá nový sloupec typu Integer do tabulky 'sklad' s výchozí hodnotou 0.
-        
-        :param new_col_name: Název nového sloupce, který má být přidán.
+        self.cursor.executemany(self.statements.insert(table, columns), rows)
+        self.commit(table)
+
+
+    def update_many(self, table, id_col_name, columns, rows):
+        """
+        Aktualizuje hromadně více řádků tabulky jedním příkazem executemany.
+
+        :param table: Název tabulky.
+        :param id_col_name: Název sloupce s ID pro identifikaci řádku.
+        :param columns: Seznam aktualizovaných sloupců.
+        :param rows: Seznam seznamů hodnot sloupců, poslední hodnota je ID řádku.
+        """
+        self.cursor.executemany(self.statements.update(table, id_col_name, columns), rows)
+        self.commit(table)
+
+
+    def upsert_many(self, table, id_col_name, columns, update_columns, rows):
+        """
+        Vloží hromadně řádky do tabulky jedním příkazem executemany, řádky s již existujícím ID
+        se místo vložení aktualizují (INSERT ... ON CONFLICT DO UPDATE).
+
+        :param table: Název tabulky.
+        :param id_col_name: Název sloupce s ID (primární klíč) pro rozpoznání existujícího řádku.
+        :param columns: Seznam sloupců, do kterých se vkládají hodnoty.
+        :param update_columns: Seznam sloupců, které se u existujícího řádku aktualizují.
+        :param rows: Seznam n-tic hodnot odpovídajících sloupcům columns.
+        """
+        self.cursor.executemany(self.statements.upsert(table, id_col_name, columns, update_columns), rows)
+        self.commit(table)
+
+
+    def fetch_column_values(self, table, columns):
+        """
+        Vrátí všechny hodnoty zadaných sloupců tabulky jedním úzkým dotazem.
+
+        :param table: Název tabulky.
+        :param columns: Seznam sloupců.
+        :return: Seznam n-tic hodnot sloupců.
+        """
+        return self.conn.execute(self.statements.select_columns(table, columns)).fetchall()
+
+
+    def update_variant_unit_prices(self, rows):
+        """
+        Aktualizuje hromadně jednotkové ceny variant.
+
+        :param rows: Seznam n-tic (jednotková cena, id_sklad, id_dodavatele).
+        """
+        sql = "UPDATE varianty SET Jednotkova_cena_EUR = ? WHERE id_sklad = ? AND id_dodavatele = ?"
+        self.cursor.executemany(sql, rows)
+        self.commit("varianty")
+
+
+    def update_variant_unit_price(self, id_sklad, id_dodavatele, unit_price):
+        """
+        Aktualizuje jednotkovou cenu varianty skladové položky od zadaného dodavatele.
+
+        :param id_sklad: Evidenční číslo skladové položky.
+        :param id_dodavatele: Id dodavatele varianty.
+        :param unit_price: Nová jednotková cena v EUR.
+        """
+        sql = "UPDATE varianty SET Jednotkova_cena_EUR = ? WHERE id_sklad = ? AND id_dodavatele = ?"
+        self.cursor.execute(sql, (unit_price, id_sklad, id_dodavatele))
+        self.commit("varianty")
+
+
+    def fetch_item_devices(self, id_num):
+        """
+        Vrátí zkratky zařízení, ve kterých se skladová položka používá (vazby v tabulce sklad_zarizeni).
+
+        :param id_num: Evidenční číslo skladové položky.
+        :return: Seznam zkratek zařízení seřazený podle zkratky.
+        """
+        query = """
+        SELECT z.Zarizeni FROM sklad_zarizeni AS sz
+        JOIN zarizeni AS z ON z.id = sz.id_zarizeni
+        WHERE sz.id_sklad = ? ORDER BY z.Zarizeni
+        """
+        return [row[0] for row in self.fetch_cached(("sklad_zarizeni", "zarizeni"), query, (id_num,))]
+
+
+    def update_device_links(self, rows):
+        """
+        Hromadně nastaví nebo zruší vazby skladových položek na zařízení. Dokud v tabulce sklad
+        zůstávají sloupce zařízení, zapíše se hodnota vazby i do nich.
+
+        :param rows: Seznam n-tic (evidenční číslo položky, id zařízení, True pro vazbu / False bez vazby).
+        """
+        linked = [(id_sklad, id_zarizeni) for id_sklad, id_zarizeni, is_linked in rows if is_linked]
+        unlinked = [(id_sklad, id_zarizeni) for id_sklad, id_zarizeni, is_linked in rows if not is_linked]
+        with self.transaction():
+            self.cursor.executemany("INSERT OR IGNORE INTO sklad_zarizeni (id_sklad, id_zarizeni) VALUES (?, ?)", linked)
+            self.cursor.executemany("DELETE FROM sklad_zarizeni WHERE id_sklad = ? AND id_zarizeni = ?", unlinked)
+            legacy_columns = self.fetch_legacy_device_columns()
+            for id_sklad, id_zarizeni, is_linked in rows:
+                if id_zarizeni in legacy_columns:
+                    sql = self.statements.update("sklad", "Evidencni_cislo", (legacy_columns[id_zarizeni],))
+                    self.cursor.execute(sql, (int(bool(is_linked)), id_sklad))
+            self.commit("sklad_zarizeni", *(("sklad",) if legacy_columns else ()))
+
+
+    def fetch_legacy_device_columns(self):
+        """
+        Vrátí slovník id zařízení -> zkratka zařízení pro zařízení, která mají v tabulce sklad ještě
+        vlastní sloupec (před dokončením převodu na vazby, viz DeviceLinks). Do těchto sloupců se
+        vazby zapisují také, aby je viděly pracovní stanice se starší verzí aplikace.
         """
-        alter_table_query = f"ALTER TABLE sklad ADD COLUMN {new_col_name} INTEGER DEFAULT 0"
-        self.cursor.execute(alter_table_query)
-        self.conn.commit() 
+        sklad_cols = self.schema.col_index("sklad")
+        return {id_num: code for code, id_num in self.conn.execute("SELECT Zarizeni, id FROM zarizeni")
+                if code in sklad_cols}
 
 
     def delete_row(self, evidencni_cislo):
@@ -218,8 +731,10 @@ class Model:
         Smaže řádek ze skladu na základě jeho evidenčního čísla - ve sloupci Evidencni_cislo.      
         :Params evidencni_cislo (int): Evidencni_cislo řádku, který má být smazán.
         """
-        self.cursor.execute("DELETE FROM sklad WHERE `Evidencni_cislo`=?", (evidencni_cislo,))
-        self.conn.commit()
+        with self.transaction():
+            self.cursor.execute("DELETE FROM sklad_zarizeni WHERE id_sklad = ?", (evidencni_cislo,))
+            self.cursor.execute("DELETE FROM sklad WHERE `Evidencni_cislo`=?", (evidencni_cislo,))
+            self.commit("sklad", "sklad_zarizeni")
 
 
     def verify_user_credentials(self, username, password_hash):
@@ -0,0 +1,213 @@
+import re
+from datetime import datetime
+
+from commonresources import CommonResources
+
+def check_movement(rules, action, values):
+    """
+    Kontrola zadání povinných dat a správnosti dat skladového pohybu před uložením.
+    Stejná pravidla používá formulář ItemFrameMovements i hromadné pohyby.
+
+    :param rules: Slovník pravidel pohybu (mandatory, pos_integer, pos_real, date).
+    :param action: Typ pohybu - 'prijem' nebo 'vydej'.
+    :param values: Slovník hodnot pohybu jako řetězců, včetně aktuálního množství Mnozstvi_ks_m_l.
+    :return: None, pokud jsou data v pořádku, jinak n-tice (název chybné položky, text varování).
+    """
+    tab2hum = CommonResources.tab2hum
+    for col in rules.get("mandatory", []):
+        if not values.get(col):
+            return col, f"Před uložením nejdříve zadejte položku {tab2hum.get(col, col)}"
+
+    for col in rules.get("pos_integer", []):
+        entry_val = values.get(col, "")
+        if not entry_val.isdigit() or int(entry_val) <= 0:
+            return col, f"Položka {tab2hum.get(col, col)} musí být kladné celé číslo."
+
+    if action == 'vydej' and int(values['Zmena_mnozstvi']) > int(values['Mnozstvi_ks_m_l']):
+        return 'Zmena_mnozstvi', "Vydávané množství je větší než množství na skladě."
+
+    for col in rules.get("pos_real", []):
+        entry_val = values.get(col, "")
+        try:
+            if float(entry_val) <= 0:
+                return col, f"Položka {tab2hum.get(col, col)} musí být kladné reálné číslo s desetinnou tečkou."
+        except ValueError:
+            return col, f"Položka {tab2hum.get(col, col)} není platné kladné reálné číslo s desetinnou tečkou."
+
+    for col in rules.get("date", []):
+        date_str = values.get(col, "")
+        if not re.match(r'^\d{4}-\d{2}-\d{2}$', date_str):
+            return col, "Datum nákupu musí být ve formátu RRRR-MM-DD."
+        try:
+            datetime.strptime(date_str, "%Y-%m-%d")
+        except ValueError:
+            return col, f"Neplatné datum: {date_str}. Zadejte prosím platné datum."
+    return None
+
+
+def calculate_movement(action, quantity, actual_quantity, actual_unit_price, quantity_change, new_unit_price):
+    """
+    Výpočet hodnot skladového pohybu pro zápis do audit_logu a do tabulky sklad.
+    Při příjmu na nenulový stav se počítá nová celková cena a vážená průměrná jednotková cena,
+    při výdeji se přepočítá celková cena zbývajícího množství.
+
+    :param action: Typ pohybu - 'prijem' nebo 'vydej'.
+    :param quantity: Množství na skladě před pohybem.
+    :param actual_quantity: Množství skladové položky načtené z databáze.
+    :param actual_unit_price: Jednotková cena skladové položky načtená z databáze.
+    :param quantity_change: Kladné množství pohybu.
+    :param new_unit_price: Jednotková cena pohybu.
+    :return: N-tice slovníků (hodnoty pro audit_log, hodnoty pro sklad).
+    """
+    if action == 'vydej':
+        quantity_change = -quantity_change
+    total_price = new_unit_price * quantity_change
+    new_quantity = quantity + quantity_change
+    audit_log_values = {'Zmena_mnozstvi': quantity_change, 'Celkova_cena_EUR': total_price,
+                        'Mnozstvi_ks_m_l': new_quantity}
+    sklad_values = {'Celkova_cena_EUR': total_price, 'Mnozstvi_ks_m_l': new_quantity}
+    if action == 'prijem':
+        if actual_quantity > 0:
+            new_total_price = round(actual_quantity*actual_unit_price+quantity_change*new_unit_price, 1)
+            average_unit_price = round(new_total_price / (actual_quantity + quantity_change), 2)
+            sklad_values['Celkova_cena_EUR'] = new_total_price
+            sklad_values['Jednotkova_cena_EUR'] = average_unit_price
+    elif action == 'vydej':
+        sklad_values['Celkova_cena_EUR'] = round(new_quantity * actual_unit_price, 1)
+    return audit_log_values, sklad_values
+
+
+class BatchMovements:
+    """
+    Třída BatchMovements zpracuje hromadně seznam příjmů a výdejů. Každý řádek se zkontroluje
+    stejnými pravidly jako ve formuláři pohybu, vypočítají se nové stavy a ceny a vše se uloží
+    hromadnými zápisy (executemany) v jedné transakci.
+    """
+    operation_types = {"prijem": "PŘÍJEM", "vydej": "VÝDEJ"}
+
+    def __init__(self, model, name_of_user):
+        """
+        Inicializace hromadného zpracování pohybů.
+
+        :param model: Instance třídy Model.
+        :param name_of_user: Jméno uživatele, který pohyby provádí.
+        """
+        self.model = model
+        self.name_of_user = name_of_user
+        self.rules = CommonResources.movement_rules
+        self.id_col_name = CommonResources.item_frame_table_config["sklad"]["id_col_name"]
+        self.audit_log_col_names = self.model.fetch_col_names("audit_log")[1:]
+
+
+    def normalize_action(self, line):
+        """
+        Vrátí typ pohybu řádku ('prijem' nebo 'vydej') nebo None, pokud není platný.
+        Typ se bere z klíče 'action' nebo 'Typ_operace' (PŘÍJEM / VÝDEJ).
+        """
+        action = str(line.get("action") or line.get("Typ_operace") or "").strip()
+        for key, operation in self.operation_types.items():
+            if action.lower() == key or action.upper() == operation:
+                return key
+        return None
+
+
+    def prepare_values(self, action, item, line, actual_date, time_of_operation):
+        """
+        Sestaví hodnoty pohybu stejně jako formulář - předvyplněné hodnoty ze skladové položky,
+        aktuální hodnoty operace a hodnoty zadané v řádku dávky. Výdej se jako ve formuláři
+        oceňuje vždy jednotkovou cenou skladové položky, cenu z řádku dávky nelze přepsat.
+        """
+        fixed_cols = ["Mnozstvi_ks_m_l", "Evidencni_cislo", "Typ_operace", "Operaci_provedl"]
+        if action == "vydej":
+            fixed_cols.append("Jednotkova_cena_EUR")
+        values = {col: "" for col in self.audit_log_col_names}
+        for col in self.rules[action]["insert_item_value"]:
+            if col in item:
+                values[col] = "" if item[col] is None else str(item[col])
+        if action == "prijem":
+            values["Dodavatel"] = "" if item.get("Dodavatel") is None else str(item["Dodavatel"])
+            values["Datum_nakupu"] = actual_date
+        else:
+            values["Datum_vydeje"] = actual_date
+        values["Typ_operace"] = self.operation_types[action]
+        values["Operaci_provedl"] = self.name_of_user
+        for col, value in line.items():
+            if col in values and col not in fixed_cols:
+                values[col] = "" if value is None else str(value)
+        values["Mnozstvi_ks_m_l"] = str(item["Mnozstvi_ks_m_l"])
+        values["Cas_operace"] = time_of_operation
+        return values
+
+
+    def apply(self, lines):
+        """
+        Zkontroluje, vypočítá a uloží seznam pohybů. Chybné řádky se přeskočí, ostatní se uloží
+        v jedné transakci. Pohyby stejné položky se počítají postupně v pořadí řádků.
+
+        :param lines: Seznam slovníků s klíči Evidencni_cislo, action nebo Typ_operace, Zmena_mnozstvi
+                      a dalšími sloupci audit_logu (Jednotkova_cena_EUR, Dodavatel, Cislo_objednavky, ...).
+        :return: Seznam slovníků s klíči line (pořadí řádku od 1), ok a message.
+        """
+        ids = {str(line.get(self.id_col_name, "")).strip() for line in lines}
+        items = {str(row[self.id_col_name]): row for row in self.model.fetch_sklad_items(ids)}
+        existing_variants = self.model.fetch_variant_keys(ids)
+        suppliers = dict(self.model.fetch_lookup_pairs("dodavatele", "Dodavatel", "id"))
+
+        actual_date = datetime.now().strftime("%Y-%m-%d")
+        time_of_operation = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        report = []
+        audit_log_rows = []
+        variant_prices = []
+        changed_items = {}
+
+        for line_no, line in enumerate(lines, start=1):
+            action = self.normalize_action(line)
+            if action is None:
+                report.append({"line": line_no, "ok": False, "message": "Neplatný typ operace."})
+                continue
+            item = items.get(str(line.get(self.id_col_name, "")).strip())
+            if item is None:
+                report.append({"line": line_no, "ok": False, "message": "Skladová položka neexistuje."})
+                continue
+
+            values = self.prepare_values(action, item, line, actual_date, time_of_operation)
+            warning = check_movement(self.rules[action], action, values)
+            if warning:
+                report.append({"line": line_no, "ok": False, "message": warning[1]})
+                continue
+
+            try:
+                new_unit_price = float(values['Jednotkova_cena_EUR'])
+                actual_unit_price = float(item['Jednotkova_cena_EUR'])
+            except (TypeError, ValueError):
+                report.append({"line": line_no, "ok": False,
+                               "message": "Jednotková cena skladové položky nebo řádku není platné číslo."})
+                continue
+            quantity = int(values['Mnozstvi_ks_m_l'])
+            audit_log_values, sklad_values = calculate_movement(action, quantity, int(item['Mnozstvi_ks_m_l']),
+                                                                actual_unit_price, int(values['Zmena_mnozstvi']),
+                                                                new_unit_price)
+            values.update(audit_log_values)
+            audit_log_rows.append([values[col] for col in self.audit_log_col_names])
+            values.update(sklad_values)
+            for col in self.rules[action]["tuple_values_to_save"]:
+                if col in values:
+                    item[col] = values[col]
+            changed_items[item[self.id_col_name]] = item
+
+            message = ""
+            if action == "prijem":
+                id_dodavatele = suppliers.get(values["Dodavatel"])
+                if (item[self.id_col_name], id_dodavatele) in existing_variants:
+                    variant_prices.append((new_unit_price, item[self.id_col_name], id_dodavatele))
+                else:
+                    message = "Varianta s tímto dodavatelem ještě neexistuje."
+            report.append({"line": line_no, "ok": True, "message": message})
+
+        save_cols = sorted({col for rules in self.rules.values() for col in rules["tuple_values_to_save"]})
+        sklad_rows = [[item[col] for col in save_cols] + [id_num] for id_num, item in changed_items.items()]
+        with self.model.transaction():
+            self.model.update_many("sklad", self.id_col_name, save_cols, sklad_rows)
+            self.model.insert_many("audit_log", self.audit_log_col_names, audit_log_rows)
+            self.model.update_variant_unit_prices(variant_prices)
+        return report
@@ -0,0 +1,52 @@
+class OperationDateIndex:
+    """
+    Třída OperationDateIndex udržuje index tabulky audit_log podle výrazu s datem pohybu ve formátu
+    RRRR-MM-DD (datum nákupu, jinak datum výdeje, jinak datum z času operace). Filtr měsíce nebo
+    rozmezí datumů v pohledu audit_log používá stejný výraz, takže se vyhodnotí jako rozsahový dotaz
+    nad indexem místo porovnávání dvou textových sloupců u každého řádku. Tvar tabulky se nemění,
+    starší verze aplikace tak mohou do databáze dál zapisovat.
+    """
+    col_name = "Datum_operace"
+    index_name = "idx_audit_log_Datum_operace"
+    source_cols = ("Datum_nakupu", "Datum_vydeje", "Cas_operace")
+    expression = ("COALESCE(date(NULLIF(Datum_nakupu, '')), date(NULLIF(Datum_vydeje, '')), "
+                  "date(NULLIF(Cas_operace, '')))")
+
+    def __init__(self, model):
+        """
+        Inicializace správce indexu.
+
+        :param model: Instance třídy Model s připojením k databázi a registrem schématu.
+        """
+        self.model = model
+        self.conn = model.conn
+
+
+    def ensure(self):
+        """
+        Vytvoří index audit_logu podle výrazu s datem operace, pokud ještě neexistuje. Generovaný
+        sloupec Datum_operace, který do databáze přidala předchozí verze aplikace (a kvůli kterému
+        starší verze nemohou zapisovat pohyby), se odstraní i s indexem podle něj.
+
+        :return: True, pokud byl index vytvořen nebo sloupec odstraněn.
+        """
+        if not self.model.schema.has_table("audit_log"):
+            return False
+        col_index = self.model.schema.col_index("audit_log")
+        if not all(col in col_index for col in self.source_cols):
+            return False
+        created = False
+        with self.model.transaction():
+            if self.col_name in self.model.schema.generated_columns("audit_log"):
+                self.conn.execute(f'DROP INDEX IF EXISTS "{self.index_name}"')
+                self.conn.execute(f'ALTER TABLE audit_log DROP COLUMN "{self.col_name}"')
+                created = True
+            exists = self.conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?",
+                                       (self.index_name,)).fetchone()
+            if exists is None:
+                self.conn.execute(f'CREATE INDEX "{self.index_name}" ON audit_log ({self.expression})')
+                created = True
+            self.model.commit("audit_log")
+        if created:
+            self.model.schema.load()
+        return created
@@ -0,0 +1,273 @@
+import bisect
+import cProfile
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+class Profiler:
+    """
+    Třída Profiler měří dobu trvání vybraných metod (Model, Controller, View, ItemFrame) - počet
+    volání, celkovou a maximální dobu, histogram latencí a počet řádků. Měření se zapíná proměnnou
+    prostředí nebo z menu. Zapnutím se měřené metody tříd nahradí obalujícími funkcemi a vypnutím
+    se vrátí původní metody, takže vypnuté měření nemá žádnou režii. Report měření lze uložit jako
+    text, JSON, zásobníky měřených volání ve formátu collapsed stacks (flamegraph.pl, speedscope)
+    a volitelně výstup cProfile (pstats) pro hlavní vlákno.
+    """
+    env_var = "SKLAD_PROFILE"
+    bucket_bounds_ms = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+    def __init__(self, targets):
+        """
+        Inicializace měření.
+
+        :param targets: Slovník třída -> n-tice názvů měřených metod, pokud None, měří se všechny
+                        veřejné metody definované ve třídě. Metody se nahradí i v podtřídách,
+                        které je přepisují.
+        """
+        self.targets = targets
+        self.originals = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.cprofile = None
+        self.reset()
+
+
+    @property
+    def enabled(self):
+        """
+        True, pokud jsou měřené metody nahrazené obalujícími funkcemi.
+        """
+        return bool(self.originals)
+
+
+    def reset(self):
+        """
+        Smaže naměřené hodnoty.
+        """
+        with self.lock:
+            self.stats = {}
+            self.stacks = {}
+            self.started = time.time()
+
+
+    def start_from_env(self):
+        """
+        Zapne měření, pokud je nastavená proměnná prostředí SKLAD_PROFILE (1 - měření metod,
+        cprofile - navíc cProfile hlavního vlákna).
+
+        :return: True, pokud bylo měření zapnuto.
+        """
+        value = os.environ.get(self.env_var, "").strip().lower()
+        if value in ("", "0", "false", "no"):
+            return False
+        self.enable(cprofile=value == "cprofile")
+        return True
+
+
+    def methods(self, cls, names):
+        """
+        Vrátí seznam n-tic (třída, název metody) měřených metod třídy a jejích podtříd,
+        které metodu přepisují. Generátory a již obalené funkce (např. context managery) se neměří.
+        """
+        if names is None:
+            names = [name for name, value in vars(cls).items()
+                     if not name.startswith("_") and inspect.isfunction(value)]
+        classes = [cls]
+        idx = 0
+        while idx < len(classes):
+            classes.extend(sub for sub in classes[idx].__subclasses__() if sub not in classes)
+            idx += 1
+        methods = []
+        for klass in classes:
+            for name in names:
+                func = vars(klass).get(name)
+                if not inspect.isfunction(func) or inspect.isgeneratorfunction(func):
+                    continue
+                if hasattr(func, "__wrapped__"):
+                    continue
+                methods.append((klass, name))
+        return methods
+
+
+    def enable(self, cprofile=False):
+        """
+        Zapne měření - nahradí měřené metody obalujícími funkcemi.
+
+        :param cprofile: Pokud True, zapne se navíc cProfile pro hlavní vlákno (vyšší režie).
+        """
+        if self.enabled:
+            return
+        self.reset()
+        for cls, names in self.targets.items():
+            for klass, name in self.methods(cls, names):
+                original = vars(klass)[name]
+                self.originals[(klass, name)] = original
+                setattr(klass, name, self.wrap(f"{klass.__name__}.{name}", original))
+        if cprofile:
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+
+
+    def disable(self):
+        """
+        Vypne měření - vrátí původní metody. Naměřené hodnoty zůstanou pro uložení reportu.
+        """
+        for (klass, name), original in self.originals.items():
+            setattr(klass, name, original)
+        self.originals = {}
+        if self.cprofile is not None:
+            self.cprofile.disable()
+
+
+    def wrap(self, label, func):
+        """
+        Vrátí funkci, která měří dobu volání func a výsledek zapíše pod názvem label.
+        """
+        profiler = self
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            stack = getattr(profiler.local, "stack", None)
+            if stack is None:
+                stack = profiler.local.stack = [threading.current_thread().name]
+                profiler.local.child_times = [0.0]
+            child_times = profiler.local.child_times
+            stack.append(label)
+            child_times.append(0.0)
+            result = None
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+                return result
+            finally:
+                elapsed = time.perf_counter() - start
+                path = ";".join(stack)
+                stack.pop()
+                self_time = elapsed - child_times.pop()
+                child_times[-1] += elapsed
+                profiler.record(label, path, elapsed, self_time, profiler.row_count(args, result))
+
+        return wrapper
+
+
+    @staticmethod
+    def row_count(args, result):
+        """
+        Vrátí počet řádků volání - délku výsledku, pokud je seznam, jinak délku posledního
+        argumentu typu seznam (např. vkládané řádky), jinak None.
+        """
+        if isinstance(result, list):
+            return len(result)
+        for arg in reversed(args):
+            if isinstance(arg, list):
+                return len(arg)
+        return None
+
+
+    def record(self, label, path, elapsed, self_time, rows):
+        """
+        Zapíše jedno měření do statistik metody a do zásobníku volání.
+        """
+        elapsed_ms = elapsed * 1000
+        with self.lock:
+            stat = self.stats.get(label)
+            if stat is None:
+                stat = self.stats[label] = {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0,
+                                            "buckets": [0] * (len(self.bucket_bounds_ms) + 1)}
+            stat["count"] += 1
+            stat["total_ms"] += elapsed_ms
+            stat["max_ms"] = max(stat["max_ms"], elapsed_ms)
+            if rows is not None:
+                stat["rows"] += rows
+            stat["buckets"][bisect.bisect_left(self.bucket_bounds_ms, elapsed_ms)] += 1
+            self.stacks[path] = self.stacks.get(path, 0.0) + self_time
+
+
+    def percentile(self, buckets, fraction):
+        """
+        Vrátí horní mez intervalu histogramu, do kterého patří zadaný podíl volání (odhad percentilu).
+        """
+        target = sum(buckets) * fraction
+        count = 0
+        for idx, bucket in enumerate(buckets):
+            count += bucket
+            if count >= target and bucket:
+                return self.bucket_bounds_ms[idx] if idx < len(self.bucket_bounds_ms) else None
+        return None
+
+
+    def report(self):
+        """
+        Vrátí seznam slovníků se statistikami měřených metod seřazený podle celkové doby.
+        """
+        with self.lock:
+            stats = {label: dict(stat, buckets=list(stat["buckets"])) for label, stat in self.stats.items()}
+        rows = []
+        for label, stat in stats.items():
+            rows.append({"name": label, "count": stat["count"], "total_ms": round(stat["total_ms"], 3),
+                         "mean_ms": round(stat["total_ms"] / stat["count"], 3), "max_ms": round(stat["max_ms"], 3),
+                         "p50_ms": self.percentile(stat["buckets"], 0.5),
+                         "p95_ms": self.percentile(stat["buckets"], 0.95), "rows": stat["rows"],
+                         "histogram": dict(zip([f"<={bound}" for bound in self.bucket_bounds_ms]
+                                               + [f">{self.bucket_bounds_ms[-1]}"], stat["buckets"]))})
+        rows.sort(key=lambda row: row["total_ms"], reverse=True)
+        return rows
+
+
+    def format_report(self):
+        """
+        Vrátí report měření jako text s tabulkou měřených metod.
+        """
+        lines = [f"Měření od {datetime.fromtimestamp(self.started).strftime('%Y-%m-%d %H:%M:%S')}",
+                 f"{'Metoda':45} {'volání':>8} {'celkem ms':>11} {'průměr ms':>10} {'p50':>6} "
+                 f"{'p95':>6} {'max ms':>10} {'řádků':>10}"]
+        for row in self.report():
+            p50 = "" if row["p50_ms"] is None else f"<={row['p50_ms']}"
+            p95 = "" if row["p95_ms"] is None else f"<={row['p95_ms']}"
+            lines.append(f"{row['name']:45} {row['count']:8} {row['total_ms']:11.1f} {row['mean_ms']:10.2f} "
+                         f"{p50:>6} {p95:>6} {row['max_ms']:10.1f} {row['rows']:10}")
+        return "\n".join(lines)
+
+
+    def collapsed_stacks(self):
+        """
+        Vrátí zásobníky měřených volání ve formátu collapsed stacks - řádek 'vlákno;metoda;...;metoda
+        čas', kde čas je vlastní doba metody (bez vnořených měřených volání) v mikrosekundách.
+        """
+        with self.lock:
+            stacks = dict(self.stacks)
+        return "\n".join(f"{path} {int(seconds * 1000000)}" for path, seconds in sorted(stacks.items())
+                         if int(seconds * 1000000) > 0)
+
+
+    def dump(self, directory):
+        """
+        Uloží report měření do adresáře - text (.txt), JSON (.json), collapsed stacks (_stacks.txt)
+        a při zapnutém cProfile výstup pstats (.prof).
+
+        :param directory: Adresář pro uložení souborů.
+        :return: Seznam cest k uloženým souborům.
+        """
+        base = os.path.join(directory, f"profil_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        files = []
+        with open(f"{base}.txt", "w", encoding="utf-8") as f:
+            f.write(self.format_report() + "\n")
+        files.append(f"{base}.txt")
+        with open(f"{base}.json", "w", encoding="utf-8") as f:
+            json.dump({"started": datetime.fromtimestamp(self.started).strftime("%Y-%m-%d %H:%M:%S"),
+                       "bucket_bounds_ms": self.bucket_bounds_ms, "methods": self.report()},
+                      f, ensure_ascii=False, indent=2)
+        files.append(f"{base}.json")
+        with open(f"{base}_stacks.txt", "w", encoding="utf-8") as f:
+            f.write(self.collapsed_stacks() + "\n")
+        files.append(f"{base}_stacks.txt")
+        if self.cprofile is not None:
+            self.cprofile.dump_stats(f"{base}.prof")
+            files.append(f"{base}.prof")
+            if self.enabled:
+                self.cprofile.enable()
+        return files
@@ -0,0 +1,355 @@
+import json
+
+from lowstock import LowStockIndex
+
+def row_text(*values):
+    """
+    Text řádku pro vyhledávání - stejný jako při filtraci v Pythonu " ".join(map(str, row)).lower().
+    """
+    return " ".join(map(str, values)).lower()
+
+
+def sort_group(value):
+    """
+    Skupina pro třídění - 0 pro hodnoty převoditelné na číslo, 1 pro ostatní (text).
+    """
+    return 1 if sort_num(value) is None else 0
+
+
+def sort_num(value):
+    """
+    Číselná hodnota pro třídění nebo None, pokud hodnotu nelze převést na float.
+    """
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def sort_text(value):
+    """
+    Textová hodnota pro třídění (malými písmeny) nebo None pro číselné hodnoty.
+    """
+    if sort_num(value) is not None:
+        return None
+    return "" if value is None else str(value).lower()
+
+
+def register_query_functions(conn):
+    """
+    Zaregistruje v připojení k databázi funkce pro vyhledávání a třídění, aby výsledky dotazů
+    odpovídaly původní filtraci a třídění v Pythonu.
+
+    :param conn: Připojení k databázi sqlite3.
+    """
+    conn.create_function("row_text", -1, row_text, deterministic=True)
+    conn.create_function("sort_group", 1, sort_group, deterministic=True)
+    conn.create_function("sort_num", 1, sort_num, deterministic=True)
+    conn.create_function("sort_text", 1, sort_text, deterministic=True)
+
+
+class QueryBuilder:
+    """
+    Třída QueryBuilder sestaví z aktuálního stavu filtrů pohledu (vyhledávání, check buttony,
+    comboboxy, rozmezí datumů) a třídění parametrizovaný dotaz s klauzulemi WHERE, ORDER BY
+    a LIMIT / OFFSET nad základním dotazem tabulky.
+    """
+    max_function_args = 100
+    flag_conditions = {LowStockIndex.col_name: (LowStockIndex.condition, LowStockIndex.source_cols)}
+
+    def __init__(self, base_query, tables, col_names, search_index=None, integer_key=None, attached=None):
+        """
+        Inicializace sestavovače dotazu.
+
+        :param base_query: Základní dotaz tabulky (SELECT bez filtrace a třídění).
+        :param tables: N-tice tabulek, ze kterých základní dotaz čte, první je zobrazovaná tabulka.
+        :param col_names: Názvy sloupců výsledku základního dotazu.
+        :param search_index: Instance SearchIndex pro fulltextové vyhledávání, pokud None,
+                             vyhledává se podřetězec ve všech sloupcích řádku.
+        :param integer_key: Název sloupce INTEGER PRIMARY KEY zobrazované tabulky, který obsahuje
+                            jen celá čísla, takže se podle něj může třídit přímo (bez převodu hodnot).
+        :param attached: Slovník název schématu -> cesta k souboru databází, které musí být
+                         připojené (ATTACH) k připojení, které dotaz provádí.
+        """
+        self.base_query = base_query
+        self.tables = tuple(tables)
+        self.col_names = tuple(col_names)
+        self.search_index = search_index
+        self.integer_key = integer_key
+        self.attached = dict(attached or {})
+        self.search_mode = None
+        self.search_text = None
+        self.search_condition = None
+        self.search_ids_query = None
+        self.conditions = []
+        self.params = []
+        self.order_col = None
+        self.order_reverse = False
+        self.rank_query = None
+
+
+    @staticmethod
+    def quote(col):
+        """
+        Vrátí název sloupce v uvozovkách pro použití v SQL.
+        """
+        return '"' + str(col).replace('"', '""') + '"'
+
+
+    def check_col(self, col):
+        """
+        Ověří, že sloupec je ve výsledku základního dotazu, a vrátí jeho název v uvozovkách.
+        """
+        if col not in self.col_names:
+            raise KeyError(f"Sloupec {col} není ve výsledku dotazu.")
+        return self.quote(col)
+
+
+    def search(self, text):
+        """
+        Přidá podmínku vyhledávání textu. Pokud má tabulka fulltextový index, hledají se slova
+        podle začátku bez ohledu na velikost písmen a diakritiku, jinak se hledá podřetězec
+        (bez ohledu na velikost písmen) ve všech sloupcích řádku.
+
+        :param text: Hledaný text, prázdný text podmínku nepřidá.
+        """
+        if not text:
+            return self
+        if self.search_index is not None and self.search_index.can_search(self.tables[0], text):
+            condition, params = self.search_index.match_condition(self.tables[0], text, self.col_names)
+            if condition:
+                self.conditions.append(condition)
+                self.params.extend(params)
+                self.search_mode = "fulltext"
+                self.search_text = text
+                self.search_condition = (condition, tuple(params))
+                self.search_ids_query = self.search_index.direct_match(self.tables[0], text, self.col_names)
+                return self
+        cols = [self.quote(col) for col in self.col_names]
+        chunks = [cols[idx:idx + self.max_function_args] for idx in range(0, len(cols), self.max_function_args)]
+        text_expr = " || ' ' || ".join(f"row_text({', '.join(chunk)})" for chunk in chunks)
+        self.conditions.append(f"instr({text_expr}, ?) > 0")
+        self.params.append(text.lower())
+        self.search_mode = "substring"
+        self.search_condition = (self.conditions[-1], (text.lower(),))
+        return self
+
+
+    def equals(self, col, value):
+        """
+        Přidá podmínku rovnosti hodnoty sloupce.
+        """
+        self.conditions.append(f"{self.check_col(col)} = ?")
+        self.params.append(value)
+        return self
+
+
+    def flags(self, cols):
+        """
+        Přidá podmínku, že všechny zadané sloupce (check buttony) mají hodnotu 1. Pro počítané
+        sloupce z flag_conditions se použije přímo podmínka, ze které se sloupec počítá (je-li
+        výsledek dotazu obsahuje), aby se vyhodnotila částečným indexem.
+        """
+        for col in cols:
+            self.check_col(col)
+            condition, source_cols = self.flag_conditions.get(col, (None, ()))
+            if condition is not None and all(source_col in self.col_names for source_col in source_cols):
+                self.conditions.append(condition)
+            else:
+                self.conditions.append(f"{self.quote(col)} = 1")
+        return self
+
+
+    def linked(self, col, link_table, link_col, value_col, value):
+        """
+        Přidá podmínku, že řádek má vazbu se zadanou hodnotou ve vazební tabulce (např. skladová
+        položka se používá v zařízení). Podmínka se vyhodnotí indexem vazební tabulky podle value_col.
+
+        :param col: Sloupec výsledku s id řádku.
+        :param link_table: Název vazební tabulky.
+        :param link_col: Sloupec vazební tabulky s id řádku.
+        :param value_col: Sloupec vazební tabulky s hodnotou vazby.
+        :param value: Hodnota vazby (např. id zařízení).
+        """
+        self.conditions.append(f"{self.check_col(col)} IN (SELECT {self.quote(link_col)} FROM "
+                               f"{self.quote(link_table)} WHERE {self.quote(value_col)} = ?)")
+        self.params.append(value)
+        return self
+
+
+    def date_range(self, start_date, end_date, date_cols):
+        """
+        Přidá podmínku rozmezí datumů. Datum řádku je první neprázdná hodnota ze zadaných sloupců.
+
+        :param start_date: Počáteční datum ve formátu RRRR-MM-DD, pokud None, podmínka se nepřidá.
+        :param end_date: Koncové datum ve formátu RRRR-MM-DD (včetně).
+        :param date_cols: N-tice sloupců s datumem v pořadí priority.
+        """
+        if not start_date:
+            return self
+        date_expr = self.check_col(date_cols[-1])
+        for col in reversed(date_cols[:-1]):
+            date_expr = f"COALESCE(NULLIF({self.check_col(col)}, ''), {date_expr})"
+        self.conditions.append(f"{date_expr} BETWEEN ? AND ?")
+        self.params.extend([start_date, end_date])
+        return self
+
+
+    def expression_range(self, expression, source_cols, start_date, end_date):
+        """
+        Přidá podmínku rozmezí hodnot výrazu nad sloupci výsledku. Pokud je výraz shodný s výrazem
+        indexu tabulky (např. OperationDateIndex.expression), podmínka se vyhodnotí indexem.
+
+        :param expression: SQL výraz nad sloupci výsledku.
+        :param source_cols: Sloupce, ze kterých se výraz počítá (ověří se, že jsou ve výsledku).
+        :param start_date: Počáteční hodnota, pokud None, podmínka se nepřidá.
+        :param end_date: Koncová hodnota (včetně).
+        """
+        if not start_date:
+            return self
+        for col in source_cols:
+            self.check_col(col)
+        self.conditions.append(f"{expression} BETWEEN ? AND ?")
+        self.params.extend([start_date, end_date])
+        return self
+
+
+    def order_by(self, col, reverse=False):
+        """
+        Nastaví třídění podle sloupce - čísla před textem, text bez ohledu na velikost písmen,
+        při shodě podle pořadí id (prvního sloupce).
+
+        :param col: Název sloupce pro třídění.
+        :param reverse: True pro reverzní třídění.
+        """
+        self.check_col(col)
+        self.order_col = col
+        self.order_reverse = reverse
+        return self
+
+
+    def order_by_rank(self):
+        """
+        Nastaví třídění podle relevance fulltextového vyhledávání (bm25) - nejdřív řádky, ve kterých
+        index tabulky našel všechna slova, od nejrelevantnějších, pak ostatní nalezené řádky
+        (např. varianty nalezené jen podle dodavatele) podle id. Pokud se nehledá fulltextovým
+        indexem, třídění se nezmění.
+        """
+        if self.search_mode == "fulltext":
+            self.rank_query = self.search_index.rank_query(self.tables[0], self.search_text)
+        return self
+
+
+    def from_clause(self):
+        """
+        Vrátí klauzuli FROM se základním dotazem, při třídění podle relevance připojenou ke skóre
+        fulltextového indexu, a parametry klauzule.
+        """
+        if self.rank_query is None:
+            return f" FROM ({self.base_query}) AS t", ()
+        rank_sql, rank_params = self.rank_query
+        id_col = self.quote(self.col_names[0])
+        return f" FROM ({self.base_query}) AS t LEFT JOIN ({rank_sql}) AS r ON r.rank_id = t.{id_col}", rank_params
+
+
+    def where_clause(self):
+        """
+        Vrátí klauzuli WHERE nebo prázdný řetězec, pokud nejsou zadány žádné podmínky.
+        """
+        if not self.conditions:
+            return ""
+        return " WHERE " + " AND ".join(self.conditions)
+
+
+    def order_clause(self):
+        """
+        Vrátí klauzuli ORDER BY.
+        """
+        id_col = self.quote(self.col_names[0])
+        if self.rank_query is not None:
+            return f" ORDER BY COALESCE(r.rank_score, 0), t.{id_col}"
+        if self.order_col is None:
+            return f" ORDER BY {id_col}"
+        col = self.quote(self.order_col)
+        direction = "DESC" if self.order_reverse else "ASC"
+        if self.order_col == self.integer_key:
+            return f" ORDER BY {col} {direction}"
+        is_number = f"typeof({col}) IN ('integer', 'real')"
+        return (f" ORDER BY CASE WHEN {is_number} THEN 0 ELSE sort_group({col}) END {direction},"
+                f" CASE WHEN {is_number} THEN {col} ELSE sort_num({col}) END {direction},"
+                f" CASE WHEN {is_number} THEN NULL ELSE sort_text({col}) END {direction}, {id_col}")
+
+
+    def build(self, limit=None, offset=0):
+        """
+        Sestaví dotaz na vyfiltrované a seřazené řádky.
+
+        :param limit: Maximální počet vrácených řádků, pokud None, vrátí se všechny.
+        :param offset: Počet řádků, které se na začátku přeskočí.
+        :return: N-tice (text dotazu, parametry).
+        """
+        from_clause, from_params = self.from_clause()
+        query = f"SELECT t.*{from_clause}{self.where_clause()}{self.order_clause()}"
+        params = list(from_params) + list(self.params)
+        if limit is not None:
+            query += " LIMIT ? OFFSET ?"
+            params.extend([limit, offset])
+        elif offset:
+            query += " LIMIT -1 OFFSET ?"
+            params.append(offset)
+        return query, tuple(params)
+
+
+    def build_count(self):
+        """
+        Sestaví dotaz na počet vyfiltrovaných řádků.
+
+        :return: N-tice (text dotazu, parametry).
+        """
+        query = f"SELECT COUNT(*) FROM ({self.base_query}) AS t{self.where_clause()}"
+        return query, tuple(self.params)
+
+
+    def build_ids(self):
+        """
+        Sestaví dotaz na id (první sloupec) vyfiltrovaných řádků v pořadí třídění.
+
+        :return: N-tice (text dotazu, parametry).
+        """
+        id_col = self.quote(self.col_names[0])
+        from_clause, from_params = self.from_clause()
+        query = f"SELECT t.{id_col}{from_clause}{self.where_clause()}{self.order_clause()}"
+        return query, tuple(from_params) + tuple(self.params)
+
+
+    def build_search_ids(self, within_ids):
+        """
+        Sestaví dotaz na id řádků, které odpovídají jen hledanému textu, pro zpřesnění předchozího
+        výsledku (ostatní filtry už předchozí výsledek splňuje). Pokud fulltextový index vrací
+        přímo id tabulky, použije se samotný index, jinak se podmínka hledání vyhodnotí
+        jen pro řádky předchozího výsledku.
+
+        :param within_ids: Seznam id předchozího výsledku.
+        :return: N-tice (text dotazu, parametry).
+        """
+        if self.search_ids_query is not None:
+            return self.search_ids_query
+        id_col = self.quote(self.col_names[0])
+        condition, params = self.search_condition
+        query = (f"SELECT {id_col} FROM ({self.base_query}) AS t "
+                 f"WHERE {id_col} IN (SELECT value FROM json_each(?)) AND {condition}")
+        return query, (json.dumps(list(within_ids)),) + tuple(params)
+
+
+    def build_by_ids(self, ids):
+        """
+        Sestaví dotaz na řádky základního dotazu se zadanými id (bez filtrace a třídění).
+
+        :param ids: Seznam id řádků.
+        :return: N-tice (text dotazu, parametry).
+        """
+        id_col = self.quote(self.col_names[0])
+        placeholders = ", ".join("?" for _ in ids)
+        return f"SELECT * FROM ({self.base_query}) AS t WHERE {id_col} IN ({placeholders})", tuple(ids)
@@ -0,0 +1,70 @@
+class QueryCache:
+    """
+    Třída QueryCache uchovává v paměti výsledky dotazů modelu pro jednotlivé tabulky a dotazy.
+    """
+    def __init__(self, max_entries=256):
+        """
+        Inicializace prázdné cache.
+
+        :param max_entries: Maximální počet uložených výsledků, při překročení se vyřadí nejstarší.
+        """
+        self.max_entries = max_entries
+        self.results = {}
+        self.data_version = None
+
+
+    def get(self, key):
+        """
+        Vrátí uložený výsledek dotazu.
+
+        :param key: Klíč dotazu - n-tice (text dotazu, parametry).
+        :return: Kopie seznamu řádků nebo None, pokud výsledek v cache není.
+        """
+        cached = self.results.get(key)
+        if cached is None:
+            return None
+        return list(cached[1])
+
+
+    def set(self, key, tables, result):
+        """
+        Uloží výsledek dotazu do cache.
+
+        :param key: Klíč dotazu - n-tice (text dotazu, parametry).
+        :param tables: N-tice tabulek, ze kterých dotaz čte, pro pozdější zneplatnění.
+        :param result: Seznam řádků vrácený dotazem.
+        """
+        self.results.pop(key, None)
+        self.results[key] = (frozenset(tables), list(result))
+        while len(self.results) > self.max_entries:
+            del self.results[next(iter(self.results))]
+
+
+    def invalidate(self, *tables):
+        """
+        Zneplatní všechny uložené výsledky dotazů, které čtou z některé ze zadaných tabulek.
+
+        :param tables: Názvy změněných tabulek.
+        """
+        changed = set(tables)
+        self.results = {key: cached for key, cached in self.results.items() if not cached[0] & changed}
+
+
+    def clear(self):
+        """
+        Vymaže celou cache.
+        """
+        self.results = {}
+
+
+    def check_data_version(self, data_version):
+        """
+        Porovná hodnotu PRAGMA data_version s naposledy viděnou hodnotou. Hodnota se mění, když
+        do databázového souboru zapíše jiné připojení (např. jiná pracovní stanice), v tom
+        případě se celá cache vymaže.
+
+        :param data_version: Aktuální hodnota PRAGMA data_version.
+        """
+        if data_version != self.data_version:
+            self.clear()
+            self.data_version = data_version
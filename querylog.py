@@ -0,0 +1,304 @@
+import itertools
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from commonresources import CommonResources
+
+class QueryLog:
+    """
+    Třída QueryLog sbírá statistiky SQL příkazů všech připojení modelu v procesu - pro každý příkaz
+    (text s normalizovanými mezerami a seznamy parametrů IN) počet provedení, celkovou dobu, medián,
+    95. percentil a maximum z posledních provedení a počet řádků. Příkazy delší než nastavená mez
+    (CommonResources.slow_query_ms) se zapíšou do logu pomalých dotazů s parametry, počtem řádků
+    a plánem dotazu (EXPLAIN QUERY PLAN), podle kterého lze najít dotazy procházející celé tabulky.
+    """
+    durations_window = 1000
+    max_slow_entries = 200
+    max_param_length = 200
+    max_cached_keys = 5000
+    shared_log = None
+    shared_lock = threading.Lock()
+
+    def __init__(self, threshold_ms=None):
+        """
+        Inicializace logu dotazů.
+
+        :param threshold_ms: Mez pro zápis pomalého dotazu v milisekundách, pokud None,
+                             použije se CommonResources.slow_query_ms.
+        """
+        self.threshold_ms = CommonResources.slow_query_ms if threshold_ms is None else threshold_ms
+        self.lock = threading.Lock()
+        self.reset()
+
+
+    @classmethod
+    def shared(cls):
+        """
+        Vrátí společný log dotazů procesu, do kterého zapisují všechna připojení modelu
+        (hlavní, pracovní vlákno, export a import).
+        """
+        with cls.shared_lock:
+            if cls.shared_log is None:
+                cls.shared_log = cls()
+            return cls.shared_log
+
+
+    def reset(self):
+        """
+        Smaže statistiky a log pomalých dotazů.
+        """
+        with self.lock:
+            self.stats = {}
+            self.keys = {}
+            self.slow = deque(maxlen=self.max_slow_entries)
+            self.started = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+    @staticmethod
+    def normalize(sql):
+        """
+        Vrátí text příkazu pro seskupení statistik - bez nadbytečných mezer a se seznamy
+        parametrů (?, ?, ...) zkrácenými na jeden, aby se dotazy s různým počtem id sešly.
+        """
+        sql = re.sub(r"\s+", " ", sql).strip()
+        return re.sub(r"\?(?:\s*,\s*\?)+", "?, ...", sql)
+
+
+    @classmethod
+    def format_params(cls, params):
+        """
+        Vrátí zkrácený text parametrů příkazu pro log pomalých dotazů.
+        """
+        text = repr(tuple(params) if isinstance(params, list) else params)
+        return text if len(text) <= cls.max_param_length else text[:cls.max_param_length] + "..."
+
+
+    def record(self, conn, sql, params, elapsed, rows, many=False):
+        """
+        Zapíše provedení příkazu do statistik a při překročení meze do logu pomalých dotazů.
+
+        :param conn: Připojení, na kterém byl příkaz proveden (pro EXPLAIN QUERY PLAN).
+        :param sql: Text příkazu.
+        :param params: Parametry příkazu (u executemany parametry prvního řádku).
+        :param elapsed: Doba provedení včetně načtení řádků v sekundách.
+        :param rows: Počet načtených nebo změněných řádků, nebo None.
+        :param many: True pro executemany.
+        """
+        elapsed_ms = elapsed * 1000
+        key = self.keys.get(sql)
+        if key is None:
+            key = self.normalize(sql)
+            if len(self.keys) >= self.max_cached_keys:
+                self.keys.clear()
+            self.keys[sql] = key
+        with self.lock:
+            stat = self.stats.get(key)
+            if stat is None:
+                stat = self.stats[key] = {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0,
+                                          "durations": deque(maxlen=self.durations_window)}
+            stat["count"] += 1
+            stat["total_ms"] += elapsed_ms
+            stat["max_ms"] = max(stat["max_ms"], elapsed_ms)
+            stat["rows"] += rows if rows and rows > 0 else 0
+            stat["durations"].append(elapsed_ms)
+        if elapsed_ms < self.threshold_ms:
+            return
+        entry = {"time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "ms": round(elapsed_ms, 2),
+                 "sql": key, "params": self.format_params(params), "rows": rows, "many": many,
+                 "thread": threading.current_thread().name, "plan": self.explain(conn, sql, params)}
+        with self.lock:
+            self.slow.append(entry)
+
+
+    @staticmethod
+    def explain(conn, sql, params):
+        """
+        Vrátí plán příkazu (EXPLAIN QUERY PLAN) jako seznam řádků s odsazením podle úrovně,
+        nebo text chyby, pokud plán nelze získat (např. PRAGMA nebo ATTACH).
+        """
+        try:
+            cursor = conn.cursor(sqlite3.Cursor)
+            plan_rows = cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+        except (sqlite3.Error, ValueError) as e:
+            return [f"Plán nelze získat: {e}"]
+        levels = {}
+        lines = []
+        for node_id, parent_id, _, detail in plan_rows:
+            levels[node_id] = levels.get(parent_id, -1) + 1
+            lines.append("  " * levels[node_id] + detail)
+        return lines
+
+
+    @staticmethod
+    def percentile(durations, fraction):
+        """
+        Vrátí percentil ze seznamu dob (nejbližší hodnota), nebo 0 pro prázdný seznam.
+        """
+        if not durations:
+            return 0.0
+        ordered = sorted(durations)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+    def report(self):
+        """
+        Vrátí seznam slovníků se statistikami příkazů seřazený podle celkové doby.
+        """
+        with self.lock:
+            stats = [(key, dict(stat, durations=list(stat["durations"]))) for key, stat in self.stats.items()]
+        rows = []
+        for key, stat in stats:
+            rows.append({"sql": key, "count": stat["count"], "total_ms": round(stat["total_ms"], 2),
+                         "p50_ms": round(self.percentile(stat["durations"], 0.5), 2),
+                         "p95_ms": round(self.percentile(stat["durations"], 0.95), 2),
+                         "max_ms": round(stat["max_ms"], 2), "rows": stat["rows"]})
+        rows.sort(key=lambda row: row["total_ms"], reverse=True)
+        return rows
+
+
+    def slow_queries(self):
+        """
+        Vrátí seznam záznamů logu pomalých dotazů od nejnovějšího.
+        """
+        with self.lock:
+            return list(reversed(self.slow))
+
+
+    def export(self, file_name):
+        """
+        Uloží statistiky příkazů a log pomalých dotazů do souboru JSON.
+
+        :param file_name: Cesta k souboru.
+        """
+        data = {"started": self.started, "exported": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "threshold_ms": self.threshold_ms, "statements": self.report(), "slow_queries": self.slow_queries()}
+        with open(file_name, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+class LoggingCursor(sqlite3.Cursor):
+    """
+    Kurzor, který měří dobu provedení příkazů a zapisuje je do logu dotazů připojení. U dotazů
+    vracejících řádky se započítá i načtení řádků (fetchall, fetchone, fetchmany, iterace),
+    záznam se zapíše po načtení řádků nebo před dalším příkazem kurzoru.
+    """
+    pending = None
+
+    def execute(self, sql, parameters=()):
+        """
+        Provede příkaz a změří dobu provedení.
+        """
+        self.finish()
+        start = time.perf_counter()
+        super().execute(sql, parameters)
+        self.begin(sql, parameters, time.perf_counter() - start, False)
+        return self
+
+
+    def executemany(self, sql, seq_of_parameters):
+        """
+        Provede příkaz pro všechny řádky parametrů a změří celkovou dobu provedení.
+        """
+        self.finish()
+        rows = iter(seq_of_parameters)
+        first = next(rows, None)
+        if first is not None:
+            rows = itertools.chain((first,), rows)
+        start = time.perf_counter()
+        super().executemany(sql, rows)
+        self.begin(sql, first if first is not None else (), time.perf_counter() - start, True)
+        return self
+
+
+    def begin(self, sql, parameters, elapsed, many):
+        """
+        Zapíše příkaz bez výsledných řádků hned, u dotazu s řádky počká na jejich načtení.
+        """
+        if self.description is None:
+            self.connection.query_log.record(self.connection, sql, parameters, elapsed, self.rowcount, many)
+        else:
+            self.pending = [sql, parameters, elapsed, 0, many]
+
+
+    def finish(self):
+        """
+        Zapíše rozpracovaný dotaz s řádky do logu dotazů.
+        """
+        pending = self.pending
+        if pending is not None:
+            self.pending = None
+            sql, parameters, elapsed, rows, many = pending
+            self.connection.query_log.record(self.connection, sql, parameters, elapsed, rows, many)
+
+
+    def fetched(self, elapsed, rows, done):
+        """
+        Připočte dobu a počet načtených řádků k rozpracovanému dotazu.
+        """
+        if self.pending is not None:
+            self.pending[2] += elapsed
+            self.pending[3] += rows
+            if done:
+                self.finish()
+
+
+    def fetchall(self):
+        start = time.perf_counter()
+        result = super().fetchall()
+        self.fetched(time.perf_counter() - start, len(result), True)
+        return result
+
+
+    def fetchone(self):
+        start = time.perf_counter()
+        result = super().fetchone()
+        self.fetched(time.perf_counter() - start, int(result is not None), True)
+        return result
+
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        size = self.arraysize if size is None else size
+        result = super().fetchmany(size)
+        self.fetched(time.perf_counter() - start, len(result), len(result) < size)
+        return result
+
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self.fetched(time.perf_counter() - start, 0, True)
+            raise
+        self.fetched(time.perf_counter() - start, 1, False)
+        return row
+
+
+    def close(self):
+        self.finish()
+        super().close()
+
+
+class LoggingConnection(sqlite3.Connection):
+    """
+    Připojení, jehož kurzory (včetně execute a executemany volaných přímo na připojení)
+    zapisují provedené příkazy do logu dotazů query_log.
+    """
+    query_log = None
+
+    def cursor(self, factory=LoggingCursor):
+        return super().cursor(factory)
+
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
@@ -0,0 +1,120 @@
+from lowstock import LowStockIndex
+from operationdate import OperationDateIndex
+
+class SchemaOptimizer:
+    """
+    Třída SchemaOptimizer se stará o údržbu schématu databáze - vytvoření a ověření indexů,
+    aktualizaci statistik (ANALYZE / PRAGMA optimize) a porovnání plánů dotazů před a po údržbě.
+    """
+    index_definitions = {
+        "idx_varianty_id_sklad_id_dodavatele": ("varianty", ("id_sklad", "id_dodavatele")),
+        "idx_varianty_id_dodavatele": ("varianty", ("id_dodavatele",)),
+        "idx_dodavatele_Dodavatel": ("dodavatele", ("Dodavatel",)),
+        "idx_audit_log_Evidencni_cislo_Cas_operace": ("audit_log", ("Evidencni_cislo", "Cas_operace")),
+        "idx_uzivatele_username": ("uzivatele", ("username",)),
+        "idx_sklad_zarizeni_id_zarizeni": ("sklad_zarizeni", ("id_zarizeni", "id_sklad")),
+        }
+
+    plan_queries = {
+        "fetch_varianty_data": ("""SELECT v.*, s.Nazev_dilu, d.Dodavatel FROM varianty v
+                                   JOIN sklad s ON v.id_sklad = s.Evidencni_cislo
+                                   JOIN dodavatele d ON v.id_dodavatele = d.id""", ()),
+        "fetch_item_variants": ("""SELECT v.*, d.Dodavatel FROM varianty AS v
+                                   JOIN dodavatele AS d ON v.id_dodavatele = d.id
+                                   WHERE v.id_sklad = ?""", (1,)),
+        "check_existence": ("SELECT EXISTS(SELECT 1 FROM varianty WHERE id_sklad = ? AND id_dodavatele = ?)", (1, 1)),
+        "fetch_supplier_for_inquiry": ("SELECT * FROM dodavatele WHERE Dodavatel = ?", ("",)),
+        "verify_user_credentials": ("SELECT password_hash FROM uzivatele WHERE username = ?", ("",)),
+        "audit_log_item_history": ("SELECT * FROM audit_log WHERE Evidencni_cislo = ? ORDER BY Cas_operace", (1,)),
+        "sklad_device_filter": ("""SELECT Evidencni_cislo FROM sklad WHERE Evidencni_cislo IN
+                                   (SELECT id_sklad FROM sklad_zarizeni WHERE id_zarizeni = ?)""", (1,)),
+        "sklad_low_stock": (f"SELECT Evidencni_cislo FROM sklad WHERE {LowStockIndex.condition}", ()),
+        "audit_log_date_range": (f"SELECT id FROM audit_log WHERE {OperationDateIndex.expression} BETWEEN ? AND ?",
+                                 ("2024-01-01", "2024-01-31")),
+        }
+
+    def __init__(self, model):
+        """
+        Inicializace optimalizátoru.
+
+        :param model: Instance třídy Model s připojením k databázi a registrem schématu.
+        """
+        self.model = model
+        self.conn = model.conn
+
+
+    def index_applicable(self, table, columns):
+        """
+        Ověří, zda tabulka indexu existuje a obsahuje všechny sloupce indexu.
+        """
+        if not self.model.schema.has_table(table):
+            return False
+        return all(col in self.model.schema.col_index(table) for col in columns)
+
+
+    def existing_index_columns(self, index_name):
+        """
+        Vrátí n-tici sloupců existujícího indexu nebo None, pokud index neexistuje.
+        """
+        info = self.conn.execute(f'PRAGMA index_info("{index_name}")').fetchall()
+        if not info:
+            return None
+        return tuple(row[2] for row in sorted(info))
+
+
+    def ensure_indexes(self):
+        """
+        Vytvoří chybějící indexy a znovu vytvoří indexy, jejichž sloupce neodpovídají definici.
+
+        :return: Seznam názvů vytvořených indexů.
+        """
+        created = []
+        for index_name, (table, columns) in self.index_definitions.items():
+            if not self.index_applicable(table, columns):
+                continue
+            existing_columns = self.existing_index_columns(index_name)
+            if existing_columns == columns:
+                continue
+            if existing_columns is not None:
+                self.conn.execute(f'DROP INDEX "{index_name}"')
+            columns_str = ', '.join(f'"{col}"' for col in columns)
+            self.conn.execute(f'CREATE INDEX "{index_name}" ON "{table}" ({columns_str})')
+            created.append(index_name)
+        self.conn.commit()
+        return created
+
+
+    def capture_plans(self):
+        """
+        Zjistí plány (EXPLAIN QUERY PLAN) sledovaných dotazů.
+
+        :return: Slovník název dotazu -> n-tice řádků plánu.
+        """
+        plans = {}
+        for name, (query, params) in self.plan_queries.items():
+            try:
+                rows = self.conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+            except Exception:
+                continue
+            plans[name] = tuple(row[-1] for row in rows)
+        return plans
+
+
+    def optimize(self):
+        """
+        Provede údržbu schématu - vytvoří a ověří indexy, aktualizuje statistiky a porovná plány dotazů.
+
+        :return: Slovník s klíči created (vytvořené indexy) a changed_plans
+                 (název dotazu -> (plán před, plán po)) pro dotazy se změněným plánem.
+        """
+        plans_before = self.capture_plans()
+        created = self.ensure_indexes()
+        if created:
+            self.conn.execute("ANALYZE")
+        else:
+            self.conn.execute("PRAGMA optimize")
+        self.conn.commit()
+        plans_after = self.capture_plans()
+        changed_plans = {name: (plans_before.get(name), plan) for name, plan in plans_after.items()
+                         if plans_before.get(name) != plan}
+        return {"created": created, "changed_plans": changed_plans}
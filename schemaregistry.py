@@ -0,0 +1,138 @@
+class SchemaRegistry:
+    """
+    Třída SchemaRegistry uchovává metadata tabulek databáze - názvy a typy sloupců, primární klíče
+    a slovníky název sloupce -> index. Metadata se načtou jednou při startu a znovu jen po změně schématu.
+    """
+    def __init__(self, conn):
+        """
+        Inicializace registru a načtení metadat všech tabulek.
+
+        :param conn: Připojení k databázi sqlite3.
+        """
+        self.conn = conn
+        self.tables = {}
+        self.schema_version = None
+        self.load()
+
+
+    def load(self):
+        """
+        Načte metadata všech tabulek databáze.
+        """
+        self.tables = {}
+        cursor = self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")
+        for (table,) in cursor.fetchall():
+            self.load_table(table)
+        self.schema_version = self.fetch_schema_version()
+
+
+    def load_table(self, table):
+        """
+        Načte metadata jedné tabulky pomocí PRAGMA table_info.
+
+        :param table: Název tabulky.
+        """
+        info = self.conn.execute(f'PRAGMA table_info("{table}")').fetchall()
+        if not info:
+            raise KeyError(f"Tabulka {table} v databázi neexistuje.")
+        col_names = tuple(row[1] for row in info)
+        self.tables[table] = {
+            "col_names": col_names,
+            "col_types": {row[1]: row[2] for row in info},
+            "primary_key": tuple(row[1] for row in sorted(info, key=lambda row: row[5]) if row[5]),
+            "col_index": {col: idx for idx, col in enumerate(col_names)},
+            "generated_columns": self.fetch_generated_columns(table),
+            }
+
+
+    def fetch_generated_columns(self, table):
+        """
+        Vrátí n-tici generovaných sloupců tabulky (PRAGMA table_info je nevrací, dotaz SELECT *
+        je vrací za běžnými sloupci).
+        """
+        try:
+            info = self.conn.execute(f'PRAGMA table_xinfo("{table}")').fetchall()
+        except Exception:
+            return ()
+        return tuple(row[1] for row in info if row[6] in (2, 3))
+
+
+    def fetch_schema_version(self):
+        """
+        Vrátí hodnotu PRAGMA schema_version, která se mění při každé změně schématu (i z jiného připojení).
+        """
+        return self.conn.execute("PRAGMA schema_version").fetchone()[0]
+
+
+    def refresh(self, table=None):
+        """
+        Znovu načte metadata po změně schématu (DDL).
+
+        :param table: Název změněné tabulky, pokud None, načtou se znovu všechny tabulky.
+        """
+        if table is None:
+            self.load()
+        else:
+            self.load_table(table)
+            self.schema_version = self.fetch_schema_version()
+
+
+    def table_meta(self, table):
+        """
+        Vrátí metadata tabulky. Pokud se schéma mezitím změnilo (např. jiná pracovní stanice přidala
+        sloupec), metadata se nejdříve znovu načtou.
+
+        :param table: Název tabulky.
+        :return: Slovník s klíči col_names, col_types, primary_key, col_index a generated_columns.
+        """
+        if self.fetch_schema_version() != self.schema_version:
+            self.load()
+        if table not in self.tables:
+            self.load_table(table)
+        return self.tables[table]
+
+
+    def has_table(self, table):
+        """
+        Vrátí True, pokud tabulka v databázi existuje.
+        """
+        try:
+            self.table_meta(table)
+        except KeyError:
+            return False
+        return True
+
+
+    def col_names(self, table):
+        """
+        Vrátí n-tici názvů sloupců tabulky.
+        """
+        return self.table_meta(table)["col_names"]
+
+
+    def col_types(self, table):
+        """
+        Vrátí slovník název sloupce -> deklarovaný typ sloupce.
+        """
+        return self.table_meta(table)["col_types"]
+
+
+    def primary_key(self, table):
+        """
+        Vrátí n-tici názvů sloupců primárního klíče tabulky.
+        """
+        return self.table_meta(table)["primary_key"]
+
+
+    def generated_columns(self, table):
+        """
+        Vrátí n-tici názvů generovaných sloupců tabulky.
+        """
+        return self.table_meta(table)["generated_columns"]
+
+
+    def col_index(self, table):
+        """
+        Vrátí slovník název sloupce -> index sloupce v řádku vráceném dotazem SELECT *.
+        """
+        return self.table_meta(table)["col_index"]
@@ -0,0 +1,229 @@
+import re
+import sqlite3
+
+from commonresources import CommonResources
+
+class SearchIndex:
+    """
+    Třída SearchIndex spravuje fulltextové indexy FTS5 pro vyhledávání v tabulkách. Indexy jsou
+    typu external content (texty se neukládají podruhé), udržují se triggery při každém zápisu
+    do tabulky a vyhledávají slova podle začátku (prefix) bez ohledu na velikost písmen a diakritiku.
+    Pokud SQLite FTS5 nepodporuje, vyhledávání zůstane u procházení všech sloupců řádků.
+    """
+    tokenizers = ("unicode61 remove_diacritics 2", "unicode61 remove_diacritics 1")
+
+    def __init__(self, model):
+        """
+        Inicializace správce fulltextových indexů.
+
+        :param model: Instance třídy Model s připojením k databázi a registrem schématu.
+        """
+        self.model = model
+        self.conn = model.conn
+        self.index_config = CommonResources.search_index_config
+        self.tokenizer = None
+        self.tables = {}
+
+
+    @staticmethod
+    def quote(name):
+        """
+        Vrátí název tabulky nebo sloupce v uvozovkách pro použití v SQL.
+        """
+        return '"' + str(name).replace('"', '""') + '"'
+
+
+    @staticmethod
+    def fts_table(table):
+        """
+        Vrátí název fulltextové tabulky pro danou tabulku.
+        """
+        return f"{table}_fts"
+
+
+    def detect_tokenizer(self):
+        """
+        Zjistí, zda SQLite podporuje FTS5, a vybere nejlepší dostupný tokenizer.
+
+        :return: Text tokenizeru nebo None, pokud FTS5 není k dispozici.
+        """
+        for tokenizer in self.tokenizers:
+            try:
+                self.conn.execute(f"CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x, tokenize='{tokenizer}')")
+                self.conn.execute("DROP TABLE temp.fts5_probe")
+                return tokenizer
+            except sqlite3.OperationalError:
+                continue
+        return None
+
+
+    def index_columns(self, table):
+        """
+        Vrátí n-tici sloupců tabulky pro fulltextový index - sloupce z konfigurace, které v tabulce existují.
+        """
+        col_index = self.model.schema.col_index(table)
+        return tuple(col for col in self.index_config[table]["columns"] if col in col_index)
+
+
+    def create_statements(self, table, id_col, columns):
+        """
+        Sestaví příkazy pro vytvoření fulltextové tabulky a triggerů, které ji udržují aktuální.
+
+        :return: Seznam SQL příkazů, první z nich vytváří fulltextovou tabulku.
+        """
+        fts = self.fts_table(table)
+        fts_cols = ", ".join(self.quote(col) for col in columns)
+        new_values = ", ".join(f"new.{self.quote(col)}" for col in columns)
+        old_values = ", ".join(f"old.{self.quote(col)}" for col in columns)
+        delete_old = (f"INSERT INTO {self.quote(fts)} ({self.quote(fts)}, rowid, {fts_cols}) "
+                      f"VALUES ('delete', old.{self.quote(id_col)}, {old_values});")
+        insert_new = (f"INSERT INTO {self.quote(fts)} (rowid, {fts_cols}) "
+                      f"VALUES (new.{self.quote(id_col)}, {new_values});")
+        return [
+            f"CREATE VIRTUAL TABLE {self.quote(fts)} USING fts5({fts_cols}, content={self.quote(table)}, "
+            f"content_rowid={self.quote(id_col)}, tokenize='{self.tokenizer}', prefix='2 3')",
+            f"CREATE TRIGGER {self.quote(fts + '_ai')} AFTER INSERT ON {self.quote(table)} BEGIN {insert_new} END",
+            f"CREATE TRIGGER {self.quote(fts + '_ad')} AFTER DELETE ON {self.quote(table)} BEGIN {delete_old} END",
+            f"CREATE TRIGGER {self.quote(fts + '_au')} AFTER UPDATE ON {self.quote(table)} BEGIN {delete_old} {insert_new} END",
+            ]
+
+
+    def ensure(self):
+        """
+        Vytvoří chybějící fulltextové indexy a znovu vytvoří indexy, jejichž definice neodpovídá
+        konfiguraci (jiné sloupce nebo tokenizer). Nové indexy se naplní z dat tabulky.
+
+        :return: Seznam tabulek, jejichž index byl vytvořen nebo přestavěn.
+        """
+        self.tokenizer = self.detect_tokenizer()
+        self.tables = {}
+        if self.tokenizer is None:
+            return []
+        rebuilt = []
+        for table, config in self.index_config.items():
+            if not self.model.schema.has_table(table):
+                continue
+            columns = self.index_columns(table)
+            if not columns:
+                continue
+            statements = self.create_statements(table, config["id_col"], columns)
+            fts = self.fts_table(table)
+            existing = self.conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+                                         (fts,)).fetchone()
+            if existing is None or existing[0] != statements[0]:
+                self.drop(table)
+                for statement in statements:
+                    self.conn.execute(statement)
+                self.conn.execute(f"INSERT INTO {self.quote(fts)} ({self.quote(fts)}) VALUES ('rebuild')")
+                rebuilt.append(table)
+            self.tables[table] = {"id_col": config["id_col"], "fts": fts}
+        self.conn.commit()
+        if rebuilt:
+            self.model.schema.load()
+        return rebuilt
+
+
+    def drop(self, table):
+        """
+        Smaže fulltextovou tabulku a triggery dané tabulky.
+        """
+        fts = self.fts_table(table)
+        for suffix in ("_ai", "_ad", "_au"):
+            self.conn.execute(f"DROP TRIGGER IF EXISTS {self.quote(fts + suffix)}")
+        self.conn.execute(f"DROP TABLE IF EXISTS {self.quote(fts)}")
+
+
+    @staticmethod
+    def match_phrases(text):
+        """
+        Převede hledaný text na výrazy FTS5 - každé slovo na frázi jeho tokenů, poslední token
+        fráze se hledá podle začátku (např. '2024-05' -> "2024 05"*).
+
+        :param text: Text zadaný do vyhledávání.
+        :return: Seznam výrazů pro MATCH, prázdný, pokud text neobsahuje žádné písmeno ani číslici.
+        """
+        phrases = []
+        for word in text.split():
+            tokens = re.findall(r"[^\W_]+", word)
+            if tokens:
+                phrases.append('"' + " ".join(tokens) + '"*')
+        return phrases
+
+
+    def can_search(self, table, text):
+        """
+        Vrátí True, pokud lze hledaný text vyhledat fulltextovým indexem tabulky.
+        """
+        return table in self.tables and bool(self.match_phrases(text))
+
+
+    def match_condition(self, table, text, col_names):
+        """
+        Sestaví podmínku WHERE pro vyhledání textu v řádcích pohledu tabulky. Každé slovo musí
+        být nalezeno v indexu tabulky nebo v indexu navázané tabulky (např. název dílu a dodavatel
+        u variant).
+
+        :param table: Název tabulky s fulltextovým indexem.
+        :param text: Text zadaný do vyhledávání.
+        :param col_names: Názvy sloupců výsledku dotazu pohledu.
+        :return: N-tice (text podmínky, seznam parametrů).
+        """
+        sources = [(self.tables[table]["id_col"], table)]
+        for col, related_table in self.index_config[table].get("related", {}).items():
+            if related_table in self.tables:
+                sources.append((col, related_table))
+        sources = [(col, source_table) for col, source_table in sources if col in col_names]
+        if not sources:
+            return "", []
+
+        phrases = self.match_phrases(text)
+        if len(sources) == 1:
+            col, source_table = sources[0]
+            return f"{self.quote(col)} IN ({self.match_ids_query(source_table)})", [" AND ".join(phrases)]
+
+        conditions = []
+        params = []
+        for phrase in phrases:
+            alternatives = []
+            for col, source_table in sources:
+                fts = self.quote(self.tables[source_table]["fts"])
+                alternatives.append(f"{self.quote(col)} IN (SELECT rowid FROM {fts} WHERE {fts} MATCH ?)")
+                params.append(phrase)
+            conditions.append("(" + " OR ".join(alternatives) + ")")
+        return " AND ".join(conditions), params
+
+
+    def match_ids_query(self, table):
+        """
+        Vrátí dotaz na id řádků tabulky nalezených ve fulltextovém indexu, parametrem je výraz MATCH.
+        """
+        fts = self.quote(self.tables[table]["fts"])
+        return f"SELECT rowid FROM {fts} WHERE {fts} MATCH ?"
+
+
+    def direct_match(self, table, text, col_names):
+        """
+        Pokud se text hledá jen v indexu samotné tabulky (bez navázaných tabulek), vrátí dotaz,
+        který vrací přímo id nalezených řádků, jinak None.
+
+        :return: N-tice (text dotazu, parametry) nebo None.
+        """
+        condition, params = self.match_condition(table, text, col_names)
+        id_col = self.tables[table]["id_col"]
+        if condition != f"{self.quote(id_col)} IN ({self.match_ids_query(table)})":
+            return None
+        return self.match_ids_query(table), tuple(params)
+
+
+    def rank_query(self, table, text):
+        """
+        Vrátí dotaz na id řádků tabulky nalezených ve fulltextovém indexu se skóre relevance bm25
+        (nižší skóre je relevantnější) pro seřazení výsledku vyhledávání.
+
+        :param table: Název tabulky s fulltextovým indexem.
+        :param text: Hledaný text.
+        :return: N-tice (text dotazu se sloupci rank_id a rank_score, parametry).
+        """
+        fts = self.quote(self.tables[table]["fts"])
+        return (f"SELECT rowid AS rank_id, bm25({fts}) AS rank_score FROM {fts} WHERE {fts} MATCH ?",
+                (" AND ".join(self.match_phrases(text)),))
@@ -0,0 +1,168 @@
+import sqlite3
+
+class StatementRegistry:
+    """
+    Třída StatementRegistry sestavuje texty SQL příkazů modelu (INSERT, UPDATE, SELECT podle ID,
+    MAX ID, upsert) jednou pro každý tvar (tabulka, sloupce) a uchovává je pro další volání.
+    Stejný text příkazu při každém volání zároveň zajistí, že sqlite3 použije již zkompilovaný
+    příkaz ze své cache (velikost nastavuje CommonResources.db_cached_statements).
+    Názvy tabulek a sloupců se při sestavení ověří proti registru metadat schématu, do generovaných
+    sloupců nelze zapisovat, lze je jen číst a použít v podmínce. Před sestavením příkazu se ověří
+    PRAGMA schema_version - po změně schématu (i z jiného připojení) se registr metadat načte znovu.
+    Sestavené příkazy se zahodí, kdykoli se registr metadat načte znovu (i při čtení metadat jinou
+    cestou). Již připravené příkazy po změně schématu znovu zkompiluje samo SQLite.
+    """
+    def __init__(self, schema):
+        """
+        Inicializace registru příkazů.
+
+        :param schema: Instance SchemaRegistry pro ověření názvů tabulek a sloupců.
+        """
+        self.schema = schema
+        self.statements = {}
+        self.schema_version = schema.schema_version
+
+
+    def get(self, key, build):
+        """
+        Vrátí text příkazu pro zadaný tvar, při prvním použití ho sestaví funkcí build.
+
+        :param key: N-tice popisující tvar příkazu (druh, tabulka, sloupce).
+        :param build: Funkce bez parametrů, která vrátí text příkazu.
+        """
+        sql = self.statements.get(key)
+        if sql is not None and self.schema.schema_version == self.schema_version:
+            return sql
+        schema_version = self.schema.fetch_schema_version()
+        if schema_version != self.schema.schema_version:
+            self.schema.load()
+        if self.schema.schema_version != self.schema_version:
+            self.statements = {}
+            self.schema_version = self.schema.schema_version
+        sql = self.statements[key] = build()
+        return sql
+
+
+    def validate(self, table, columns=(), written=()):
+        """
+        Ověří, že tabulka a sloupce existují ve schématu databáze.
+
+        :param columns: Čtené sloupce a sloupce podmínky, mohou být i generované.
+        :param written: Zapisované sloupce (INSERT, SET, cíl ON CONFLICT), nesmí být generované.
+        :raises sqlite3.OperationalError: Pokud tabulka nebo některý sloupec neexistuje nebo pokud
+                                          se má zapisovat do generovaného sloupce.
+        """
+        try:
+            col_index = self.schema.col_index(table)
+        except KeyError:
+            raise sqlite3.OperationalError(f"Tabulka {table} v databázi neexistuje.") from None
+        generated = self.schema.generated_columns(table)
+        unknown = [col for col in tuple(columns) + tuple(written) if col not in col_index and col not in generated]
+        if unknown:
+            raise sqlite3.OperationalError(f"Tabulka {table} nemá sloupce: {', '.join(unknown)}.")
+        read_only = [col for col in written if col in generated]
+        if read_only:
+            raise sqlite3.OperationalError(f"Do generovaných sloupců tabulky {table} nelze zapisovat: "
+                                           f"{', '.join(read_only)}.")
+
+
+    @staticmethod
+    def quote(columns):
+        """
+        Vrátí seznam sloupců v uvozovkách oddělených čárkou.
+        """
+        return ", ".join(f'"{col}"' for col in columns)
+
+
+    def insert(self, table, columns):
+        """
+        Vrátí příkaz INSERT do zadaných sloupců tabulky.
+        """
+        columns = tuple(columns)
+
+        def build():
+            self.validate(table, written=columns)
+            return f'INSERT INTO "{table}" ({self.quote(columns)}) VALUES ({", ".join("?" * len(columns))})'
+
+        return self.get(("insert", table, columns), build)
+
+
+    def update(self, table, id_col_name, columns):
+        """
+        Vrátí příkaz UPDATE zadaných sloupců řádku tabulky podle ID, parametry jsou hodnoty
+        sloupců a jako poslední ID řádku.
+        """
+        columns = tuple(columns)
+
+        def build():
+            self.validate(table, (id_col_name,), columns)
+            set_clause = ", ".join(f'"{col}" = ?' for col in columns)
+            return f'UPDATE "{table}" SET {set_clause} WHERE "{id_col_name}" = ?'
+
+        return self.get(("update", table, id_col_name, columns), build)
+
+
+    def upsert(self, table, id_col_name, columns, update_columns):
+        """
+        Vrátí příkaz INSERT ... ON CONFLICT, který u existujícího ID aktualizuje sloupce update_columns
+        (nebo řádek vynechá, pokud update_columns je prázdný).
+        """
+        columns, update_columns = tuple(columns), tuple(update_columns)
+
+        def build():
+            self.validate(table, written=(id_col_name,) + columns + update_columns)
+            if update_columns:
+                set_clause = ", ".join(f'"{col}" = excluded."{col}"' for col in update_columns)
+                conflict = f'ON CONFLICT("{id_col_name}") DO UPDATE SET {set_clause}'
+            else:
+                conflict = f'ON CONFLICT("{id_col_name}") DO NOTHING'
+            return (f'INSERT INTO "{table}" ({self.quote(columns)}) '
+                    f'VALUES ({", ".join("?" * len(columns))}) {conflict}')
+
+        return self.get(("upsert", table, id_col_name, columns, update_columns), build)
+
+
+    def select_by_id(self, table, id_col_name):
+        """
+        Vrátí příkaz SELECT všech běžných sloupců tabulky (bez generovaných) pro řádek podle ID.
+        """
+        def build():
+            self.validate(table, (id_col_name,))
+            return f'SELECT {self.quote(self.schema.col_names(table))} FROM "{table}" WHERE "{id_col_name}" = ?'
+
+        return self.get(("select_by_id", table, id_col_name), build)
+
+
+    def select_columns(self, table, columns):
+        """
+        Vrátí příkaz SELECT zadaných sloupců všech řádků tabulky.
+        """
+        columns = tuple(columns)
+
+        def build():
+            self.validate(table, columns)
+            return f'SELECT {self.quote(columns)} FROM "{table}"'
+
+        return self.get(("select_columns", table, columns), build)
+
+
+    def max_id(self, table, id_col_name):
+        """
+        Vrátí příkaz SELECT MAX sloupce s ID tabulky.
+        """
+        def build():
+            self.validate(table, (id_col_name,))
+            return f'SELECT MAX("{id_col_name}") FROM "{table}"'
+
+        return self.get(("max_id", table, id_col_name), build)
+
+
+    def exists_variant(self, table):
+        """
+        Vrátí příkaz, který ověří existenci varianty podle id_sklad a id_dodavatele.
+        """
+        def build():
+            self.validate(table, ("id_sklad", "id_dodavatele"))
+            return f'SELECT EXISTS(SELECT 1 FROM "{table}" WHERE id_sklad = ? AND id_dodavatele = ?)'
+
+        return self.get(("exists_variant", table), build)
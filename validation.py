@@ -0,0 +1,54 @@
+import unicodedata
+
+from commonresources import CommonResources
+
+def normalize_code(value):
+    """
+    Normalizuje zkratku (např. zkratku zařízení) - odstraní diakritiku, převede na velká písmena
+    a mezery nahradí podtržítkem.
+
+    :param value: Zadaná zkratka.
+    :return: Normalizovaná zkratka.
+    """
+    normalized = unicodedata.normalize('NFKD', value).encode('ASCII', 'ignore').decode('ASCII')
+    return normalized.upper().replace(" ", "_")
+
+
+def check_item(rules, values):
+    """
+    Kontrola zadání povinných dat a správnosti dat položky před uložením.
+    Stejná pravidla používá formulář ItemFrameBase i hromadný import z csv.
+
+    :param rules: Slovník pravidel položky (mandatory, not_neg_integer, pos_real, not_neg_real, code).
+    :param values: Slovník hodnot položky jako řetězců.
+    :return: None, pokud jsou data v pořádku, jinak n-tice (název chybné položky, text varování).
+    """
+    tab2hum = CommonResources.tab2hum
+    for col in rules.get("mandatory", []):
+        if not values.get(col):
+            return col, f"Před uložením nejdříve zadejte položku {tab2hum.get(col, col)}"
+
+    for col in rules.get("not_neg_integer", []):
+        entry_val = values.get(col, "")
+        if not entry_val.isdigit() or int(entry_val) < 0:
+            return col, f"Položka {tab2hum.get(col, col)} musí být celé nezáporné číslo."
+
+    pos_real = rules.get("pos_real", ())
+    not_neg_real = rules.get("not_neg_real", ())
+    for col in set(pos_real).union(not_neg_real):
+        entry_val = values.get(col, "")
+        if entry_val:
+            try:
+                float_entry_val = float(entry_val)
+            except ValueError:
+                return col, f"Položka {tab2hum.get(col, col)} není platné reálné číslo s desetinnou tečkou."
+            if col in pos_real and float_entry_val <= 0:
+                return col, f"Položka {tab2hum.get(col, col)} musí být kladné reálné číslo s desetinnou tečkou."
+            if col in not_neg_real and float_entry_val < 0:
+                return col, f"Položka {tab2hum.get(col, col)} musí být nezáporné reálné číslo s desetinnou tečkou."
+
+    for col, max_length in rules.get("code", {}).items():
+        final_val = normalize_code(values.get(col, ""))
+        if len(final_val) > max_length:
+            return col, f"Zkratka {tab2hum.get(col, col)} po normalizaci:\n{final_val}\n je delší než {max_length} znaků."
+    return None
@@ -8,6 +8,7 @@ import unicodedata
 import hashlib
 
 from commonresources import CommonResources
+from operationdate import OperationDateIndex
 from itemframe import *
 
 class View:
@@ -24,27 +25,27 @@ class View:
         self.root = root
         self.controller = controller
         self.col_names = col_names
+        self.col_index = {col: idx for idx, col in enumerate(col_names)}
         self.current_table = current_table
         self.current_user = self.controller.current_user
         self.name_of_user = self.controller.name_of_user
         self.current_role = self.controller.current_role
         self.sort_reverse = True
+        self.sort_picked = False
         self.item_frame_show = None         
         self.tab2hum = CommonResources.tab2hum
         self.suppliers_dict = self.controller.fetch_dict("dodavatele")
-        self.suppliers = tuple(sorted(self.suppliers_dict.keys()))
+        self.suppliers = self.controller.fetch_sorted_names("dodavatele")
         self.item_names_dict = self.controller.fetch_dict("sklad")
-        self.item_names = tuple(sorted(self.item_names_dict.keys()))
+        self.item_names = self.controller.fetch_sorted_names("sklad")
         self.selected_option = "VŠE"
         self.selected_supplier = "VŠE"
         self.selected_item_name = "VŠE"
         self.start_date = None
+        self.end_date = None
         self.context_menu_list = []         
         self.curr_table_config = CommonResources.view_table_config.get(self.current_table, {})
-        if self.current_table == "sklad":
-            devices = tuple(self.controller.fetch_dict("zarizeni").keys())
-            self.curr_table_config['check_columns'] = self.curr_table_config['check_columns'] + devices
-            self.curr_table_config['hidden_columns'] = self.curr_table_config['hidden_columns'] + devices
+        self.devices = self.controller.fetch_sorted_names("zarizeni") if self.current_table == "sklad" else ()
         self.mnozstvi_col = self.curr_table_config.get("quantity_col", [])
         self.check_columns = self.curr_table_config.get("check_columns", [])
         self.hidden_columns = self.curr_table_config.get("hidden_columns", [])
@@ -52,10 +53,24 @@ class View:
         self.col_params_dict = self.curr_table_config.get('col_params_dict', {})
         self.default_params = self.curr_table_config.get('default_params', {"width": 80, "anchor": "center"})
         self.hidden_params = self.curr_table_config.get('hidden_params', {"width": 0, "minwidth": 0, "stretch": tk.NO})
-        self.filter_columns = {col: tk.BooleanVar(value=False) for col in self.check_columns}
+        self.filter_columns = {col: tk.BooleanVar(value=False) for col in tuple(self.check_columns) + tuple(self.devices)}
         self.id_col = 0
         self.click_col = 0
         self.id_col_name = self.curr_table_config.get("id_col_name", 'id')            
+        self.query = None
+        self.displayed_data = []
+        self.total_count = 0
+        self.rendered_rows = {}
+        self.rendered_count = 0
+        self.render_chunk_size = 200
+        self.page_size = 1000
+        self.render_pending = False
+        self.loading_label = None
+        self.result_ids = []
+        self.last_search = None
+        self.requested_search_text = None
+        self.search_after_id = None
+        self.search_debounce_ms = 40
 
 
     def customize_ui(self):
@@ -90,7 +105,9 @@ class View:
                                          "separator",
                                          ("Smazat skladovou položku", self.delete_row),],
                     "Příjem/Výdej": [("Příjem zboží", lambda: self.item_movements(action='prijem')),
-                                     ("Výdej zboží", lambda: self.item_movements(action='vydej')),],
+                                     ("Výdej zboží", lambda: self.item_movements(action='vydej')),
+                                     "separator",
+                                     ("Hromadné pohyby z csv", self.controller.import_movements_csv),],
                     "Varianty": [("Přidat variantu", self.add_variant),],
                     },
                 "context_menu_list": [
@@ -174,12 +191,18 @@ class View:
         
         common_menus = {
             "Soubor": [
-                (f"Export databáze {self.current_table} do csv", lambda: self.controller.export_csv(table=self.current_table)),
-                ("Export aktuálně vyfiltrovaných dat do csv", lambda: self.controller.export_csv(tree=self.tree)),
+                (f"Export databáze {self.current_table} do csv / xlsx / parquet", lambda: self.controller.export_csv(table=self.current_table)),
+                ("Export aktuálně vyfiltrovaných dat do csv / xlsx / parquet", lambda: self.controller.export_csv(tree=self.tree,
+                                                                                                                  query=self.query)),
                 "separator",
                 ("Konec", self.root.destroy)
             ],
         }
+        if self.current_table in CommonResources.import_tables:
+            common_menus["Soubor"].insert(2, (f"Import dat do tabulky {self.current_table} z csv",
+                                              lambda: self.controller.import_csv(self.current_table)))
+        if self.current_role == "admin":
+            common_menus["Nástroje"] = self.tools_menu()
         common_radiobutton_menus = CommonResources.common_radiobutton_menus
         
         self.update_menu(common_menus)
@@ -188,6 +211,18 @@ class View:
         self.update_radiobuttons_menu(common_radiobutton_menus, self.view_var)
 
 
+    def tools_menu(self):
+        """
+        Vrátí položky menu Nástroje pro administrátora - zapnutí měření výkonu, uložení reportu,
+        log pomalých dotazů, výsledek údržby indexů a jednorázový převod sloupců zařízení na vazby.
+        """
+        return [("Zapnout / vypnout měření výkonu", self.controller.toggle_profiling),
+                ("Uložit report měření výkonu", self.controller.save_profiling_report),
+                ("Log pomalých dotazů", self.controller.show_query_log),
+                ("Údržba indexů a plány dotazů", self.controller.show_schema_report),
+                ("Dokončit převod zařízení", self.controller.finish_device_migration),]
+
+
     def on_view_change(self):
         """
         Přepnutí pohledu na tabulku v menu pomocí radiobuttonů.
@@ -202,6 +237,7 @@ class View:
         """
         self.frame = tk.Frame(self.root)
         self.frame.pack(fill=tk.BOTH, expand=True)
+        self.frame.bind("<Destroy>", self.cancel_live_search)
         self.top_frames_container = tk.Frame(self.frame)
         self.top_frames_container.pack(side=tk.TOP, fill=tk.X, expand=False)
         self.search_frame = tk.LabelFrame(self.top_frames_container, text="Vyhledávání",
@@ -229,9 +265,12 @@ class View:
         self.search_entry.bind('<Return>', lambda _: self.controller.show_data(self.current_table))
         self.search_entry.bind('<KP_Enter>', lambda _: self.controller.show_data(self.current_table))
         self.search_entry.bind("<Escape>", lambda _: self.search_entry.delete(0, tk.END))
+        self.search_entry.bind("<KeyRelease>", self.on_search_key_release)
         self.search_button = tk.Button(self.search_frame, text="Filtrovat",
                                        command=lambda: self.controller.show_data(self.current_table))
         self.search_button.pack(side=tk.LEFT, padx=5)
+        self.loading_label = tk.Label(self.search_frame, text="", width=12, anchor="w")
+        self.loading_label.pack(side=tk.LEFT, padx=2)
 
 
     def initialize_logged_user_label(self):
@@ -268,7 +307,7 @@ class View:
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
         self.scrollbar = ttk.Scrollbar(self.tree_frame, orient="vertical", command=self.tree.yview)
-        self.tree.configure(yscrollcommand=self.scrollbar.set)
+        self.tree.configure(yscrollcommand=self.on_tree_scroll)
         self.scrollbar.pack(side=tk.RIGHT, fill="y")
 
         self.tree.tag_configure('evenrow', background='#FFFFFF')
@@ -394,8 +433,9 @@ class View:
         """
         Vymaže všechny položky v Treeview.
         """
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        self.tree.delete(*self.tree.get_children())
+        self.rendered_rows = {}
+        self.rendered_count = 0
 
 
     def on_right_click(self, event):
@@ -421,40 +461,271 @@ class View:
             self.hide_context_menu()
 
 
-    def add_data(self, current_data, current_id_num=None):
+    def load_data(self, current_id_num=None):
+        """
+        Načtení vyfiltrovaných a seřazených dat aktuální tabulky. Filtrace a třídění se provádí
+        v SQL dotazu sestaveném z aktuálních hodnot filtrů. Z databáze se načte seřazený seznam
+        id všech vyfiltrovaných řádků a řádky jen první stránky (případně až po označovanou
+        položku), další stránky se dočítají podle id při scrollování.
+        Pokud nový hledaný text jen rozšiřuje předchozí a ostatní filtry i třídění jsou stejné,
+        zpřesní se předchozí výsledek bez nového třídění.
+        Dotazy běží v pracovním vlákně, nové načtení zruší předchozí nedokončené.
+
+        :param current_id_num: id číslo aktuální položky k označení, pokud None, tak se označí první.
+        """
+        try:
+            query = self.build_query()
+        except ValueError as e:
+            messagebox.showwarning("Upozornění", str(e))
+            return
+        self.query = query
+        search_text = self.search_entry.get()
+        self.requested_search_text = search_text
+        filter_state = self.filter_state()
+        previous = self.last_search
+        refine = (previous is not None and current_id_num is None and previous["filter_state"] == filter_state
+                  and previous["search_mode"] == query.search_mode and previous["text"]
+                  and search_text != previous["text"] and search_text.startswith(previous["text"]))
+        previous_ids = previous["ids"] if refine else None
+        previous_data_version = previous["data_version"] if refine else None
+        rows_to_load = max(self.rendered_count, self.page_size)
+        chunk_size = self.render_chunk_size
+
+        def fetch(model):
+            data_version = model.fetch_data_version()
+            if previous_ids is not None and data_version == previous_data_version:
+                ids = model.fetch_refined_ids(query, previous_ids)
+            else:
+                ids = model.fetch_query_ids(query)
+            limit = rows_to_load
+            if current_id_num and current_id_num in ids:
+                limit = max(limit, ids.index(current_id_num) + chunk_size)
+            return model.fetch_rows_by_ids(query, ids[:limit]), ids, data_version
+
+        def on_loaded(result):
+            data, ids, data_version = result
+            if query is not self.query:
+                return
+            self.last_search = {"text": search_text, "filter_state": filter_state, "search_mode": query.search_mode,
+                                "ids": ids, "data_version": data_version}
+            self.on_data_loaded(query, (data, ids), current_id_num)
+
+        self.controller.cancel_async("page")
+        self.render_pending = False
+        self.show_loading(True)
+        self.controller.run_async("view", fetch, on_loaded, self.on_load_error)
+
+
+    def on_data_loaded(self, query, result, current_id_num=None):
+        """
+        Zobrazení dat načtených v pracovním vlákně, pokud patří k aktuálnímu dotazu pohledu.
+
+        :param query: Dotaz, pro který byla data načtena.
+        :param result: N-tice (načtené řádky, seřazený seznam id všech vyfiltrovaných řádků).
+        :param current_id_num: id číslo aktuální položky k označení.
+        """
+        if query is not self.query or not self.tree.winfo_exists():
+            return
+        self.show_loading(False)
+        data, self.result_ids = result
+        self.add_data(data, current_id_num=current_id_num, total_count=len(self.result_ids))
+
+
+    def filter_state(self):
+        """
+        Vrátí n-tici hodnot všech filtrů kromě hledaného textu a nastavení třídění pro porovnání,
+        zda lze zpřesnit předchozí výsledek vyhledávání.
+        """
+        checked_cols = tuple(col for col, is_filtered_var in self.filter_columns.items() if is_filtered_var.get())
+        return (self.current_table, self.selected_option, self.selected_supplier, self.selected_item_name,
+                self.start_date, self.end_date, checked_cols, self.click_col, self.sort_reverse, self.sort_picked)
+
+
+    def on_search_key_release(self, event=None):
+        """
+        Obsluha psaní do políčka vyhledávání - vyhledávání se spustí až po krátké pauze
+        v psaní (debounce), dřívější naplánované vyhledávání se zruší.
+        """
+        if self.search_after_id is not None:
+            self.root.after_cancel(self.search_after_id)
+        self.search_after_id = self.root.after(self.search_debounce_ms, self.run_live_search)
+
+
+    def cancel_live_search(self, event=None):
+        """
+        Zrušení naplánovaného vyhledávání při zrušení pohledu (přepnutí tabulky).
+        """
+        if self.search_after_id is not None:
+            self.root.after_cancel(self.search_after_id)
+            self.search_after_id = None
+
+
+    def run_live_search(self):
+        """
+        Spuštění vyhledávání po pauze v psaní, pokud se hledaný text od posledního načtení změnil
+        a pohled mezitím nebyl zrušen.
+        """
+        self.search_after_id = None
+        if not self.search_entry.winfo_exists():
+            return
+        if self.requested_search_text == self.search_entry.get():
+            return
+        self.load_data()
+
+
+    def on_load_error(self, error):
         """
-        Vymazání všech dat v Treeview. Filtrace a třídění dle aktuálních hodnot parametrů.
-        Vložení dat do TreeView. Změna hodnot v check_colums z 0/1 na NE/ANO pro zobrazení.
+        Zobrazení chyby při načítání dat v pracovním vlákně. Po chybě při načítání další stránky
+        se posouváním seznamu může načítání zkusit znovu.
+        """
+        self.render_pending = False
+        self.show_loading(False)
+        messagebox.showwarning("Varování", f"Nepodařilo se načíst data z databáze: {error}")
+
+
+    def show_loading(self, loading):
+        """
+        Zobrazení nebo skrytí indikátoru načítání dat.
+
+        :param loading: True, pokud se data načítají.
+        """
+        if self.loading_label is not None and self.loading_label.winfo_exists():
+            self.loading_label.config(text="Načítání..." if loading else "")
+
+
+    def add_data(self, current_data, current_id_num=None, total_count=None):
+        """
+        Porovnání nových (již vyfiltrovaných a seřazených) dat s řádky v Treeview.
+        Podle id řádku (row[0]) se v Treeview vloží jen nové řádky, vymažou chybějící, aktualizují
+        změněné a přeřadí se pořadí. Vkládá se pouze okno řádků, další se dočítají při scrollování.
         Zvýraznění řádků pod minimem. Označení první položky v Treeview.
-        Třídění podle zakliknuté hlavičky sloupce, při druhém kliknutí na stejný sloupec reverzně.
 
-        :param current_data: aktuální data získaná z aktuální tabulky.
+        :param current_data: načtené řádky aktuální tabulky.
         :param current_id_num: id číslo aktuální položky k označení, pokud None, tak se označí první.        
+        :param total_count: celkový počet vyfiltrovaných řádků, pokud None, jsou načteny všechny.
         """          
-        self.delete_tree()
-
-        if self.current_table == "item_variants":
-            sorted_data = current_data
-        else:
-            filtered_data = self.filter_data(current_data)
-            sorted_data = sorted(filtered_data, key=self.sort_key, reverse=self.sort_reverse)
-        
-        treeview_item_ids = {}
-        for idx, row in enumerate(sorted_data):      
-            treeview_item_id = self.tree.insert('', tk.END, values=row)
-            treeview_item_ids[row[0]] = treeview_item_id
-            stripe_tag = 'evenrow' if idx % 2 == 0 else 'oddrow'
-            if self.current_table in ('sklad', 'varianty') and int(row[-1])==1:
-                self.tree.item(treeview_item_id, tags=(stripe_tag, 'low_stock',))
-            else: 
-                self.tree.item(treeview_item_id, tags=(stripe_tag,))
-
-        if current_id_num and current_id_num in treeview_item_ids:
-            choosen_item = treeview_item_ids[current_id_num]
-            self.mark_first_or_choosen_item(item=choosen_item)
+        self.displayed_data = list(current_data)
+        self.total_count = len(self.displayed_data) if total_count is None else total_count
+
+        choosen_idx = None
+        if current_id_num:
+            choosen_idx = next((idx for idx, row in enumerate(self.displayed_data) if row[0] == current_id_num), None)
+        rows_to_render = max(self.rendered_count, self.render_chunk_size)
+        if choosen_idx is not None:
+            rows_to_render = max(rows_to_render, choosen_idx + self.render_chunk_size)
+        self.reconcile_rows(self.displayed_data[:rows_to_render])
+
+        if choosen_idx is not None:
+            self.mark_first_or_choosen_item(item=str(current_id_num))
         else:
             self.mark_first_or_choosen_item(item=None)
-            
+
+
+    def row_tags(self, idx, row):
+        """
+        Vrátí tagy řádku Treeview - střídání barev řádků a zvýraznění řádků pod minimem.
+
+        :param idx: pořadí řádku v Treeview.
+        :param row: hodnoty řádku.
+        """
+        stripe_tag = 'evenrow' if idx % 2 == 0 else 'oddrow'
+        if self.current_table in ('sklad', 'varianty') and int(row[-1])==1:
+            return (stripe_tag, 'low_stock',)
+        return (stripe_tag,)
+
+
+    def reconcile_rows(self, window_rows):
+        """
+        Porovná řádky okna s řádky vloženými v Treeview podle id řádku (row[0]) a provede
+        jen nutné změny - smazání, vložení, aktualizaci hodnot nebo tagů a přeřazení.
+
+        :param window_rows: seřazené řádky, které mají být v Treeview vloženy.
+        """
+        new_ids = {row[0] for row in window_rows}
+        removed = [str(row_id) for row_id in self.rendered_rows if row_id not in new_ids]
+        if removed:
+            self.tree.delete(*removed)
+
+        new_rendered_rows = {}
+        for idx, row in enumerate(window_rows):
+            row_id = row[0]
+            tags = self.row_tags(idx, row)
+            rendered = self.rendered_rows.get(row_id)
+            if rendered is None:
+                self.tree.insert('', tk.END, iid=str(row_id), values=row, tags=tags)
+            elif rendered[0] != row:
+                self.tree.item(str(row_id), values=row, tags=tags)
+            elif rendered[1] != tags:
+                self.tree.item(str(row_id), tags=tags)
+            new_rendered_rows[row_id] = (row, tags)
+
+        new_order = tuple(str(row[0]) for row in window_rows)
+        if self.tree.get_children() != new_order:
+            self.tree.set_children('', *new_order)
+        self.rendered_rows = new_rendered_rows
+        self.rendered_count = len(window_rows)
+
+
+    def render_rows(self, stop):
+        """
+        Vloží na konec Treeview další řádky z self.displayed_data až po index stop.
+
+        :param stop: index (bez započtení), po který se mají řádky vložit.
+        """
+        stop = min(stop, len(self.displayed_data))
+        for idx in range(self.rendered_count, stop):
+            row = self.displayed_data[idx]
+            tags = self.row_tags(idx, row)
+            self.tree.insert('', tk.END, iid=str(row[0]), values=row, tags=tags)
+            self.rendered_rows[row[0]] = (row, tags)
+        self.rendered_count = max(self.rendered_count, stop)
+
+
+    def on_tree_scroll(self, first, last):
+        """
+        Obsluha yscrollcommand Treeview. Nastaví scrollbar a pokud se zobrazení blíží
+        ke konci vložených řádků, naplánuje dočtení dalšího okna řádků.
+
+        :param first, last: relativní pozice začátku a konce viditelné části Treeview.
+        """
+        self.scrollbar.set(first, last)
+        if float(last) > 0.9 and self.rendered_count < self.total_count and not self.render_pending:
+            self.render_pending = True
+            self.tree.after_idle(self.render_next_chunk)
+
+
+    def render_next_chunk(self):
+        """
+        Vloží do Treeview další okno řádků, pokud nejsou načtené, dočte z databáze další stránku.
+        """
+        stop = self.rendered_count + self.render_chunk_size
+        if stop > len(self.displayed_data) and len(self.displayed_data) < self.total_count and self.query:
+            query = self.query
+            offset = len(self.displayed_data)
+            page_ids = self.result_ids[offset:offset + self.page_size]
+            self.show_loading(True)
+            self.controller.run_async("page", lambda model: model.fetch_rows_by_ids(query, page_ids),
+                                      lambda rows: self.on_page_loaded(query, offset, rows), self.on_load_error)
+            return
+        self.render_pending = False
+        self.render_rows(stop)
+
+
+    def on_page_loaded(self, query, offset, rows):
+        """
+        Připojení další stránky řádků načtené v pracovním vlákně a vložení dalšího okna řádků.
+
+        :param query: Dotaz, pro který byla stránka načtena.
+        :param offset: Počet řádků před načtenou stránkou.
+        :param rows: Načtené řádky stránky.
+        """
+        if query is not self.query or offset != len(self.displayed_data) or not self.tree.winfo_exists():
+            return
+        self.show_loading(False)
+        self.displayed_data.extend(rows)
+        self.render_pending = False
+        self.render_rows(self.rendered_count + self.render_chunk_size)
+
 
     def mark_first_or_choosen_item(self, item):
         """
@@ -470,50 +741,49 @@ class View:
         self.tree.focus(item)           
         
 
-    def filter_data(self, data):
+    def build_query(self):
         """
-        Vyfiltrování dat podle zadaných dat v search_entry ve všech tabulkách.
-        V tabulce sklad navíc dle zaškrtnutých check buttonů a low stock filtru.
-        V tabulce audit_log navíc dle comboboxu typ akce a v rozmezí datumů v date entry.
-        V tabulce varianty dle comboboxu dodavatelé.
+        Sestavení SQL dotazu podle zadaných dat v search_entry ve všech tabulkách.
+        V tabulce sklad navíc dle zaškrtnutých check buttonů, zařízení přes vazební tabulku sklad_zarizeni.
+        V tabulce audit_log navíc dle comboboxu typ akce a v rozmezí datumů z comboboxu měsíců
+        (výraz s datem operace s indexem), pro měsíce archivovaných roků se čtou i archivy.
+        V tabulce varianty dle comboboxů dodavatelé a názvy dílů.
+        Třídění podle zakliknuté hlavičky sloupce, při druhém kliknutí na stejný sloupec reverzně.
+        Při fulltextovém vyhledávání, dokud uživatel nezvolí sloupec pro třídění, podle relevance.
 
-        :param data: Data pro filtraci dle search entry.
-        :return: Přefiltrovaná data.
+        :return: Instance QueryBuilder s filtry a tříděním aktuálního pohledu.
         """ 
-        search_query = self.search_entry.get()
-        if search_query:
-            filtered_data = [row for row in data if search_query.lower() in " ".join(map(str, row)).lower()]
-        else:
-            filtered_data = data
-    
+        date_range = (self.start_date, self.end_date) if self.start_date else None
+        query = self.controller.create_query(self.current_table, date_range)
+        query.search(self.search_entry.get())
+
         if self.current_table == "audit_log":
             if self.selected_option != "VŠE":
-                filtered_data = [row for row in filtered_data if row[9] == self.selected_option]
+                query.equals("Typ_operace", self.selected_option)
 
         if self.current_table == "varianty":
             if self.selected_supplier != "VŠE":
-                filtered_data = [row for row in filtered_data if row[-2] == self.selected_supplier]
+                query.equals("Dodavatel", self.selected_supplier)
             if self.selected_item_name != "VŠE":
-                filtered_data = [row for row in filtered_data if row[-3] == self.selected_item_name]                
+                query.equals("Nazev_dilu", self.selected_item_name)
 
-        if self.start_date:       
-            filtered_data = [row for row in filtered_data if self.start_date <= (row[13] or row[14]) <= self.end_date]
-            
-        if any(value.get() for value in self.filter_columns.values()):          
-            filtered_data_temp = []
-            for row in filtered_data:
-                include_row = True
-                for col, is_filtered_var in self.filter_columns.items():
-                    if is_filtered_var.get(): 
-                        col_index = self.col_names.index(col)  
-                        if row[col_index] != 1: 
-                            include_row = False  
-                            break
-                if include_row:
-                    filtered_data_temp.append(row)
-            filtered_data = filtered_data_temp
-
-        return filtered_data
+        if self.start_date:
+            if all(col in query.col_names for col in OperationDateIndex.source_cols):
+                query.expression_range(OperationDateIndex.expression, OperationDateIndex.source_cols,
+                                       self.start_date, self.end_date)
+            else:
+                query.date_range(self.start_date, self.end_date, ("Datum_nakupu", "Datum_vydeje"))
+
+        checked_cols = [col for col, is_filtered_var in self.filter_columns.items() if is_filtered_var.get()]
+        query.flags([col for col in checked_cols if col not in self.devices])
+        device_ids = self.controller.fetch_dict("zarizeni") if self.devices else {}
+        for col in checked_cols:
+            if col in self.devices and col in device_ids:
+                query.linked(self.id_col_name, "sklad_zarizeni", "id_sklad", "id_zarizeni", device_ids[col])
+        query.order_by(self.col_names[self.click_col], self.sort_reverse)
+        if not self.sort_picked:
+            query.order_by_rank()
+        return query
 
 
     def toggle_filter(self, selected_col):
@@ -545,6 +815,7 @@ class View:
         
         :param clicked_col: název sloupce, na který bylo kliknuto.
         """
+        self.sort_picked = True
         if clicked_col == self.click_col:
             self.sort_reverse = not self.sort_reverse
         else:
@@ -553,23 +824,6 @@ class View:
         self.controller.show_data(self.current_table, self.id_num)
 
         
-    def sort_key(self, row):
-        """
-        Funkce sloužící jako klíč pro třídění dle sloupcu.
-        Pokusí se převést hodnotu na float pro řazení číselných hodnot.
-        Čísla mají přednost, takže pro ně vracíme (0, number).
-        Textové hodnoty dostanou nižší prioritu, vracíme (1, value.lower()).
-
-        :param row: porovnávaný řádek / položka v datatabázi.
-        """
-        value = row[self.click_col]
-        try:
-            number = float(value)
-            return (0, number)
-        except ValueError:
-            return (1, value.lower())
-
-        
     def widget_destroy(self):
         """
         Metoda na vymazání všechn dat z item_frame.
@@ -683,7 +937,7 @@ class View:
         self.item_frame_inquiry = ItemFrameInquiry(self.item_frame, self.controller, self.col_names,
                                              self.current_table, self.check_columns, action, self)     
 
-        self.item_frame_inquiry.create_inquiry_form(self.tree, selected_supplier)
+        self.item_frame_inquiry.create_inquiry_form(self.controller.fetch_query_ids(self.query), selected_supplier)
    
 
     def delete_row(self):
@@ -703,6 +957,8 @@ class View:
         if response: 
             success = self.controller.delete_row(self.id_num)
             self.tree.delete(self.selected_item)
+            self.rendered_rows.pop(self.id_num, None)
+            self.rendered_count = len(self.rendered_rows)
             self.mark_first_or_choosen_item(item=None)
             if success:
                 messagebox.showinfo("Informace", "Vymazána poslední zadaná položka!")
@@ -908,6 +1164,17 @@ class AuditLogView(View):
         self.customize_ui()
 
 
+    def initialize_menus_dict(self):
+        """
+        Slovníky pro specifická menu a kontextové menu audit logu, archivace jen pro administrátora.
+        """
+        super().initialize_menus_dict()
+        if self.current_role == "admin":
+            self.specialized_menu_list = {
+                "Audit log": [("Archivovat uzavřené roky", self.controller.archive_audit_log),],
+                }
+
+
     def additional_gui_elements(self):
         """
         Vytvoření zbývajících specifických prvků gui dle typu zobrazovaných dat.
@@ -927,16 +1194,18 @@ class AuditLogView(View):
         
 
         self.generate_months_list()
-        self.month_entry_combobox = ttk.Combobox(self.filter_buttons_frame, width=12,
-                                                 values=["VŠE"]+self.months_list, state="readonly")
+        self.month_entry_combobox = ttk.Combobox(self.filter_buttons_frame, width=22,
+                                                 values=["VŠE"]+self.range_options+self.months_list, state="readonly")
         self.month_entry_combobox.pack(side=tk.LEFT, padx=5, pady=5)
         self.month_entry_combobox.set("VŠE")
+        self.date_range_label = "VŠE"
         self.month_entry_combobox.bind("<<ComboboxSelected>>", self.on_combobox_date_change)
 
 
     def generate_months_list(self):
         """
-        Generuje seznam měsíců od ledna 2024 do aktuálního měsíce a roku ve formátu MM-YYYY.
+        Generuje seznam měsíců od ledna 2024 (nebo prvního archivovaného roku) do aktuálního měsíce
+        a roku ve formátu MM-YYYY.
         Výsledkem je seznam řetězců, kde každý řetězec reprezentuje jeden měsíc v požadovaném formátu.
         Aktuální měsíc a rok je vypočítán z aktuálního systémového času a je také zahrnut ve výsledném seznamu.
         Seznam je vhodný pro použití v uživatelském rozhraní jako hodnoty pro výběrový seznam (např. Combobox),
@@ -945,23 +1214,81 @@ class AuditLogView(View):
         current_year = datetime.now().year
         current_month = datetime.now().month
         self.months_list = []
+        first_year = min([2024] + self.controller.fetch_audit_archive_years())
 
-        for year in range(2024, current_year + 1):
+        for year in range(first_year, current_year + 1):
             for month in range(1, 13):
                 if year == current_year and month > current_month:
                     break
                 self.months_list.append(f"{month:02d}-{year}")
         self.months_list.reverse() 
+        self.range_options = ["Posledních 7 dní", "Posledních 30 dní", "Aktuální rok", "Minulý rok",
+                              "Vlastní rozmezí..."]
+
+
+    def preset_date_range(self, option):
+        """
+        Vrátí rozmezí datumů pro předvolbu z comboboxu měsíců.
+
+        :param option: Text předvolby.
+        :return: N-tice (počáteční, koncové datum) ve formátu RRRR-MM-DD.
+        """
+        today = datetime.now().date()
+        if option == "Posledních 7 dní":
+            start_date = today - timedelta(days=6)
+        elif option == "Posledních 30 dní":
+            start_date = today - timedelta(days=29)
+        elif option == "Aktuální rok":
+            start_date = today.replace(month=1, day=1)
+        else:
+            last_year = today.year - 1
+            return f"{last_year}-01-01", f"{last_year}-12-31"
+        return start_date.strftime('%Y-%m-%d'), today.strftime('%Y-%m-%d')
+
+
+    def ask_date_range(self):
+        """
+        Dotaz na vlastní rozmezí datumů. Koncové datum je nepovinné (výchozí je dnešní datum).
+
+        :return: N-tice (počáteční, koncové datum) ve formátu RRRR-MM-DD nebo None při zrušení či chybě.
+        """
+        start_text = simpledialog.askstring("Vlastní rozmezí", "Datum od (RRRR-MM-DD):", parent=self.root)
+        if not start_text:
+            return None
+        end_text = simpledialog.askstring("Vlastní rozmezí", "Datum do (RRRR-MM-DD), prázdné = dnes:",
+                                          parent=self.root)
+        if end_text is None:
+            return None
+        try:
+            start_date = datetime.strptime(start_text.strip(), "%Y-%m-%d")
+            end_date = datetime.strptime(end_text.strip(), "%Y-%m-%d") if end_text.strip() else datetime.now()
+        except ValueError:
+            messagebox.showwarning("Upozornění", "Datum musí být ve formátu RRRR-MM-DD!")
+            return None
+        if end_date < start_date:
+            messagebox.showwarning("Upozornění", "Datum do nesmí být dřívější než datum od!")
+            return None
+        return start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')
 
 
     def on_combobox_date_change(self, event):
         """
-        Filtrování zobrazovaných dat v rozsahu počátečního a koncového datumu.
+        Filtrování zobrazovaných dat v rozsahu počátečního a koncového datumu - měsíc,
+        předvolba (posledních N dní, rok) nebo vlastní rozmezí.
         """
         selected_month_year = self.month_entry_combobox.get()
         if selected_month_year == "VŠE":
             self.start_date=None
             self.end_date=None
+        elif selected_month_year == "Vlastní rozmezí...":
+            date_range = self.ask_date_range()
+            if date_range is None:
+                self.month_entry_combobox.set(self.date_range_label)
+                return
+            self.start_date, self.end_date = date_range
+            self.month_entry_combobox.set(f"{self.start_date} - {self.end_date}")
+        elif selected_month_year in self.range_options:
+            self.start_date, self.end_date = self.preset_date_range(selected_month_year)
         else:
             start_date = datetime.strptime(f"01-{selected_month_year}", "%d-%m-%Y")
             self.start_date = start_date.strftime('%Y-%m-%d')
@@ -971,6 +1298,7 @@ class AuditLogView(View):
             else:
                 end_date = datetime(year, month + 1, 1) - timedelta(days=1)
             self.end_date = end_date.strftime('%Y-%m-%d')
+        self.date_range_label = self.month_entry_combobox.get()
 
         self.controller.show_data(self.current_table)
 
@@ -1128,3 +1456,170 @@ class UzivateleView(View):
         super().__init__(root, controller, col_names,current_table)     
         self.sort_reverse = False
         self.customize_ui()
+
+
+class ReportyView(View):
+    """
+    Třída ReportyView pro zobrazení měsíčních přehledů (hodnota skladu, spotřeba podle zařízení,
+    nákupy podle dodavatelů). Přehledy se počítají v pracovním vlákně. Dědí od třídy View.
+    """
+    def __init__(self, root, controller, col_names, current_table):
+        """
+        Inicializace zobrazení přehledů.
+        
+        :param root: Hlavní okno aplikace.
+        :param controller: Instance třídy Controller pro komunikaci mezi modelem a pohledem.
+        :param col_names: Názvy sloupců pro aktuální zobrazení.
+        """
+        super().__init__(root, controller, col_names, current_table)
+        self.report_names = CommonResources.report_names
+        self.selected_report = next(iter(self.report_names))
+        self.selected_year = "VŠE"
+        self.sort_reverse = False
+        self.click_col = None
+        self.customize_ui()
+
+
+    def customize_ui(self):
+        """
+        Přidání menu, framů a výběru přehledu a roku.
+        """
+        self.initialize_menus_dict()
+        self.initialize_fonts()
+        self.initialize_menu()
+        self.initialize_frames()
+        self.search_frame.pack_forget()
+        self.check_buttons_frame.pack_forget()
+        self.update_frames()
+        self.initialize_logged_user_label()
+        self.initialize_treeview()
+        self.additional_gui_elements()
+        self.setup_columns()
+
+
+    def initialize_menu(self):
+        """
+        Inicializace hlavního menu - export zobrazeného přehledu a přepínání pohledů.
+        """
+        self.menu_bar = tk.Menu(self.root)
+        self.root.config(menu=self.menu_bar)
+        common_menus = {
+            "Soubor": [
+                ("Export zobrazeného přehledu do csv", self.export_report),
+                "separator",
+                ("Konec", self.root.destroy)
+            ],
+        }
+        if self.current_role == "admin":
+            common_menus["Nástroje"] = self.tools_menu()
+        self.update_menu(common_menus)
+        self.view_var = tk.StringVar()
+        self.view_var.set(self.current_table)
+        self.update_radiobuttons_menu(CommonResources.common_radiobutton_menus, self.view_var)
+
+
+    def update_frames(self):
+        """
+        Aktualizuje specifické frame pro dané zobrazení.
+        """
+        self.tree_frame = tk.LabelFrame(self.left_frames_container, text="Přehled po měsících",
+                                        borderwidth=2, relief="groove")
+        self.tree_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+
+
+    def additional_gui_elements(self):
+        """
+        Vytvoření comboboxů pro výběr přehledu a roku.
+        """
+        self.report_label = tk.Label(self.filter_buttons_frame, text="Přehled:")
+        self.report_label.pack(side=tk.LEFT, padx=5, pady=5)
+        self.report_combobox = ttk.Combobox(self.filter_buttons_frame, width=35, state="readonly",
+                                            values=list(self.report_names.values()))
+        self.report_combobox.pack(side=tk.LEFT, padx=5, pady=5)
+        self.report_combobox.set(self.report_names[self.selected_report])
+        self.report_combobox.bind("<<ComboboxSelected>>", self.on_report_change)
+
+        self.year_label = tk.Label(self.filter_buttons_frame, text="Rok:")
+        self.year_label.pack(side=tk.LEFT, padx=5, pady=5)
+        first_year = min([2024] + self.controller.fetch_audit_archive_years())
+        years = [str(year) for year in range(datetime.now().year, first_year - 1, -1)]
+        self.year_combobox = ttk.Combobox(self.filter_buttons_frame, width=8, values=["VŠE"] + years, state="readonly")
+        self.year_combobox.pack(side=tk.LEFT, padx=5, pady=5)
+        self.year_combobox.set("VŠE")
+        self.year_combobox.bind("<<ComboboxSelected>>",
+                                lambda event, attr='selected_year': self.on_combobox_change(event, attr))
+
+        self.loading_label = tk.Label(self.filter_buttons_frame, text="", width=12, anchor="w")
+        self.loading_label.pack(side=tk.LEFT, padx=5)
+
+
+    def on_report_change(self, event):
+        """
+        Změna zobrazeného přehledu.
+        """
+        selected_name = self.report_combobox.get()
+        self.selected_report = next(key for key, name in self.report_names.items() if name == selected_name)
+        self.click_col = None
+        self.sort_reverse = False
+        self.load_data()
+
+
+    def load_data(self, current_id_num=None):
+        """
+        Výpočet vybraného přehledu v pracovním vlákně a jeho zobrazení.
+
+        :param current_id_num: Nepoužívá se, pro shodné volání s ostatními pohledy.
+        """
+        report = self.selected_report
+        year = None if self.selected_year == "VŠE" else self.selected_year
+
+        def on_loaded(result):
+            if report != self.selected_report or not self.tree.winfo_exists():
+                return
+            self.show_loading(False)
+            col_names, rows = result
+            if list(col_names) != list(self.col_names):
+                self.col_names = list(col_names)
+                self.col_index = {col: idx for idx, col in enumerate(self.col_names)}
+                self.setup_columns()
+            self.displayed_data = list(rows)
+            self.render_report()
+
+        self.show_loading(True)
+        self.controller.run_async("view", lambda model: model.fetch_report(report, year), on_loaded,
+                                  self.on_load_error)
+
+
+    def render_report(self):
+        """
+        Vložení řádků přehledu do Treeview, případně seřazených podle zakliknutého sloupce.
+        """
+        rows = self.displayed_data
+        if self.click_col is not None:
+            rows = sorted(rows, key=lambda row: (row[self.click_col] is None, row[self.click_col]),
+                          reverse=self.sort_reverse)
+        self.delete_tree()
+        for idx, row in enumerate(rows):
+            self.tree.insert('', tk.END, values=row, tags=('evenrow' if idx % 2 == 0 else 'oddrow',))
+        self.rendered_count = self.total_count = len(rows)
+
+
+    def on_column_click(self, clicked_col):
+        """
+        Třídění zobrazeného přehledu podle sloupce, při druhém kliknutí na stejný sloupec reverzně.
+        """
+        if self.click_col == clicked_col:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.click_col = clicked_col
+            self.sort_reverse = False
+        self.render_report()
+
+
+    def export_report(self):
+        """
+        Export zobrazeného přehledu do souboru csv.
+        """
+        headers = [self.tab2hum.get(col, col) for col in self.col_names]
+        rows = [self.tree.item(item, 'values') for item in self.tree.get_children()]
+        self.controller.export_report(headers, rows)